@@ -0,0 +1,149 @@
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class AlertDeduplicator:
+    """
+    Keyed alert suppression with time-window expiry.
+    The first alert for a key opens a window of `window` seconds; further
+    alerts with the same key inside the window are suppressed and counted.
+    Keys live in an insertion-ordered hash map, so lookups are O(1) and
+    expiry pops the oldest windows from the front. When more than
+    `max_keys` windows are open the oldest are evicted early, which bounds
+    memory during alert storms with many distinct keys.
+    """
+    
+    def __init__(self, window: float = 300.0, max_keys: int = 250000):
+        """
+        Initialize an empty index.
+        
+        Args:
+            window: Suppression window in seconds of record time
+            max_keys: Maximum number of open windows
+        """
+        self.window = window
+        self.max_keys = max_keys
+        
+        # key -> [window start, suppressed count], oldest window first
+        self._windows: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.suppressed = 0
+        self.evicted = 0
+    
+    def __len__(self) -> int:
+        return len(self._windows)
+    
+    def expire(self, now: float) -> int:
+        """
+        Close every window that ended before a time.
+        
+        Args:
+            now: Current record time
+        
+        Returns:
+            Number of windows closed
+        """
+        windows = self._windows
+        closed = 0
+        while windows:
+            key, entry = next(iter(windows.items()))
+            if now - entry[0] < self.window:
+                break
+            windows.popitem(last=False)
+            closed += 1
+        return closed
+    
+    def check(self, key: Hashable, timestamp: float) -> bool:
+        """
+        Check an alert against the index, recording it if it is new.
+        
+        Args:
+            key: Alert key, e.g. (source, destination, type)
+            timestamp: Record time of the alert
+        
+        Returns:
+            True if the alert duplicates one inside an open window
+        """
+        entry = self._windows.get(key)
+        if entry is not None and abs(timestamp - entry[0]) < self.window:
+            entry[1] += 1
+            self.suppressed += 1
+            return True
+        
+        # Open a new window at the back of the expiry order
+        if entry is not None:
+            del self._windows[key]
+        self._windows[key] = [timestamp, 0]
+        
+        if len(self._windows) > self.max_keys:
+            self._windows.popitem(last=False)
+            self.evicted += 1
+        return False
+    
+    def first_per_key(self, keys: np.ndarray, timestamps: np.ndarray,
+                      groups: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Find the alerts of a batch that can open a window.
+        Within a batch spanning less than one window, an alert can only be new
+        if it is the first of its key, or if its key's open window ends inside
+        the batch. The remaining alerts are counted as suppressed without
+        visiting the index.
+        
+        Args:
+            keys: Integer key per alert
+            timestamps: Record time per alert
+            groups: Optional small-integer key component, such as the alert type;
+                alerts are distinct when either the key or the group differs,
+                and are indexed under (key, group)
+        
+        Returns:
+            Positions of the alerts to check individually, in order
+        """
+        if len(keys) < 2 or timestamps.max() - timestamps.min() >= self.window:
+            return np.arange(len(keys))
+        latest = float(timestamps.max())
+        
+        if groups is None:
+            parts = [(np.arange(len(keys)), None)]
+        else:
+            parts = [(np.flatnonzero(groups == g), g) for g in np.unique(groups).tolist()]
+        
+        selected = []
+        for members, group in parts:
+            unique, first, inverse = np.unique(keys[members], return_index=True, return_inverse=True)
+            keep = np.zeros(len(members), dtype=bool)
+            keep[first] = True
+            
+            # A window expiring before the batch ends lets a later alert reopen it
+            expiring = np.array([
+                self._expires_before(key if group is None else (key, group), latest)
+                for key in unique.tolist()
+            ], dtype=bool)
+            if expiring.any():
+                keep |= expiring[inverse]
+            selected.append(members[keep])
+        
+        checked = np.sort(np.concatenate(selected))
+        self.suppressed += len(keys) - len(checked)
+        return checked
+    
+    def _expires_before(self, key: Hashable, timestamp: float) -> bool:
+        """Check whether a key has an open window that ends before a time."""
+        entry = self._windows.get(key)
+        return entry is not None and timestamp - entry[0] >= self.window
+    
+    def clear(self) -> None:
+        """Close every window and reset the counters."""
+        self._windows.clear()
+        self.suppressed = 0
+        self.evicted = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get index size and suppression counters."""
+        return {
+            "open_windows": len(self._windows),
+            "suppressed_alerts": self.suppressed,
+            "evicted_windows": self.evicted
+        }
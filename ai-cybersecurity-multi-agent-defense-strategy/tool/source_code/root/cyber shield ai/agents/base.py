@@ -1,6 +1,7 @@
 import logging
 from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +22,7 @@ class Agent(ABC):
         self.capabilities = capabilities
         self.active = False
         self.state: Dict[str, Any] = {}
+        self.rng = np.random.default_rng()
         logger.debug(f"Agent {name} initialized with capabilities: {capabilities}")
     
     def activate(self) -> None:
@@ -56,6 +58,15 @@ class Agent(ABC):
             "state": self.state
         }
     
+    def set_rng(self, rng: np.random.Generator) -> None:
+        """
+        Replace the agent's random generator, e.g. with a seeded simulation stream.
+        
+        Args:
+            rng: The generator to draw from
+        """
+        self.rng = rng
+    
     def reset(self) -> None:
         """Reset the agent's state."""
         self.state = {}
@@ -0,0 +1,420 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from agents.columns import PROTOCOL_NAMES, TrafficColumns, format_ip, parse_ip
+from agents.sketches import CountMinSketch, HyperLogLogArray, MomentTable
+
+logger = logging.getLogger(__name__)
+
+def decay_factor(elapsed: float, halflife: float) -> float:
+    """Weight left on old observations after `elapsed` seconds of exponential decay."""
+    if elapsed <= 0:
+        return 1.0
+    return 0.5 ** (elapsed / halflife)
+
+class DecayedMoments:
+    """
+    Exponentially decayed weighted mean and variance of one metric.
+    Batches are merged with Chan's parallel form of Welford's algorithm,
+    so an update costs O(batch) and never revisits earlier values. Decay
+    scales the weight and sum of squares of the old state alike, which
+    lowers its influence without moving the mean or variance.
+    """
+    
+    def __init__(self):
+        self.weight = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0
+    
+    @property
+    def variance(self) -> float:
+        return self._m2 / self.weight if self.weight > 0 else 0.0
+    
+    @property
+    def std(self) -> float:
+        return float(np.sqrt(self.variance))
+    
+    def decay(self, factor: float) -> None:
+        """Scale down the weight of everything seen so far."""
+        self.weight *= factor
+        self._m2 *= factor
+    
+    def update(self, values: np.ndarray, weights: Optional[np.ndarray] = None) -> None:
+        """
+        Add a batch of observations.
+        
+        Args:
+            values: Observed values
+            weights: Optional weight per value; 1 each by default
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return
+        if weights is None:
+            weight = float(len(values))
+            mean = float(values.mean())
+            m2 = float(((values - mean) ** 2).sum())
+        else:
+            weights = np.asarray(weights, dtype=np.float64)
+            weight = float(weights.sum())
+            if weight <= 0:
+                return
+            mean = float((weights * values).sum() / weight)
+            m2 = float((weights * (values - mean) ** 2).sum())
+        
+        total = self.weight + weight
+        delta = mean - self.mean
+        self.mean += delta * weight / total
+        self._m2 += m2 + delta * delta * self.weight * weight / total
+        self.weight = total
+
+class DecayedFrequencies:
+    """
+    Exponentially decayed frequencies of integer keys in bounded memory.
+    Keys are held in a sorted array so a batch merges with one unique and
+    one searchsorted. When more than `max_keys` keys are tracked the
+    lightest are dropped.
+    """
+    
+    def __init__(self, max_keys: int = 4096):
+        self.max_keys = max_keys
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.weights = np.zeros(0, dtype=np.float64)
+    
+    @property
+    def total(self) -> float:
+        return float(self.weights.sum())
+    
+    def decay(self, factor: float) -> None:
+        """Scale down every frequency."""
+        self.weights *= factor
+    
+    def update(self, keys: np.ndarray) -> None:
+        """
+        Count a batch of keys.
+        
+        Args:
+            keys: Integer key per observation
+        """
+        batch_keys, counts = np.unique(np.asarray(keys, dtype=np.int64), return_counts=True)
+        if not len(batch_keys):
+            return
+        
+        merged = np.union1d(self.keys, batch_keys)
+        weights = np.zeros(len(merged))
+        weights[np.searchsorted(merged, self.keys)] = self.weights
+        weights[np.searchsorted(merged, batch_keys)] += counts
+        
+        if len(merged) > self.max_keys:
+            keep = np.sort(np.argpartition(weights, -self.max_keys)[-self.max_keys:])
+            merged, weights = merged[keep], weights[keep]
+        self.keys, self.weights = merged, weights
+    
+    def probabilities(self) -> np.ndarray:
+        """Get the share of each tracked key."""
+        total = self.total
+        return self.weights / total if total > 0 else self.weights
+    
+    def expected_distinct(self, count: int) -> float:
+        """
+        Expected number of distinct keys among `count` draws from the distribution.
+        
+        Args:
+            count: Number of draws
+        
+        Returns:
+            Sum over keys of 1 - (1 - p) ** count
+        """
+        p = self.probabilities()
+        return float((-np.expm1(count * np.log1p(-np.minimum(p, 1 - 1e-12)))).sum())
+
+class StreamingBaseline:
+    """
+    Online traffic baseline that follows drift.
+    Every analysed batch updates decayed statistics in O(batch): payload
+    size moments, protocol shares and destination frequencies. The
+    connection rate is learned from closed time-window panes, so it does
+    not depend on how records were batched. Old traffic loses half
+    its weight every `halflife` seconds of record time, so the baseline
+    tracks gradual change in long-running deployments.
+    """
+    
+    def __init__(self, halflife: float = 3600.0, max_destinations: int = 4096):
+        """
+        Initialize an empty baseline.
+        
+        Args:
+            halflife: Seconds of record time after which old traffic weighs half
+            max_destinations: Destinations tracked for diversity estimates
+        """
+        self.halflife = halflife
+        self.connection_rate = DecayedMoments()
+        self.packet_size = DecayedMoments()
+        self.protocols = np.zeros(len(PROTOCOL_NAMES))
+        self.destinations = DecayedFrequencies(max_destinations)
+        self.records_seen = 0
+        self.last_time: Optional[float] = None
+    
+    def elapsed(self, columns: TrafficColumns) -> float:
+        """Get the record time a batch covers since the previous update."""
+        if self.last_time is None or not len(columns):
+            return 0.0
+        return max(0.0, float(columns.timestamp.max()) - self.last_time)
+    
+    def update(self, columns: TrafficColumns) -> None:
+        """
+        Fold a batch into the baseline.
+        
+        Args:
+            columns: Analysed traffic records
+        """
+        if not len(columns):
+            return
+        
+        elapsed = self.elapsed(columns)
+        factor = decay_factor(elapsed, self.halflife)
+        for stats in (self.connection_rate, self.packet_size, self.destinations):
+            stats.decay(factor)
+        self.protocols *= factor
+        self.packet_size.update(columns.payload_size)
+        self.destinations.update(columns.destination_ip)
+        
+        counts = columns.protocol_counts()
+        if len(counts) > len(self.protocols):
+            self.protocols = np.concatenate((self.protocols, np.zeros(len(counts) - len(self.protocols))))
+        self.protocols[:len(counts)] += counts
+        
+        self.records_seen += len(columns)
+        latest = float(columns.timestamp.max())
+        self.last_time = latest if self.last_time is None else max(self.last_time, latest)
+    
+    def update_rate(self, pane_counts: np.ndarray, empty_panes: int, pane: float) -> None:
+        """
+        Fold closed window panes into the connection rate.
+        
+        Args:
+            pane_counts: Record count of each closed non-empty pane
+            empty_panes: Number of closed panes without records
+            pane: Pane width in seconds
+        """
+        rates = np.append(np.asarray(pane_counts, dtype=np.float64) / pane, 0.0)
+        weights = np.append(np.full(len(pane_counts), pane), empty_panes * pane)
+        self.connection_rate.update(rates, weights)
+    
+    def protocol_shares(self) -> np.ndarray:
+        """Get the decayed share of each protocol code."""
+        total = self.protocols.sum()
+        return self.protocols / total if total > 0 else self.protocols
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize the baseline.
+        
+        Returns:
+            Dictionary of baseline statistics
+        """
+        shares = self.protocol_shares()
+        present = np.flatnonzero(shares)
+        return {
+            "avg_connection_rate": self.connection_rate.mean,
+            "std_connection_rate": self.connection_rate.std,
+            "avg_packet_size": self.packet_size.mean,
+            "std_packet_size": self.packet_size.std,
+            "unique_destinations_count": len(self.destinations.keys),
+            "protocol_distribution": {
+                PROTOCOL_NAMES[p]: s for p, s in zip(present.tolist(), shares[present].tolist())
+            },
+            "records_seen": self.records_seen
+        }
+
+class EntityBaselines:
+    """
+    Per-source, per-destination and per-port behaviour in fixed memory.
+    Every entity gets a decayed record count in a Count-Min sketch, a
+    decayed payload mean and variance in a hashed moment table, and the
+    distinct peers it talked to in a hashed HyperLogLog array: destinations
+    of a source, and sources of a destination or port. All three are sized
+    up front, so memory stays flat however many entities appear; entities
+    that collide in a slot share statistics, which can only hide a
+    deviation, not invent one.
+    
+    HyperLogLog registers cannot decay, so peers are counted in two
+    generations of `halflife` seconds each and estimates cover both.
+    """
+    
+    KINDS = ("source", "destination", "port")
+    
+    def __init__(self, halflife: float = 3600.0, rate_threshold: float = 4.0,
+                 payload_threshold: float = 6.0, fanout_threshold: float = 4.0,
+                 min_weight: float = 5.0, counter_width: int = 65536,
+                 moment_slots: int = 262144, peer_slots: int = 65536):
+        """
+        Initialize empty entity baselines.
+        
+        Args:
+            halflife: Seconds of record time after which old traffic weighs half
+            rate_threshold: Excess of an entity's share of a batch over its
+                historical share at which its rate score reaches 1
+            payload_threshold: Payload z-score against the entity's history at
+                which the payload score reaches 1
+            fanout_threshold: Excess of an entity's distinct peers in a batch over
+                its historical distinct peers at which the fan-out score reaches 1
+            min_weight: Decayed records an entity needs before its payload
+                statistics are trusted
+            counter_width: Counters per Count-Min row
+            moment_slots: Slots of the payload moment table
+            peer_slots: HyperLogLog sketches per generation
+        """
+        self.halflife = halflife
+        self.rate_threshold = rate_threshold
+        self.payload_threshold = payload_threshold
+        self.fanout_threshold = fanout_threshold
+        self.min_weight = min_weight
+        
+        self.counts = CountMinSketch(counter_width)
+        self.records = 0.0
+        self.payloads = MomentTable(moment_slots)
+        self.peers = HyperLogLogArray(peer_slots)
+        self.previous_peers = HyperLogLogArray(peer_slots)
+        self.generation_start: Optional[float] = None
+        self.last_time: Optional[float] = None
+    
+    @classmethod
+    def entity_key(cls, kind: str, entity: Any) -> np.ndarray:
+        """
+        Get the key of entities of one kind.
+        
+        Args:
+            kind: One of KINDS
+            entity: Integer address or port, or array of them
+        
+        Returns:
+            uint64 keys, tagged with the kind above the low 32 bits
+        """
+        return np.asarray(entity).astype(np.uint64) | np.uint64(cls.KINDS.index(kind) << 32)
+    
+    def _entities(self, columns: TrafficColumns) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Get the (entity key, peer) arrays of each kind for a batch."""
+        return [
+            (self.entity_key("source", columns.source_ip), columns.destination_ip),
+            (self.entity_key("destination", columns.destination_ip), columns.source_ip),
+            (self.entity_key("port", columns.port & 0xFFFF), columns.source_ip)
+        ]
+    
+    def distinct_peers(self, keys: np.ndarray) -> np.ndarray:
+        """Estimate the distinct peers of each entity key over the last one to two generations."""
+        slots = self.peers.slot_of(keys)
+        registers = np.maximum(self.peers.registers[slots], self.previous_peers.registers[slots])
+        return self.peers.estimate_registers(registers)
+    
+    def score(self, columns: TrafficColumns) -> np.ndarray:
+        """
+        Score each record against the history of its own source, destination and port.
+        A record scores the highest of its entities' rate, payload and fan-out
+        scores, so one quiet host that suddenly bursts stands out even when
+        busier hosts dominate the batch.
+        
+        Args:
+            columns: Traffic records, scored before they are folded in
+        
+        Returns:
+            Score per record between 0 and 1
+        """
+        count = len(columns)
+        scores = np.zeros(count)
+        if not count or self.records <= 0:
+            return scores
+        
+        payload = columns.payload_size.astype(np.float64)
+        for keys, peers in self._entities(columns):
+            entities, inverse, observed = np.unique(keys, return_inverse=True, return_counts=True)
+            
+            # Rate: the entity's records in this batch against its historical share
+            expected = self.counts.estimate(entities) / self.records * count
+            rate = ((observed + 1) / (expected + 1) - 1) / self.rate_threshold
+            
+            # Fan-out: distinct peers in this batch against distinct peers seen before
+            pairs = np.unique((inverse.astype(np.uint64) << np.uint64(32)) | peers.astype(np.uint64))
+            batch_peers = np.bincount((pairs >> np.uint64(32)).astype(np.int64), minlength=len(entities))
+            fanout = ((batch_peers + 1) / (self.distinct_peers(entities) + 1) - 1) / self.fanout_threshold
+            
+            scores = np.maximum(scores, np.maximum(rate, fanout)[inverse])
+            
+            # Payload: z-score of each record against the entity's payload history
+            weight, mean, std = self.payloads.stats(entities)
+            z = np.abs(payload - mean[inverse]) / np.maximum(std, 1.0)[inverse]
+            z[(weight < self.min_weight)[inverse]] = 0.0
+            scores = np.maximum(scores, z / self.payload_threshold)
+        
+        return np.clip(scores, 0.0, 1.0)
+    
+    def update(self, columns: TrafficColumns) -> None:
+        """
+        Fold a batch into the entity baselines.
+        
+        Args:
+            columns: Analysed traffic records
+        """
+        if not len(columns):
+            return
+        
+        latest = float(columns.timestamp.max())
+        if self.last_time is not None and latest > self.last_time:
+            factor = decay_factor(latest - self.last_time, self.halflife)
+            self.counts.decay(factor)
+            self.records *= factor
+            self.payloads.decay(factor)
+        
+        # Start a new peer generation once the current one covers a halflife
+        if self.generation_start is None:
+            self.generation_start = latest
+        elif latest - self.generation_start >= self.halflife:
+            self.peers, self.previous_peers = self.previous_peers, self.peers
+            self.peers.clear()
+            self.generation_start = latest
+        
+        # All kinds go into the same sketches, told apart by their key tags
+        entities = self._entities(columns)
+        keys = np.concatenate([k for k, _ in entities])
+        self.counts.add(keys)
+        self.records += len(columns)
+        self.payloads.update(keys, np.tile(columns.payload_size, len(entities)))
+        self.peers.add(keys, np.concatenate([p for _, p in entities]))
+        
+        self.last_time = latest if self.last_time is None else max(self.last_time, latest)
+    
+    def profile(self, kind: str, entity: Any) -> Dict[str, Any]:
+        """
+        Describe one entity's baseline.
+        
+        Args:
+            kind: One of KINDS
+            entity: IP address string for sources and destinations, port number for ports
+        
+        Returns:
+            Dictionary with the entity's decayed record count, traffic share,
+            distinct peers and payload statistics
+        """
+        value = parse_ip(entity) if kind != "port" else int(entity) & 0xFFFF
+        key = self.entity_key(kind, np.array([value]))
+        
+        records = float(self.counts.estimate(key)[0])
+        weight, mean, std = self.payloads.stats(key)
+        return {
+            "kind": kind,
+            "entity": format_ip(value) if kind != "port" else value,
+            "records": records,
+            "traffic_share": records / self.records if self.records > 0 else 0.0,
+            "distinct_peers": float(self.distinct_peers(key)[0]),
+            "avg_payload_size": float(mean[0]) if weight[0] > 0 else 0.0,
+            "std_payload_size": float(std[0])
+        }
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get the size of the entity baselines."""
+        return {
+            "tracked_records": self.records,
+            "memory_bytes": (self.counts.nbytes + self.payloads.nbytes +
+                             self.peers.nbytes + self.previous_peers.nbytes)
+        }
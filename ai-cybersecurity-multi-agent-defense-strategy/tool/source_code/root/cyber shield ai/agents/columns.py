@@ -0,0 +1,228 @@
+import logging
+import time
+from operator import itemgetter
+from datetime import datetime
+from typing import Dict, Any, List, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Protocol vocabulary shared by every TrafficColumns instance; code 0 is "unknown"
+PROTOCOL_NAMES: List[str] = ["unknown"]
+_PROTOCOL_CODES: Dict[str, int] = {"unknown": 0}
+
+def protocol_code(name: str) -> int:
+    """
+    Get the code of a protocol name, adding it to the vocabulary if new.
+    
+    Args:
+        name: Protocol name
+    
+    Returns:
+        Integer code indexing PROTOCOL_NAMES
+    """
+    code = _PROTOCOL_CODES.get(name)
+    if code is None:
+        code = len(PROTOCOL_NAMES)
+        PROTOCOL_NAMES.append(name)
+        _PROTOCOL_CODES[name] = code
+    return code
+
+def protocol_codes(names: Sequence[str]) -> np.ndarray:
+    """Get the codes of several protocol names."""
+    return np.array([protocol_code(n) for n in names], dtype=np.int64)
+
+def parse_ip(ip: str) -> int:
+    """Convert a dotted-quad IPv4 string to an integer; anything else maps to 0."""
+    try:
+        a, b, c, d = ip.split(".")
+        return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+    except (AttributeError, ValueError):
+        return 0
+
+def format_ip(ip: int) -> str:
+    """Render an integer IPv4 address as a dotted-quad string."""
+    ip = int(ip)
+    return f"{ip >> 24 & 0xFF}.{ip >> 16 & 0xFF}.{ip >> 8 & 0xFF}.{ip & 0xFF}"
+
+def _parse_timestamp(value: Any) -> float:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+def _values(records: Sequence[Dict[str, Any]], key: str, default: Any) -> List[Any]:
+    """Collect one key from every record, using the C-level getter while no key is missing."""
+    try:
+        return list(map(itemgetter(key), records))
+    except KeyError:
+        return [r.get(key, default) for r in records]
+
+class TrafficColumns:
+    """
+    Columnar view of traffic records used by the detection pipeline.
+    Dictionary records are converted once per call; simulator batches are
+    adopted without copying, by duck typing on their column attributes so the
+    agents do not depend on the simulation package.
+    """
+    
+    FIELDS = {
+        "source_ip": np.uint32,
+        "destination_ip": np.uint32,
+        "protocol": np.int64,
+        "port": np.int64,
+        "payload_size": np.int64,
+        "timestamp": np.float64,
+        "is_malicious": np.bool_,
+        "labelled": np.bool_
+    }
+    
+    def __init__(self, **columns: np.ndarray):
+        """
+        Initialize from column arrays.
+        
+        Args:
+            columns: One array per entry in FIELDS, all of the same length
+        """
+        for field, dtype in self.FIELDS.items():
+            setattr(self, field, np.asarray(columns[field], dtype=dtype))
+    
+    def __len__(self) -> int:
+        return len(self.source_ip)
+    
+    @classmethod
+    def empty(cls) -> "TrafficColumns":
+        """Create columns with no records."""
+        return cls(**{field: np.zeros(0, dtype=dtype) for field, dtype in cls.FIELDS.items()})
+    
+    @classmethod
+    def coerce(cls, data: Any) -> "TrafficColumns":
+        """
+        Convert any supported traffic input to columns.
+        
+        Args:
+            data: TrafficColumns, a columnar batch exposing the simulator's
+                TrafficBatch attributes, or a list of dictionary records
+        
+        Returns:
+            TrafficColumns over the same records
+        """
+        if isinstance(data, cls):
+            return data
+        if hasattr(data, "source_ip") and hasattr(data, "protocol_names"):
+            return cls.from_batch(data)
+        return cls.from_records(data or [])
+    
+    @classmethod
+    def from_batch(cls, batch: Any) -> "TrafficColumns":
+        """
+        Adopt the columns of a simulator TrafficBatch.
+        
+        Args:
+            batch: Object with source_ip, destination_ip, protocol, port,
+                payload_size, timestamp and is_malicious arrays, and
+                protocol_names indexing the protocol column; an optional
+                labelled array marks which is_malicious values are known
+        
+        Returns:
+            TrafficColumns sharing the batch's arrays where dtypes allow
+        """
+        table = protocol_codes(batch.protocol_names)
+        return cls(
+            source_ip=batch.source_ip,
+            destination_ip=batch.destination_ip,
+            protocol=table[batch.protocol],
+            port=batch.port,
+            payload_size=batch.payload_size,
+            timestamp=batch.timestamp,
+            is_malicious=batch.is_malicious,
+            labelled=getattr(batch, "labelled", np.ones(len(batch.source_ip), dtype=bool))
+        )
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> "TrafficColumns":
+        """
+        Convert dictionary records.
+        
+        Args:
+            records: Traffic records in the simulator's dictionary format
+        
+        Returns:
+            Equivalent TrafficColumns
+        """
+        if not len(records):
+            return cls.empty()
+        
+        # Traffic repeats a small set of hosts, so parse each distinct address once
+        sources = _values(records, "source_ip", "unknown")
+        destinations = _values(records, "destination_ip", "unknown")
+        addresses = {ip: parse_ip(ip) for ip in set(sources) | set(destinations)}
+        
+        protocols = _values(records, "protocol", "unknown")
+        codes = {name: protocol_code(name) for name in set(protocols)}
+        
+        # Numeric timestamps convert in one call; ISO strings are parsed one by one
+        timestamps = _values(records, "timestamp", time.time())
+        try:
+            timestamps = np.array(timestamps, dtype=np.float64)
+        except (TypeError, ValueError):
+            timestamps = np.array([_parse_timestamp(ts) for ts in timestamps], dtype=np.float64)
+        
+        return cls(
+            source_ip=np.array(list(map(addresses.__getitem__, sources)), dtype=np.uint32),
+            destination_ip=np.array(list(map(addresses.__getitem__, destinations)), dtype=np.uint32),
+            protocol=np.array(list(map(codes.__getitem__, protocols)), dtype=np.int64),
+            port=np.array(_values(records, "port", 0), dtype=np.int64),
+            payload_size=np.array(_values(records, "payload_size", 0), dtype=np.int64),
+            timestamp=timestamps,
+            is_malicious=np.array(_values(records, "is_malicious", False), dtype=bool),
+            labelled=np.array(["is_malicious" in r for r in records], dtype=bool)
+        )
+    
+    @classmethod
+    def concatenate(cls, parts: Sequence["TrafficColumns"]) -> "TrafficColumns":
+        """Join several column sets in order."""
+        parts = [p for p in parts if len(p)]
+        if not parts:
+            return cls.empty()
+        if len(parts) == 1:
+            return parts[0]
+        return cls(**{field: np.concatenate([getattr(p, field) for p in parts]) for field in cls.FIELDS})
+    
+    def take(self, indices: Any) -> "TrafficColumns":
+        """
+        Select records by index array, boolean mask or slice.
+        
+        Args:
+            indices: Anything accepted by NumPy indexing
+        
+        Returns:
+            New TrafficColumns with the selected records
+        """
+        return TrafficColumns(**{field: getattr(self, field)[indices] for field in self.FIELDS})
+    
+    def protocol_in(self, names: Sequence[str]) -> np.ndarray:
+        """Get a mask of the records whose protocol is one of the names."""
+        return np.isin(self.protocol, protocol_codes(names))
+    
+    def protocol_counts(self) -> np.ndarray:
+        """Count records per protocol code, over the whole vocabulary."""
+        return np.bincount(self.protocol, minlength=len(PROTOCOL_NAMES))
+    
+    def record(self, index: int) -> Dict[str, Any]:
+        """
+        Get one record in dictionary form.
+        
+        Args:
+            index: Record position
+        
+        Returns:
+            Dictionary with the record's addresses, protocol, port, size and timestamp
+        """
+        return {
+            "source_ip": format_ip(self.source_ip[index]),
+            "destination_ip": format_ip(self.destination_ip[index]),
+            "protocol": PROTOCOL_NAMES[self.protocol[index]],
+            "port": int(self.port[index]),
+            "payload_size": int(self.payload_size[index]),
+            "timestamp": float(self.timestamp[index])
+        }
@@ -1,10 +1,15 @@
 import logging
-import random
 import time
 from collections import deque
 from typing import Dict, Any, List, Optional, Tuple, Deque
 import numpy as np
+from agents.alerts import AlertDeduplicator
 from agents.base import Agent
+from agents.baseline import EntityBaselines, StreamingBaseline
+from agents.columns import TrafficColumns
+from agents.heavy_hitters import HeavyHitters
+from agents.scan_detector import ScanDetector
+from agents.windows import WindowAggregator
 
 logger = logging.getLogger(__name__)
 
@@ -14,6 +19,28 @@ class DetectionAgent(Agent):
     to identify potential threats and anomalies.
     """
     
+    # Threat types in the priority order used by _determine_threat_types
+    THREAT_TYPES = (
+        "dos_attack",
+        "port_scan",
+        "data_exfiltration",
+        "command_and_control",
+        "malicious_payload",
+        "brute_force",
+        "suspicious_activity"
+    )
+    
+    # Ports probed by scanners, as a lookup table indexed by port
+    SCAN_PORTS = np.zeros(65536, dtype=bool)
+    SCAN_PORTS[[21, 22, 23, 25, 53, 80, 443, 445, 3389]] = True
+    
+    # Payload size above which traffic to a port looks anomalous, indexed by port
+    PAYLOAD_LIMITS = np.full(65536, np.iinfo(np.int64).max)
+    PAYLOAD_LIMITS[[80, 443]] = 50000  # Unusually large HTTP(S) payload
+    PAYLOAD_LIMITS[[22, 23]] = 5000    # Unusually large SSH/Telnet payload
+    PAYLOAD_LIMITS[53] = 1000          # Unusually large DNS payload
+    PAYLOAD_LIMITS[25] = 10000         # Unusually large SMTP payload
+    
     def __init__(self, name: str = "Detection Agent", description: str = "Monitors for threats and anomalies"):
         capabilities = [
             "traffic_analysis",
@@ -24,8 +51,25 @@ class DetectionAgent(Agent):
         ]
         super().__init__(name, description, capabilities)
         
-        # History window for baseline calculation
-        self.traffic_history: Deque[Dict[str, Any]] = deque(maxlen=100)
+        # Streaming baseline; old traffic weighs half after an hour of record time
+        self.baseline_halflife = 3600.0
+        self.min_baseline_records = 30
+        self.baseline = StreamingBaseline(self.baseline_halflife)
+        
+        # Per-source, per-destination and per-port baselines in fixed-size sketches
+        self.entity_baselines = EntityBaselines(self.baseline_halflife)
+        
+        # 1s, 10s and 60s windows over record time, sliding by one-second panes
+        self.windows = WindowAggregator((1.0, 10.0, 60.0), pane=1.0)
+        
+        # Heaviest sources, destinations and (source, port) pairs of the last minutes;
+        # DoS and brute force are attributed to keys holding at least this share
+        self.heavy_hitters = HeavyHitters(capacity=1024, halflife=60.0)
+        self.heavy_hitter_share = 0.05
+        
+        # Sources reaching 100 distinct (destination, port) pairs within 10 minutes are scanning;
+        # raise expected_sources for larger networks, at about 768 bytes per source
+        self.scan_detector = ScanDetector(window=600.0, threshold=100.0, expected_sources=32768)
         
         # Detection models (simplified for demo)
         self.detection_thresholds = {
@@ -33,23 +77,46 @@ class DetectionAgent(Agent):
             "packet_size": 0.8,       # Packet size deviation threshold
             "connection_diversity": 0.7,  # Unique endpoints threshold
             "protocol_anomaly": 0.8,  # Protocol behavior anomaly threshold
-            "payload_anomaly": 0.85   # Payload content anomaly threshold
+            "payload_anomaly": 0.85,  # Payload content anomaly threshold
+            "entity_anomaly": 0.8     # Deviation from a record's own entity history
         }
         
         # Recent alerts cache
         self.recent_alerts: Deque[Dict[str, Any]] = deque(maxlen=20)
         
+        # Alerts repeating a (source, destination, type) within 5 minutes are suppressed
+        self.alert_index = AlertDeduplicator(window=300.0)
+        
         # Initialize state
-        self.state = {
+        self.state = self._initial_state()
+        
+        logger.debug(f"DetectionAgent {name} initialized")
+    
+    def _initial_state(self) -> Dict[str, Any]:
+        """Build the state of an agent that has not seen any traffic."""
+        return {
             "baseline_established": False,
             "baseline_stats": {},
             "current_threat_level": "low",
             "anomaly_scores": {},
             "recent_detections": [],
-            "false_positive_rate": 0.0
+            "false_positive_rate": 0.0,
+            "alert_dedup": self.alert_index.stats(),
+            "traffic_windows": self.windows.stats(),
+            "port_scan_sources": []
         }
-        
-        logger.debug(f"DetectionAgent {name} initialized")
+    
+    def reset(self) -> None:
+        """Reset the agent's state, baseline and alert history."""
+        self.baseline = StreamingBaseline(self.baseline_halflife)
+        self.entity_baselines = EntityBaselines(self.baseline_halflife)
+        self.windows.clear()
+        self.heavy_hitters.clear()
+        self.scan_detector.clear()
+        self.recent_alerts.clear()
+        self.alert_index.clear()
+        self.state = self._initial_state()
+        logger.debug(f"Agent {self.name} state reset")
     
     def process(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -71,38 +138,52 @@ class DetectionAgent(Agent):
             return self._analyze_traffic(data.get("traffic_data", []))
         elif operation == "check_baseline":
             return self._check_baseline()
+        elif operation == "entity_profile":
+            return self._entity_profile(data.get("kind", "source"), data.get("entity"))
+        elif operation == "heavy_hitters":
+            return self._get_heavy_hitters(data.get("dimension"), data.get("metric", "count"), data.get("k", 10))
         elif operation == "detect_simulation":
             return self._detect_simulation(data.get("attack_data", {}))
         else:
             return {"error": f"Unknown operation: {operation}"}
     
-    def _analyze_traffic(self, traffic_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    def _analyze_traffic(self, traffic_data: Any) -> Dict[str, Any]:
         """
         Analyze network traffic data for anomalies and potential threats.
         
         Args:
-            traffic_data: List of network traffic records
+            traffic_data: List of network traffic records, or a columnar batch
+                (TrafficColumns or the simulator's TrafficBatch)
             
         Returns:
             Dictionary with analysis results
         """
-        if not traffic_data:
+        columns = TrafficColumns.coerce(traffic_data)
+        if not len(columns):
             return {"error": "No traffic data provided"}
         
-        # Add traffic to history
-        for traffic in traffic_data:
-            self.traffic_history.append(traffic)
+        # Bucket the traffic into time windows by record timestamp
+        closed_panes, empty_panes = self.windows.add(columns.timestamp, columns.payload_size)
+        self.state["traffic_windows"] = self.windows.stats()
         
-        # Establish baseline if not already done
-        if not self.state["baseline_established"] and len(self.traffic_history) >= 30:
-            self._establish_baseline()
+        # Count the traffic towards its heavy hitters before attributing threats
+        self.heavy_hitters.update(columns)
         
-        # Calculate anomaly scores
-        anomaly_scores = self._calculate_anomaly_scores(traffic_data)
+        # Count each source's distinct targets over the scan window
+        sources, targets = self.scan_detector.update(columns)
+        scan_scores = self.scan_detector.scores(columns, sources, targets)
+        self.state["port_scan_sources"] = self.scan_detector.scanners(sources, targets)
+        
+        # Calculate anomaly scores against the baseline as it stood before this traffic
+        anomaly_scores, entity_scores = self._calculate_anomaly_scores(columns)
         self.state["anomaly_scores"] = anomaly_scores
         
+        # Fold the traffic and the panes it closed into the streaming baseline
+        self._update_baseline(columns, closed_panes, empty_panes)
+        
         # Identify threats based on anomaly scores
-        detected_threats = self._identify_threats(traffic_data, anomaly_scores)
+        record_scores = {"entity": entity_scores, "port_scan": scan_scores}
+        detected_threats = self._identify_threats(columns, anomaly_scores, record_scores)
         
         # Update state with recent detections
         self.state["recent_detections"] = detected_threats
@@ -119,62 +200,44 @@ class DetectionAgent(Agent):
         
         return {
             "analysis_time": time.time(),
-            "records_analyzed": len(traffic_data),
+            "records_analyzed": len(columns),
             "baseline_established": self.state["baseline_established"],
             "threat_level": overall_threat_level,
             "detected_threats": detected_threats,
             "anomaly_summary": self._summarize_anomalies(anomaly_scores)
         }
     
-    def _establish_baseline(self) -> None:
-        """Establish a baseline from historical traffic for anomaly detection."""
-        if len(self.traffic_history) < 30:
-            logger.warning("Not enough traffic history to establish baseline")
-            return
-        
-        # Extract key metrics
-        connection_rates = []
-        packet_sizes = []
-        unique_destinations = set()
-        protocols = {}
-        
-        for traffic in self.traffic_history:
-            # Calculate connection rate (simplified)
-            connection_rates.append(1)  # Each entry counts as one connection
-            
-            # Track packet sizes
-            packet_sizes.append(traffic.get("payload_size", 0))
-            
-            # Track unique destinations
-            unique_destinations.add(traffic.get("destination_ip", "unknown"))
-            
-            # Track protocol distribution
-            protocol = traffic.get("protocol", "unknown")
-            protocols[protocol] = protocols.get(protocol, 0) + 1
-        
-        # Calculate baseline statistics
-        baseline_stats = {
-            "avg_connection_rate": len(connection_rates) / max(1, len(self.traffic_history)),
-            "avg_packet_size": np.mean(packet_sizes) if packet_sizes else 0,
-            "std_packet_size": np.std(packet_sizes) if packet_sizes else 0,
-            "unique_destinations_count": len(unique_destinations),
-            "protocol_distribution": {p: count / len(self.traffic_history) for p, count in protocols.items()}
-        }
-        
-        self.state["baseline_stats"] = baseline_stats
-        self.state["baseline_established"] = True
+    def _update_baseline(self, columns: TrafficColumns, closed_panes: np.ndarray, empty_panes: int) -> None:
+        """
+        Update the streaming baseline with analysed traffic.
         
-        logger.info("Traffic baseline established")
+        Args:
+            columns: Network traffic records in columnar form
+            closed_panes: Record counts of the non-empty window panes the traffic closed
+            empty_panes: Number of empty window panes the traffic closed
+        """
+        self.baseline.update(columns)
+        self.baseline.update_rate(closed_panes, empty_panes, self.windows.pane)
+        self.entity_baselines.update(columns)
+        self.state["baseline_stats"] = self.baseline.stats()
+        
+        if not self.state["baseline_established"] and self.baseline.records_seen >= self.min_baseline_records:
+            self.state["baseline_established"] = True
+            logger.info("Traffic baseline established")
     
-    def _calculate_anomaly_scores(self, traffic_data: List[Dict[str, Any]]) -> Dict[str, float]:
+    def _calculate_anomaly_scores(self, columns: TrafficColumns) -> Tuple[Dict[str, float], np.ndarray]:
         """
         Calculate anomaly scores for different traffic characteristics.
+        Every score is computed with whole-column NumPy operations. Besides the
+        batch-level scores, each record is scored against the history of its
+        own source, destination and port.
         
         Args:
-            traffic_data: List of network traffic records
+            columns: Network traffic records in columnar form
             
         Returns:
-            Dictionary with anomaly scores for different metrics
+            Tuple of (dictionary with anomaly scores for different metrics,
+            entity anomaly score per record)
         """
         # If baseline not established, use simplified detection
         if not self.state["baseline_established"]:
@@ -183,78 +246,84 @@ class DetectionAgent(Agent):
                 "packet_size": 0.0,
                 "connection_diversity": 0.0,
                 "protocol_anomaly": 0.0,
-                "payload_anomaly": 0.5  # Default mid-range value
-            }
+                "payload_anomaly": 0.5,  # Default mid-range value
+                "entity_anomaly": 0.0
+            }, np.zeros(len(columns))
         
-        baseline = self.state["baseline_stats"]
+        baseline = self.baseline
+        count = len(columns)
         
         # Current metrics
-        current_connection_rate = len(traffic_data)
-        
-        packet_sizes = [t.get("payload_size", 0) for t in traffic_data]
-        current_avg_packet_size = np.mean(packet_sizes) if packet_sizes else 0
-        
-        unique_destinations = set(t.get("destination_ip", "") for t in traffic_data)
-        current_unique_destinations = len(unique_destinations)
-        
-        # Protocol distribution
-        current_protocols = {}
-        for traffic in traffic_data:
-            protocol = traffic.get("protocol", "unknown")
-            current_protocols[protocol] = current_protocols.get(protocol, 0) + 1
+        current_windows = [w for w in map(self.windows.current, self.windows.widths) if w]
+        current_avg_packet_size = float(columns.payload_size.mean())
+        current_unique_destinations = len(np.unique(columns.destination_ip))
         
         # Calculate anomaly scores (0-1 scale, higher is more anomalous)
         
-        # Connection rate anomaly (compare to baseline)
-        connection_rate_anomaly = (
-            min(1.0, current_connection_rate / (baseline["avg_connection_rate"] * self.detection_thresholds["connection_rate"]))
-            if baseline["avg_connection_rate"] > 0 else 0.5
-        )
+        # Connection rate anomaly: largest excess of a window ending at the newest
+        # record, open pane included, over the baseline rate, saturating at
+        # (1 + threshold) times the baseline. Three Poisson standard deviations
+        # of slack keep sparse short windows quiet.
+        if not current_windows or baseline.connection_rate.weight <= 0:
+            connection_rate_anomaly = 0.0
+        elif baseline.connection_rate.mean > 0:
+            excess = max(
+                (window["records"] - expected - 3 * np.sqrt(expected)) / expected
+                for window, expected in ((w, baseline.connection_rate.mean * w["seconds"]) for w in current_windows)
+            )
+            connection_rate_anomaly = min(1.0, max(0.0, excess) / self.detection_thresholds["connection_rate"])
+        else:
+            connection_rate_anomaly = 0.5
         
         # Packet size anomaly (compare to baseline using z-score)
-        if baseline["std_packet_size"] > 0:
-            z_score = abs(current_avg_packet_size - baseline["avg_packet_size"]) / baseline["std_packet_size"]
+        if baseline.packet_size.std > 0:
+            z_score = abs(current_avg_packet_size - baseline.packet_size.mean) / baseline.packet_size.std
             packet_size_anomaly = min(1.0, z_score / self.detection_thresholds["packet_size"])
         else:
             packet_size_anomaly = 0.0
         
-        # Connection diversity anomaly
-        expected_unique = baseline["unique_destinations_count"] * (len(traffic_data) / max(1, len(self.traffic_history)))
+        # Connection diversity anomaly: distinct destinations against the number
+        # expected from the baseline destination frequencies for this many records
+        expected_unique = baseline.destinations.expected_distinct(count)
         if expected_unique > 0:
             diversity_ratio = current_unique_destinations / expected_unique
             connection_diversity_anomaly = abs(1 - diversity_ratio) * self.detection_thresholds["connection_diversity"]
         else:
             connection_diversity_anomaly = 0.0
         
-        # Protocol anomaly (compare distributions)
-        protocol_anomaly = 0.0
-        baseline_protocols = baseline["protocol_distribution"]
-        
-        for protocol, count in current_protocols.items():
-            current_ratio = count / len(traffic_data)
-            baseline_ratio = baseline_protocols.get(protocol, 0)
-            protocol_anomaly = max(protocol_anomaly, abs(current_ratio - baseline_ratio))
+        # Protocol anomaly: largest share difference over the protocols seen now
+        current_protocols = columns.protocol_counts() / count
+        baseline_protocols = np.zeros(len(current_protocols))
+        shares = baseline.protocol_shares()[:len(current_protocols)]
+        baseline_protocols[:len(shares)] = shares
+        seen = current_protocols > 0
+        protocol_anomaly = float(np.abs(current_protocols[seen] - baseline_protocols[seen]).max())
         
         # Payload anomaly (simplified)
         # In a real system, this would involve deep packet inspection or content analysis
-        payload_patterns = sum(1 for t in traffic_data if self._check_payload_anomaly(t))
-        payload_anomaly = min(1.0, payload_patterns / max(1, len(traffic_data)))
+        payload_anomaly = float(np.count_nonzero(self._payload_anomalies(columns))) / count
+        
+        # Entity anomaly: the record that deviates most from its own entity's history
+        entity_scores = self.entity_baselines.score(columns)
         
         return {
             "connection_rate": connection_rate_anomaly,
             "packet_size": packet_size_anomaly,
             "connection_diversity": connection_diversity_anomaly,
             "protocol_anomaly": protocol_anomaly,
-            "payload_anomaly": payload_anomaly
-        }
+            "payload_anomaly": payload_anomaly,
+            "entity_anomaly": float(entity_scores.max())
+        }, entity_scores
     
-    def _identify_threats(self, traffic_data: List[Dict[str, Any]], anomaly_scores: Dict[str, float]) -> List[Dict[str, Any]]:
+    def _identify_threats(self, columns: TrafficColumns, anomaly_scores: Dict[str, float],
+                          record_scores: Dict[str, np.ndarray]) -> List[Dict[str, Any]]:
         """
         Identify potential threats based on anomaly scores.
         
         Args:
-            traffic_data: List of network traffic records
+            columns: Network traffic records in columnar form
             anomaly_scores: Dictionary with anomaly scores
+            record_scores: Per-record "entity" anomaly and "port_scan" confidence arrays
             
         Returns:
             List of detected threats
@@ -267,96 +336,118 @@ class DetectionAgent(Agent):
         # Set detection threshold (can be adjusted)
         detection_threshold = 0.6
         
-        # Check for specific threat patterns
-        for traffic in traffic_data:
-            # Look for indicators of compromise
-            is_malicious = traffic.get("is_malicious", False)  # For simulation data that's prelabeled
-            confidence = 0.0
-            threat_type = "unknown"
-            
-            # Determine threat type and confidence based on traffic characteristics and anomaly scores
-            if is_malicious or overall_score > detection_threshold:
-                # Analyze the specific type of threat
-                threat_type, confidence = self._determine_threat_type(traffic, anomaly_scores)
-                
-                # Only report if confidence is sufficient
-                if confidence > 0.5:
-                    threat = {
-                        "id": str(int(time.time() * 1000)) + str(random.randint(1000, 9999)),
-                        "source_ip": traffic.get("source_ip", "unknown"),
-                        "destination_ip": traffic.get("destination_ip", "unknown"),
-                        "protocol": traffic.get("protocol", "unknown"),
-                        "timestamp": traffic.get("timestamp", time.time()),
-                        "type": threat_type,
-                        "confidence": confidence,
-                        "anomaly_factors": [k for k, v in anomaly_scores.items() if v > 0.7],
-                        "description": self._generate_threat_description(threat_type, traffic)
-                    }
-                    
-                    # Check if this is a duplicate of a recent alert
-                    if not self._is_duplicate_alert(threat):
-                        threats.append(threat)
-                        self.recent_alerts.append(threat)
+        # Look for indicators of compromise: prelabeled simulation traffic,
+        # records far from their own entity's history, records of scanning
+        # sources, or every record when the batch as a whole is anomalous
+        if overall_score > detection_threshold:
+            candidates, candidate_scores = columns, record_scores
+        else:
+            flagged = (columns.is_malicious | (record_scores["port_scan"] > 0) |
+                       (record_scores["entity"] > self.detection_thresholds["entity_anomaly"]))
+            candidates = columns.take(flagged)
+            candidate_scores = {name: values[flagged] for name, values in record_scores.items()}
+        if not len(candidates):
+            return threats
+        
+        # Determine threat type and confidence of every candidate at once
+        threat_types, confidences = self._determine_threat_types(candidates, anomaly_scores, candidate_scores)
+        
+        # Only report if confidence is sufficient
+        reported = np.flatnonzero(confidences > 0.5)
+        
+        # Drop duplicates of recent alerts before building any alert records
+        reported = self._new_alerts(candidates, threat_types, reported)
+        self.state["alert_dedup"] = self.alert_index.stats()
+        
+        anomaly_factors = [k for k, v in anomaly_scores.items() if v > 0.7]
+        id_prefix = str(int(time.time() * 1000))
+        id_suffixes = self.rng.integers(1000, 10000, len(reported))
+        
+        for i, suffix in zip(reported.tolist(), id_suffixes.tolist()):
+            traffic = candidates.record(i)
+            threat_type = self.THREAT_TYPES[threat_types[i]]
+            threat = {
+                "id": id_prefix + str(suffix),
+                "source_ip": traffic["source_ip"],
+                "destination_ip": traffic["destination_ip"],
+                "protocol": traffic["protocol"],
+                "timestamp": traffic["timestamp"],
+                "type": threat_type,
+                "confidence": float(confidences[i]),
+                "anomaly_factors": list(anomaly_factors),
+                "description": self._generate_threat_description(threat_type, traffic)
+            }
+            threats.append(threat)
+            self.recent_alerts.append(threat)
         
         return threats
     
-    def _determine_threat_type(self, traffic: Dict[str, Any], anomaly_scores: Dict[str, float]) -> Tuple[str, float]:
+    def _determine_threat_types(self, columns: TrafficColumns, anomaly_scores: Dict[str, float],
+                                record_scores: Dict[str, np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
         """
-        Determine the specific type of threat and confidence level.
+        Determine the specific type of threat and confidence level of each record.
+        The first matching rule wins, as in a chain of if/elif checks.
         
         Args:
-            traffic: A network traffic record
+            columns: Candidate traffic records
             anomaly_scores: Dictionary with anomaly scores
+            record_scores: Per-candidate "entity" anomaly and "port_scan" confidence arrays
             
         Returns:
-            Tuple of (threat_type, confidence)
+            Tuple of (indices into THREAT_TYPES, confidences)
         """
-        # Extract relevant features
-        port = traffic.get("port", 0)
-        protocol = traffic.get("protocol", "unknown")
-        payload_size = traffic.get("payload_size", 0)
-        
-        # Initialize confidence tracking
-        confidence = 0.0
-        threat_type = "unknown"
-        
-        # DOS attack detection
-        if (anomaly_scores["connection_rate"] > 0.8 and 
-            anomaly_scores["connection_diversity"] < 0.3):
-            threat_type = "dos_attack"
-            confidence = anomaly_scores["connection_rate"]
-        
-        # Port scan detection
-        elif port in [21, 22, 23, 25, 53, 80, 443, 445, 3389] and anomaly_scores["connection_diversity"] > 0.8:
-            threat_type = "port_scan"
-            confidence = anomaly_scores["connection_diversity"]
-        
-        # Data exfiltration detection
-        elif payload_size > 10000 and anomaly_scores["packet_size"] > 0.7:
-            threat_type = "data_exfiltration"
-            confidence = anomaly_scores["packet_size"]
-        
-        # Command and control traffic
-        elif protocol in ["tcp", "https"] and anomaly_scores["protocol_anomaly"] > 0.7:
-            threat_type = "command_and_control"
-            confidence = anomaly_scores["protocol_anomaly"]
-        
-        # Malware or exploit payload
-        elif anomaly_scores["payload_anomaly"] > 0.8:
-            threat_type = "malicious_payload"
-            confidence = anomaly_scores["payload_anomaly"]
-        
-        # Brute force attempt
-        elif protocol in ["ssh", "ftp", "smtp"] and anomaly_scores["connection_rate"] > 0.7:
-            threat_type = "brute_force"
-            confidence = anomaly_scores["connection_rate"]
-        
-        # Unknown but suspicious
+        scores = anomaly_scores
+        count = len(columns)
+        no_match = np.zeros(count, dtype=bool)
+        share = self.heavy_hitter_share
+        heavy = self.heavy_hitters
+        
+        # DoS traffic comes from or goes to a heavy hitter of recent traffic
+        if scores["connection_rate"] > 0.8 and scores["connection_diversity"] < 0.3:
+            dos = (heavy.contains("source", columns, heavy.heavy("source", share)) |
+                   heavy.contains("destination", columns, heavy.heavy("destination", share)))
         else:
-            threat_type = "suspicious_activity"
-            confidence = overall_score = sum(anomaly_scores.values()) / len(anomaly_scores)
+            dos = no_match
         
-        return threat_type, confidence
+        # Brute force hammers one service from one source
+        brute_force = columns.protocol_in(["ssh", "ftp", "smtp"])
+        if scores["connection_rate"] > 0.7 and brute_force.any():
+            brute_force &= heavy.contains("source_port", columns, heavy.heavy("source_port", share))
+        else:
+            brute_force = no_match
+        
+        # Port scans come from sources over the distinct-target threshold, or
+        # hit scanner ports in a batch that is diverse as a whole
+        scanner = record_scores["port_scan"]
+        diverse_scan = self.SCAN_PORTS[columns.port & 0xFFFF] & (scores["connection_diversity"] > 0.8)
+        
+        rules = [
+            # DOS attack detection
+            (dos, scores["connection_rate"]),
+            # Port scan detection
+            (diverse_scan | (scanner > 0),
+             np.maximum(scanner, np.where(diverse_scan, scores["connection_diversity"], 0.0))),
+            # Data exfiltration detection
+            ((columns.payload_size > 10000) & (scores["packet_size"] > 0.7),
+             scores["packet_size"]),
+            # Command and control traffic
+            (columns.protocol_in(["tcp", "https"]) & (scores["protocol_anomaly"] > 0.7),
+             scores["protocol_anomaly"]),
+            # Malware or exploit payload
+            (np.full(count, scores["payload_anomaly"] > 0.8),
+             scores["payload_anomaly"]),
+            # Brute force attempt
+            (brute_force, scores["connection_rate"])
+        ]
+        
+        # Unknown but suspicious, as sure as the batch or the record's own entity deviation
+        overall_score = sum(scores.values()) / len(scores)
+        
+        threat_types = np.select([mask for mask, _ in rules], np.arange(len(rules)), default=len(rules))
+        confidences = np.select([threat_types == t for t in range(len(rules))],
+                                [np.broadcast_to(confidence, count) for _, confidence in rules],
+                                default=np.maximum(overall_score, record_scores["entity"]))
+        return threat_types, confidences
     
     def _generate_threat_description(self, threat_type: str, traffic: Dict[str, Any]) -> str:
         """Generate a human-readable description of the threat."""
@@ -372,24 +463,87 @@ class DetectionAgent(Agent):
         
         return descriptions.get(threat_type, f"Unknown threat type detected in traffic")
     
-    def _is_duplicate_alert(self, threat: Dict[str, Any]) -> bool:
-        """Check if an alert is a duplicate of a recently generated alert."""
-        for recent in self.recent_alerts:
-            if (recent["source_ip"] == threat["source_ip"] and
-                recent["destination_ip"] == threat["destination_ip"] and
-                recent["type"] == threat["type"] and
-                abs(recent["timestamp"] - threat["timestamp"]) < 300):  # Within 5 minutes
-                return True
-        return False
+    def _new_alerts(self, columns: TrafficColumns, threat_types: np.ndarray,
+                    positions: np.ndarray) -> np.ndarray:
+        """
+        Filter alert candidates through the deduplication index.
+        
+        Args:
+            columns: Candidate traffic records
+            threat_types: Threat type index per candidate
+            positions: Candidates to be reported, in record order
+            
+        Returns:
+            Positions of the candidates that do not repeat a recent alert
+        """
+        if not len(positions):
+            return positions
+        
+        # Key on (source, destination) packed into 64 bits, plus the threat type
+        pairs = (columns.source_ip[positions].astype(np.uint64) << np.uint64(32)) | columns.destination_ip[positions]
+        types = threat_types[positions]
+        timestamps = columns.timestamp[positions]
+        
+        self.alert_index.expire(float(timestamps.min()))
+        
+        # Only the first alert per key in a batch can be new; index those one by one
+        selected = self.alert_index.first_per_key(pairs, timestamps, types)
+        new = [
+            position
+            for position, pair, threat_type, timestamp in zip(positions[selected].tolist(), pairs[selected].tolist(),
+                                                              types[selected].tolist(), timestamps[selected].tolist())
+            if not self.alert_index.check((pair, threat_type), timestamp)
+        ]
+        return np.array(new, dtype=np.int64)
     
     def _check_baseline(self) -> Dict[str, Any]:
         """Return the current baseline statistics and status."""
         return {
             "baseline_established": self.state["baseline_established"],
             "baseline_stats": self.state["baseline_stats"],
-            "traffic_history_size": len(self.traffic_history)
+            "records_seen": self.baseline.records_seen,
+            "entity_baselines": self.entity_baselines.stats()
         }
     
+    def _get_heavy_hitters(self, dimension: Optional[str], metric: str, k: int) -> Dict[str, Any]:
+        """
+        Return the heaviest keys of recent traffic.
+        
+        Args:
+            dimension: "source", "destination" or "source_port"; all when None
+            metric: "count" or "bytes"
+            k: Number of entries per dimension
+            
+        Returns:
+            Dictionary of heaviest entries per dimension
+        """
+        dimensions = HeavyHitters.DIMENSIONS if dimension is None else (dimension,)
+        if any(d not in HeavyHitters.DIMENSIONS for d in dimensions):
+            return {"error": f"Unknown heavy hitter dimension: {dimension}"}
+        if metric not in HeavyHitters.METRICS:
+            return {"error": f"Unknown heavy hitter metric: {metric}"}
+        return {
+            "metric": metric,
+            "heavy_hitters": {d: self.heavy_hitters.top(d, metric, int(k)) for d in dimensions}
+        }
+    
+    def _entity_profile(self, kind: str, entity: Any) -> Dict[str, Any]:
+        """
+        Return the baseline of one source, destination or port.
+        
+        Args:
+            kind: "source", "destination" or "port"
+            entity: IP address for sources and destinations, port number for ports
+            
+        Returns:
+            Dictionary with the entity's baseline statistics
+        """
+        if kind not in EntityBaselines.KINDS:
+            return {"error": f"Unknown entity kind: {kind}"}
+        if entity is None:
+            return {"error": "No entity provided"}
+        return self.entity_baselines.profile(kind, entity)
+    
     def _detect_simulation(self, attack_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Analyze simulated attack data to test detection capabilities.
@@ -448,7 +602,7 @@ class DetectionAgent(Agent):
             detection_prob = min(0.95, base_detection_prob * phase_modifier)
             
             # Determine if detected
-            is_detected = step.get("detected", random.random() < detection_prob)
+            is_detected = step.get("detected", self.rng.random() < detection_prob)
             
             # Update step with detection information
             step["detected"] = is_detected
@@ -460,7 +614,7 @@ class DetectionAgent(Agent):
                     "phase": phase,
                     "technique": technique,
                     "detection_time": "real-time" if detection_prob > 0.7 else "delayed",
-                    "confidence": detection_prob * random.uniform(0.8, 1.0)
+                    "confidence": detection_prob * self.rng.uniform(0.8, 1.0)
                 })
             else:
                 missed_steps.append({
@@ -597,34 +751,22 @@ class DetectionAgent(Agent):
         else:
             return "low"
     
-    def _check_payload_anomaly(self, traffic: Dict[str, Any]) -> bool:
+    def _payload_anomalies(self, columns: TrafficColumns) -> np.ndarray:
         """
         Check for anomalies in the payload.
         In a real system, this would involve deeper analysis.
         
         Args:
-            traffic: A network traffic record
+            columns: Network traffic records in columnar form
             
         Returns:
-            Boolean indicating if payload appears anomalous
+            Boolean mask of records whose payload appears anomalous
         """
-        # For simulation, use the pre-labeled malicious flag if available
-        if "is_malicious" in traffic:
-            return traffic["is_malicious"]
-        
-        # For demo purposes, generate a simple heuristic
-        payload_size = traffic.get("payload_size", 0)
-        port = traffic.get("port", 0)
-        
-        # Unusual combinations that might indicate malicious traffic
-        suspicious_patterns = [
-            (port in [80, 443] and payload_size > 50000),  # Unusually large HTTP(S) payload
-            (port in [22, 23] and payload_size > 5000),    # Unusually large SSH/Telnet payload
-            (port in [53] and payload_size > 1000),        # Unusually large DNS payload
-            (port in [25] and payload_size > 10000)        # Unusually large SMTP payload
-        ]
+        # For demo purposes, flag unusual port and payload size combinations
+        suspicious = columns.payload_size > self.PAYLOAD_LIMITS[columns.port & 0xFFFF]
         
-        return any(suspicious_patterns)
+        # For simulation, use the pre-labeled malicious flag if available
+        return np.where(columns.labelled, columns.is_malicious, suspicious)
     
     def _summarize_anomalies(self, anomaly_scores: Dict[str, float]) -> Dict[str, Any]:
         """
@@ -0,0 +1,149 @@
+import logging
+from typing import Dict, Any, List, Optional
+import numpy as np
+
+from agents.baseline import decay_factor
+from agents.columns import TrafficColumns, format_ip
+from agents.sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+class HeavyHitters:
+    """
+    Heaviest sources, destinations and (source, port) pairs of recent traffic.
+    Each dimension is summarized twice with Space-Saving, by record count
+    and by payload bytes, in bounded memory. A batch is aggregated per key
+    first, so an update costs one unique per dimension plus a merge of at
+    most `capacity` monitored keys. Weights decay by half every `halflife`
+    seconds of record time, so the summaries describe current traffic.
+    """
+    
+    DIMENSIONS = ("source", "destination", "source_port")
+    METRICS = ("count", "bytes")
+    
+    def __init__(self, capacity: int = 1024, halflife: float = 60.0):
+        """
+        Initialize empty summaries.
+        
+        Args:
+            capacity: Keys monitored per summary
+            halflife: Seconds of record time after which old traffic weighs half
+        """
+        self.capacity = capacity
+        self.halflife = halflife
+        self.summaries = {
+            (dimension, metric): SpaceSaving(capacity)
+            for dimension in self.DIMENSIONS for metric in self.METRICS
+        }
+        self.last_time: Optional[float] = None
+    
+    @staticmethod
+    def keys(dimension: str, columns: TrafficColumns) -> np.ndarray:
+        """
+        Get the key of every record in a dimension.
+        
+        Args:
+            dimension: One of DIMENSIONS
+            columns: Traffic records
+        
+        Returns:
+            int64 keys; (source, port) pairs pack the port below the address
+        """
+        if dimension == "source":
+            return columns.source_ip.astype(np.int64)
+        if dimension == "destination":
+            return columns.destination_ip.astype(np.int64)
+        return (columns.source_ip.astype(np.int64) << 16) | (columns.port & 0xFFFF)
+    
+    def update(self, columns: TrafficColumns) -> None:
+        """
+        Fold a batch into the summaries.
+        
+        Args:
+            columns: Traffic records
+        """
+        if not len(columns):
+            return
+        
+        latest = float(columns.timestamp.max())
+        if self.last_time is not None and latest > self.last_time:
+            factor = decay_factor(latest - self.last_time, self.halflife)
+            for summary in self.summaries.values():
+                summary.decay(factor)
+        self.last_time = latest if self.last_time is None else max(self.last_time, latest)
+        
+        payload = columns.payload_size.astype(np.float64)
+        for dimension in self.DIMENSIONS:
+            keys, inverse, counts = np.unique(self.keys(dimension, columns), return_inverse=True, return_counts=True)
+            self.summaries[(dimension, "count")].update(keys, counts.astype(np.float64))
+            self.summaries[(dimension, "bytes")].update(keys, np.bincount(inverse, weights=payload))
+    
+    def heavy(self, dimension: str, share: float, metric: str = "count") -> np.ndarray:
+        """
+        Get the keys carrying at least a share of recent traffic.
+        
+        Args:
+            dimension: One of DIMENSIONS
+            share: Fraction of the decayed total
+            metric: "count" or "bytes"
+        
+        Returns:
+            Sorted keys, in the form returned by keys()
+        """
+        return self.summaries[(dimension, metric)].heavy(share)
+    
+    def contains(self, dimension: str, columns: TrafficColumns, heavy: np.ndarray) -> np.ndarray:
+        """
+        Get a mask of the records whose key is among some heavy keys.
+        
+        Args:
+            dimension: One of DIMENSIONS
+            columns: Traffic records
+            heavy: Sorted keys, e.g. from heavy()
+        
+        Returns:
+            Boolean mask per record
+        """
+        if not len(heavy):
+            return np.zeros(len(columns), dtype=bool)
+        keys = self.keys(dimension, columns)
+        positions = np.minimum(np.searchsorted(heavy, keys), len(heavy) - 1)
+        return heavy[positions] == keys
+    
+    @staticmethod
+    def describe(dimension: str, key: int) -> Dict[str, Any]:
+        """Render a key of a dimension as addresses and ports."""
+        if dimension == "source":
+            return {"source_ip": format_ip(key)}
+        if dimension == "destination":
+            return {"destination_ip": format_ip(key)}
+        return {"source_ip": format_ip(key >> 16), "port": int(key & 0xFFFF)}
+    
+    def top(self, dimension: str, metric: str = "count", k: int = 10) -> List[Dict[str, Any]]:
+        """
+        Get the heaviest keys of a dimension.
+        
+        Args:
+            dimension: One of DIMENSIONS
+            metric: "count" or "bytes"
+            k: Number of entries
+        
+        Returns:
+            Entries heaviest first, with the estimated weight, its maximum
+            overestimate and the guaranteed share of the decayed total
+        """
+        summary = self.summaries[(dimension, metric)]
+        keys, weights, errors = summary.top(k)
+        return [
+            dict(self.describe(dimension, key), **{
+                metric: weight,
+                "error": error,
+                "guaranteed_share": (weight - error) / summary.total if summary.total > 0 else 0.0
+            })
+            for key, weight, error in zip(keys.tolist(), weights.tolist(), errors.tolist())
+        ]
+    
+    def clear(self) -> None:
+        """Forget all traffic."""
+        self.summaries = {key: SpaceSaving(self.capacity) for key in self.summaries}
+        self.last_time = None
@@ -1,5 +1,4 @@
 import logging
-import random
 from typing import Dict, Any, List
 import numpy as np
 from agents.base import Agent
@@ -215,7 +214,7 @@ class OffenseAgent(Agent):
         
         exploitations = []
         for vuln in exploitable_vulns:
-            exploitation_success = random.random() < self.vulnerability_types.get(vuln.get("type", ""), 0.5)
+            exploitation_success = self.rng.random() < self.vulnerability_types.get(vuln.get("type", ""), 0.5)
             exploitation = {
                 "vulnerability": vuln["name"],
                 "success": exploitation_success,
@@ -259,25 +258,22 @@ class OffenseAgent(Agent):
         
         # Base number of vulnerabilities to discover depends on system complexity and scan depth
         service_count = len(services)
-        base_vuln_count = int(1 + service_count * depth_factor * random.uniform(0.7, 1.3))
+        base_vuln_count = int(1 + service_count * depth_factor * self.rng.uniform(0.7, 1.3))
         
         # Generate system-specific vulnerabilities
         for _ in range(base_vuln_count):
             # Select a random vulnerability type with higher probability for common types
-            vuln_type = random.choices(
-                list(self.vulnerability_types.keys()),
-                weights=[self.vulnerability_types[vt] for vt in self.vulnerability_types],
-                k=1
-            )[0]
+            weights = np.array(list(self.vulnerability_types.values()))
+            vuln_type = str(self.rng.choice(list(self.vulnerability_types.keys()), p=weights / weights.sum()))
             
             # Determine severity based on vulnerability type and random factor
             base_severity = self.vulnerability_types[vuln_type]
-            severity_score = base_severity * random.uniform(0.8, 1.2)
+            severity_score = base_severity * self.rng.uniform(0.8, 1.2)
             severity = "critical" if severity_score > 0.8 else "high" if severity_score > 0.6 else "medium" if severity_score > 0.4 else "low"
             
             # Create vulnerability description
             if vuln_type == "unpatched_software" and services:
-                service = random.choice(services)
+                service = services[self.rng.integers(0, len(services))]
                 vuln_name = f"Unpatched {service['name']} {service.get('version', '')}"
                 description = f"Missing security patches for {service['name']} could allow remote code execution"
             elif vuln_type == "weak_credentials":
@@ -287,7 +283,7 @@ class OffenseAgent(Agent):
                 vuln_name = "Security misconfiguration"
                 description = "System is configured with insecure settings"
             elif vuln_type == "open_ports" and services:
-                service = random.choice(services)
+                service = services[self.rng.integers(0, len(services))]
                 vuln_name = f"Unnecessary open port: {service.get('port', 'unknown')}"
                 description = f"Port {service.get('port', 'unknown')} ({service['name']}) is exposed unnecessarily"
             else:
@@ -301,7 +297,7 @@ class OffenseAgent(Agent):
                 "description": description,
                 "affected_system": system.get("name", "unknown"),
                 "exploitation_difficulty": 1 - self.vulnerability_types.get(vuln_type, 0.5),
-                "remediation_available": random.random() > 0.1  # Most vulnerabilities have remediation
+                "remediation_available": self.rng.random() > 0.1  # Most vulnerabilities have remediation
             }
             
             vulnerabilities.append(vulnerability)
@@ -329,7 +325,7 @@ class OffenseAgent(Agent):
             "technique": "reconnaissance",
             "description": "Gather information about target systems",
             "purpose": "information_gathering",
-            "detected": random.random() < 0.3  # Low chance of detection
+            "detected": self.rng.random() < 0.3  # Low chance of detection
         })
         
         # Vulnerability scanning
@@ -338,7 +334,7 @@ class OffenseAgent(Agent):
             "technique": "vulnerability_scanning",
             "description": "Scan for exploitable vulnerabilities",
             "purpose": "vulnerability_identification",
-            "detected": random.random() < 0.5  # Medium chance of detection
+            "detected": self.rng.random() < 0.5  # Medium chance of detection
         })
         
         # Add attack-specific path elements
@@ -350,35 +346,35 @@ class OffenseAgent(Agent):
                     "technique": "exploitation",
                     "description": "Exploit vulnerable service for initial access",
                     "purpose": "system_access",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "execution",
                     "technique": "privilege_escalation",
                     "description": "Escalate privileges to gain administrative access",
                     "purpose": "higher_privileges",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "persistence",
                     "technique": "persistence",
                     "description": "Establish persistence mechanisms",
                     "purpose": "maintain_access",
-                    "detected": random.random() < 0.5
+                    "detected": self.rng.random() < 0.5
                 },
                 {
                     "phase": "lateral_movement",
                     "technique": "lateral_movement",
                     "description": "Move laterally to access additional systems",
                     "purpose": "expand_access",
-                    "detected": random.random() < 0.7
+                    "detected": self.rng.random() < 0.7
                 },
                 {
                     "phase": "impact",
                     "technique": "exploitation",
                     "description": "Deploy ransomware payload and encrypt files",
                     "purpose": "data_encryption",
-                    "detected": random.random() < 0.8
+                    "detected": self.rng.random() < 0.8
                 }
             ])
         elif attack_type == "data_exfiltration":
@@ -389,42 +385,42 @@ class OffenseAgent(Agent):
                     "technique": "exploitation",
                     "description": "Exploit vulnerable web application",
                     "purpose": "system_access",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "execution",
                     "technique": "privilege_escalation",
                     "description": "Escalate privileges to access sensitive data",
                     "purpose": "higher_privileges",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "discovery",
                     "technique": "lateral_movement",
                     "description": "Discover location of valuable data",
                     "purpose": "data_discovery",
-                    "detected": random.random() < 0.5
+                    "detected": self.rng.random() < 0.5
                 },
                 {
                     "phase": "collection",
                     "technique": "exploitation",
                     "description": "Collect and stage sensitive data",
                     "purpose": "data_collection",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "exfiltration",
                     "technique": "data_exfiltration",
                     "description": "Exfiltrate data through encrypted channel",
                     "purpose": "data_theft",
-                    "detected": random.random() < 0.7
+                    "detected": self.rng.random() < 0.7
                 },
                 {
                     "phase": "covering_tracks",
                     "technique": "evasion",
                     "description": "Clear logs and remove evidence",
                     "purpose": "evasion",
-                    "detected": random.random() < 0.5
+                    "detected": self.rng.random() < 0.5
                 }
             ])
         else:
@@ -435,21 +431,21 @@ class OffenseAgent(Agent):
                     "technique": "exploitation",
                     "description": "Exploit vulnerability for initial access",
                     "purpose": "system_access",
-                    "detected": random.random() < 0.6
+                    "detected": self.rng.random() < 0.6
                 },
                 {
                     "phase": "execution",
                     "technique": "exploitation",
                     "description": "Execute malicious code on target system",
                     "purpose": "code_execution",
-                    "detected": random.random() < 0.7
+                    "detected": self.rng.random() < 0.7
                 },
                 {
                     "phase": "persistence",
                     "technique": "persistence",
                     "description": "Establish persistence mechanism",
                     "purpose": "maintain_access",
-                    "detected": random.random() < 0.5
+                    "detected": self.rng.random() < 0.5
                 }
             ])
         
@@ -555,16 +551,16 @@ class OffenseAgent(Agent):
     def _get_post_exploitation_steps(self) -> List[Dict[str, Any]]:
         """Generate post-exploitation steps for a successful exploitation."""
         possible_steps = [
-            {"action": "Credential harvesting", "success": random.random() < 0.7},
-            {"action": "Privilege escalation", "success": random.random() < 0.6},
-            {"action": "Lateral movement", "success": random.random() < 0.5},
-            {"action": "Persistence establishment", "success": random.random() < 0.8},
-            {"action": "Data exfiltration", "success": random.random() < 0.4}
+            {"action": "Credential harvesting", "success": self.rng.random() < 0.7},
+            {"action": "Privilege escalation", "success": self.rng.random() < 0.6},
+            {"action": "Lateral movement", "success": self.rng.random() < 0.5},
+            {"action": "Persistence establishment", "success": self.rng.random() < 0.8},
+            {"action": "Data exfiltration", "success": self.rng.random() < 0.4}
         ]
         
         # Select a random subset of steps
-        selected_count = random.randint(1, len(possible_steps))
-        return random.sample(possible_steps, selected_count)
+        selected_count = int(self.rng.integers(1, len(possible_steps) + 1))
+        return [possible_steps[i] for i in self.rng.choice(len(possible_steps), selected_count, replace=False)]
     
     def _generate_security_recommendations(self, vulnerabilities: List[Dict[str, Any]], 
                                          exploitations: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -0,0 +1,173 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from agents.columns import TrafficColumns, format_ip
+from agents.sketches import HyperLogLogArray
+
+logger = logging.getLogger(__name__)
+
+class ScanDetector:
+    """
+    Distinct-target scan detector over a sliding time window.
+    Every source has a small HyperLogLog of the distinct (destination,
+    port) pairs it contacted. The window is split into `panes` generations
+    of HyperLogLog arrays; a generation is cleared when its time comes
+    round again, and a source's estimate is taken over the union of all
+    generations, so it covers between (panes - 1) / panes of the window
+    and the whole window of record time, however the traffic was batched.
+    Slow scans spread over many batches therefore accumulate until they
+    cross the threshold.
+    
+    Sources are hashed into a fixed number of slots, and sources sharing a
+    slot add up, so each generation has `depth` independently hashed
+    arrays and the smallest estimate is used, as in a Count-Min sketch.
+    The defaults are chosen so that ordinary sources do not add up past
+    the threshold:
+    
+    - Two slots per expected source: a source shares a slot with three or
+      more others (enough for sources with ~25 targets to sum past 100)
+      with probability about 1.4% per array, so about 3e-6 in all three
+      arrays of depth 3.
+    - Precision 6 (64 registers) gives about 13% standard error, so a
+      source must reach roughly 1.3x the threshold to be flagged reliably
+      and stays unflagged below about 0.75x.
+    - Two panes keep memory at panes * depth * slots * 64 bytes, about
+      768 bytes per expected source: 24 MiB for the default 32768 sources,
+      220 MiB for 300000. Recording a record costs one register update
+      per array.
+    """
+    
+    def __init__(self, window: float = 600.0, threshold: float = 100.0, expected_sources: int = 32768,
+                 panes: int = 2, precision: int = 6, depth: int = 3):
+        """
+        Initialize an empty detector.
+        
+        Args:
+            window: Seconds of record time over which targets are counted
+            threshold: Distinct (destination, port) pairs marking a source as a scanner
+            expected_sources: Distinct sources expected within a window; each
+                array gets twice as many slots
+            panes: Generations the window is split into
+            precision: log2 of the registers per sketch
+            depth: Independently hashed arrays per generation
+        """
+        self.window = window
+        self.threshold = threshold
+        self.panes = panes
+        self.pane = window / panes
+        self.slots = 2 * max(1, int(expected_sources))
+        self.generations = [
+            [HyperLogLogArray(self.slots, precision, seed=row) for row in range(depth)]
+            for _ in range(panes)
+        ]
+        self.head: Optional[int] = None
+    
+    @property
+    def nbytes(self) -> int:
+        return sum(sketch.nbytes for generation in self.generations for sketch in generation)
+    
+    @staticmethod
+    def targets(columns: TrafficColumns) -> np.ndarray:
+        """Get the (destination, port) pair of every record, packed into 64 bits."""
+        return (columns.destination_ip.astype(np.uint64) << np.uint64(16)) | (columns.port & 0xFFFF).astype(np.uint64)
+    
+    def update(self, columns: TrafficColumns) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Record a batch and estimate the distinct targets of its sources.
+        
+        Args:
+            columns: Traffic records
+        
+        Returns:
+            Tuple of (distinct sources of the batch, estimated distinct
+            targets of each over the window)
+        """
+        if not len(columns):
+            return np.zeros(0, dtype=np.uint32), np.zeros(0)
+        
+        panes = np.floor(columns.timestamp / self.pane).astype(np.int64)
+        newest = int(panes.max())
+        
+        # Clear the generations whose panes have left the window
+        if self.head is None:
+            self.head = newest
+        elif newest > self.head:
+            for pane in range(max(self.head + 1, newest - self.panes + 1), newest + 1):
+                for sketch in self.generations[pane % self.panes]:
+                    sketch.clear()
+            self.head = newest
+        
+        # Records older than the window are not counted
+        current = panes > self.head - self.panes
+        targets = self.targets(columns)
+        for pane in np.unique(panes[current]).tolist():
+            selected = panes == pane
+            for sketch in self.generations[pane % self.panes]:
+                sketch.add(columns.source_ip[selected], targets[selected])
+        
+        sources = np.unique(columns.source_ip)
+        return sources, self.estimate(sources)
+    
+    def estimate(self, sources: np.ndarray) -> np.ndarray:
+        """
+        Estimate the distinct targets of sources over the window.
+        
+        Args:
+            sources: Source addresses
+        
+        Returns:
+            Estimated distinct (destination, port) pairs per source
+        """
+        estimates = None
+        for row, sketch in enumerate(self.generations[0]):
+            slots = sketch.slot_of(sources)
+            registers = sketch.registers[slots]
+            for generation in self.generations[1:]:
+                registers = np.maximum(registers, generation[row].registers[slots])
+            row_estimates = sketch.estimate_registers(registers)
+            estimates = row_estimates if estimates is None else np.minimum(estimates, row_estimates)
+        return estimates
+    
+    def scores(self, columns: TrafficColumns, sources: np.ndarray, estimates: np.ndarray) -> np.ndarray:
+        """
+        Map source estimates to a scan confidence per record.
+        
+        Args:
+            columns: Traffic records
+            sources: Sorted distinct sources, as returned by update()
+            estimates: Estimated distinct targets per source
+        
+        Returns:
+            0 for records of sources below the threshold; otherwise 0.6 at
+            the threshold rising to 1.0 at twice the threshold
+        """
+        confidence = np.where(estimates >= self.threshold,
+                              np.minimum(1.0, 0.6 + 0.4 * (estimates / self.threshold - 1)), 0.0)
+        return confidence[np.searchsorted(sources, columns.source_ip)]
+    
+    def scanners(self, sources: np.ndarray, estimates: np.ndarray, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        List the sources above the threshold, most targets first.
+        
+        Args:
+            sources: Distinct sources
+            estimates: Estimated distinct targets per source
+            limit: Maximum number of entries
+        
+        Returns:
+            Entries with the source address and its estimated distinct targets
+        """
+        flagged = np.flatnonzero(estimates >= self.threshold)
+        flagged = flagged[np.argsort(-estimates[flagged], kind="stable")][:limit]
+        return [
+            {"source_ip": format_ip(source), "distinct_targets": float(estimate)}
+            for source, estimate in zip(sources[flagged].tolist(), estimates[flagged].tolist())
+        ]
+    
+    def clear(self) -> None:
+        """Forget all traffic."""
+        for generation in self.generations:
+            for sketch in generation:
+                sketch.clear()
+        self.head = None
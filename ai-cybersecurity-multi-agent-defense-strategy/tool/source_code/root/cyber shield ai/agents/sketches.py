@@ -0,0 +1,333 @@
+import logging
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_GOLDEN = 0x9E3779B97F4A7C15
+_MIX1 = np.uint64(0xBF58476D1CE4E5B9)
+_MIX2 = np.uint64(0x94D049BB133111EB)
+
+def mix64(keys: np.ndarray, seed: int = 0) -> np.ndarray:
+    """
+    Hash integer keys with the SplitMix64 finalizer.
+    
+    Args:
+        keys: Integer keys
+        seed: Selects an independent hash function
+    
+    Returns:
+        uint64 hash per key
+    """
+    x = np.asarray(keys).astype(np.uint64) + np.uint64(_GOLDEN * (seed + 1) & 0xFFFFFFFFFFFFFFFF)
+    x = (x ^ (x >> np.uint64(30))) * _MIX1
+    x = (x ^ (x >> np.uint64(27))) * _MIX2
+    return x ^ (x >> np.uint64(31))
+
+def _bit_length(x: np.ndarray) -> np.ndarray:
+    """Number of significant bits of each uint64 value."""
+    # frexp's exponent is the bit length; each 32-bit half converts to float exactly
+    high = np.frexp((x >> np.uint64(32)).astype(np.float64))[1]
+    low = np.frexp((x & np.uint64(0xFFFFFFFF)).astype(np.float64))[1]
+    return np.where(high > 0, high + 32, low)
+
+class CountMinSketch:
+    """
+    Count-Min sketch of weighted key frequencies.
+    `depth` rows of `width` counters each; a key adds to one counter per
+    row and its estimate is the smallest of them, which never undercounts.
+    Counters are floats so the whole sketch can be decayed.
+    """
+    
+    def __init__(self, width: int = 65536, depth: int = 4):
+        """
+        Initialize an empty sketch.
+        
+        Args:
+            width: Counters per row (rounded up to a power of two)
+            depth: Rows, each with its own hash function
+        """
+        self.width = 1 << max(0, int(width) - 1).bit_length()
+        self.depth = depth
+        self.table = np.zeros((depth, self.width))
+        self.total = 0.0
+        self._mask = np.uint64(self.width - 1)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+    
+    def _columns(self, keys: np.ndarray, row: int) -> np.ndarray:
+        return (mix64(keys, row) & self._mask).astype(np.int64)
+    
+    def add(self, keys: np.ndarray, counts: Optional[np.ndarray] = None) -> None:
+        """
+        Add occurrences of keys.
+        
+        Args:
+            keys: Integer keys, repeats allowed
+            counts: Optional weight per key; 1 each by default
+        """
+        if not len(keys):
+            return
+        for row in range(self.depth):
+            self.table[row] += np.bincount(self._columns(keys, row), weights=counts, minlength=self.width)
+        self.total += float(len(keys) if counts is None else np.sum(counts))
+    
+    def estimate(self, keys: np.ndarray) -> np.ndarray:
+        """Get the estimated count of each key."""
+        estimates = self.table[0, self._columns(keys, 0)]
+        for row in range(1, self.depth):
+            estimates = np.minimum(estimates, self.table[row, self._columns(keys, row)])
+        return estimates
+    
+    def decay(self, factor: float) -> None:
+        """Scale every count."""
+        self.table *= factor
+        self.total *= factor
+
+class HyperLogLogArray:
+    """
+    Fixed array of HyperLogLog sketches indexed by hashed entity.
+    Each of `slots` sketches has 2 ** precision one-byte registers, so
+    memory does not depend on the number of entities; entities sharing a
+    slot merge their counts. With one slot this is a plain HyperLogLog.
+    """
+    
+    def __init__(self, slots: int = 65536, precision: int = 6, seed: int = 0):
+        """
+        Initialize empty sketches.
+        
+        Args:
+            slots: Number of sketches
+            precision: log2 of the registers per sketch; the relative error is
+                about 1.04 / sqrt(2 ** precision)
+            seed: Selects the hash placing entities in slots; arrays with
+                different seeds collide on different entities
+        """
+        self.slots = slots
+        self.precision = precision
+        self.seed = seed
+        self.registers_per_slot = 1 << precision
+        self.registers = np.zeros((slots, self.registers_per_slot), dtype=np.uint8)
+        
+        m = self.registers_per_slot
+        self._alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    
+    @property
+    def nbytes(self) -> int:
+        return self.registers.nbytes
+    
+    def slot_of(self, entities: np.ndarray) -> np.ndarray:
+        """Get the sketch slot of each entity."""
+        return (mix64(entities, 101 + self.seed) % np.uint64(self.slots)).astype(np.int64)
+    
+    def add(self, entities: np.ndarray, items: np.ndarray) -> None:
+        """
+        Record that each entity was seen with an item.
+        
+        Args:
+            entities: Integer entity per observation
+            items: Integer item per observation, e.g. a peer address
+        """
+        if not len(entities):
+            return
+        slots = self.slot_of(entities)
+        hashes = mix64(mix64(items, 202) ^ mix64(entities, 303))
+        
+        register = (hashes & np.uint64(self.registers_per_slot - 1)).astype(np.int64)
+        rank = (64 - self.precision + 1) - _bit_length(hashes >> np.uint64(self.precision))
+        np.maximum.at(self.registers, (slots, register), rank.astype(np.uint8))
+    
+    def estimate(self, entities: np.ndarray) -> np.ndarray:
+        """
+        Estimate the number of distinct items seen with each entity.
+        
+        Args:
+            entities: Integer entities
+        
+        Returns:
+            Estimated distinct count per entity
+        """
+        return self.estimate_registers(self.registers[self.slot_of(entities)])
+    
+    def estimate_registers(self, registers: np.ndarray) -> np.ndarray:
+        """
+        Apply the HyperLogLog estimator to rows of registers.
+        
+        Args:
+            registers: Array of shape (n, 2 ** precision)
+        
+        Returns:
+            Estimated distinct count per row
+        """
+        m = self.registers_per_slot
+        raw = self._alpha * m * m / np.exp2(-registers.astype(np.float64)).sum(axis=1)
+        
+        # Linear counting is more accurate while many registers are still empty
+        zeros = np.count_nonzero(registers == 0, axis=1)
+        small = (raw <= 2.5 * m) & (zeros > 0)
+        raw[small] = m * np.log(m / zeros[small])
+        return raw
+    
+    def clear(self) -> None:
+        """Forget every item."""
+        self.registers.fill(0)
+
+class MomentTable:
+    """
+    Decayed mean and variance per hashed entity.
+    A fixed number of slots each hold a weight, mean and sum of squared
+    deviations; a batch is grouped by slot with bincount and merged with
+    Chan's parallel update, so memory is flat in the number of entities.
+    """
+    
+    def __init__(self, slots: int = 262144):
+        """
+        Initialize empty statistics.
+        
+        Args:
+            slots: Number of entity slots
+        """
+        self.slots = slots
+        self.weight = np.zeros(slots)
+        self.mean = np.zeros(slots)
+        self.m2 = np.zeros(slots)
+    
+    @property
+    def nbytes(self) -> int:
+        return self.weight.nbytes + self.mean.nbytes + self.m2.nbytes
+    
+    def slot_of(self, entities: np.ndarray) -> np.ndarray:
+        """Get the slot of each entity."""
+        return (mix64(entities, 404) % np.uint64(self.slots)).astype(np.int64)
+    
+    def update(self, entities: np.ndarray, values: np.ndarray) -> None:
+        """
+        Add one value per entity occurrence.
+        
+        Args:
+            entities: Integer entity per value
+            values: Observed values
+        """
+        if not len(entities):
+            return
+        slots, inverse = np.unique(self.slot_of(entities), return_inverse=True)
+        values = np.asarray(values, dtype=np.float64)
+        
+        weight = np.bincount(inverse).astype(np.float64)
+        mean = np.bincount(inverse, weights=values) / weight
+        m2 = np.bincount(inverse, weights=(values - mean[inverse]) ** 2)
+        
+        old_weight = self.weight[slots]
+        total = old_weight + weight
+        delta = mean - self.mean[slots]
+        self.mean[slots] += delta * weight / total
+        self.m2[slots] += m2 + delta * delta * old_weight * weight / total
+        self.weight[slots] = total
+    
+    def stats(self, entities: np.ndarray):
+        """
+        Get the statistics of each entity.
+        
+        Args:
+            entities: Integer entities
+        
+        Returns:
+            Tuple of (weight, mean, standard deviation) arrays
+        """
+        slots = self.slot_of(entities)
+        weight = self.weight[slots]
+        std = np.sqrt(np.divide(self.m2[slots], weight, out=np.zeros(len(slots)), where=weight > 0))
+        return weight, self.mean[slots], std
+    
+    def decay(self, factor: float) -> None:
+        """Scale down the weight of everything seen so far."""
+        self.weight *= factor
+        self.m2 *= factor
+
+class SpaceSaving:
+    """
+    Space-Saving summary of the heaviest keys in bounded memory.
+    At most `capacity` keys are monitored, each with a weight and the
+    largest possible overestimate of it. A batch is merged in one step,
+    as when merging two summaries: monitored keys add their batch weight;
+    a new key starts from the smallest monitored weight, which becomes
+    its error; then only the `capacity` heaviest keys are kept. Any key
+    whose true weight exceeds total / capacity is always monitored.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        """
+        Initialize an empty summary.
+        
+        Args:
+            capacity: Maximum number of monitored keys
+        """
+        self.capacity = capacity
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.weights = np.zeros(0)
+        self.errors = np.zeros(0)
+        self.total = 0.0
+    
+    def update(self, keys: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Merge a batch of aggregated weights.
+        
+        Args:
+            keys: Distinct integer keys
+            weights: Batch weight of each key
+        """
+        if not len(keys):
+            return
+        floor = float(self.weights.min()) if len(self.keys) >= self.capacity else 0.0
+        
+        merged = np.union1d(self.keys, keys)
+        merged_weights = np.zeros(len(merged))
+        merged_errors = np.full(len(merged), floor)
+        monitored = np.searchsorted(merged, self.keys)
+        merged_weights[monitored] = self.weights
+        merged_errors[monitored] = self.errors
+        
+        # Keys that were not monitored may have been evicted with up to `floor` weight
+        unmonitored = np.ones(len(merged), dtype=bool)
+        unmonitored[monitored] = False
+        merged_weights[unmonitored] = floor
+        merged_weights[np.searchsorted(merged, keys)] += weights
+        
+        if len(merged) > self.capacity:
+            keep = np.sort(np.argpartition(merged_weights, -self.capacity)[-self.capacity:])
+            merged, merged_weights, merged_errors = merged[keep], merged_weights[keep], merged_errors[keep]
+        self.keys, self.weights, self.errors = merged, merged_weights, merged_errors
+        self.total += float(np.sum(weights))
+    
+    def top(self, k: int):
+        """
+        Get the heaviest monitored keys.
+        
+        Args:
+            k: Number of keys
+        
+        Returns:
+            Tuple of (keys, weights, errors) arrays, heaviest first
+        """
+        order = np.argsort(-self.weights, kind="stable")[:k]
+        return self.keys[order], self.weights[order], self.errors[order]
+    
+    def heavy(self, share: float) -> np.ndarray:
+        """
+        Get the keys guaranteed to carry at least a share of the total weight.
+        
+        Args:
+            share: Fraction of the total weight
+        
+        Returns:
+            Sorted keys whose weight minus error reaches the share
+        """
+        return self.keys[self.weights - self.errors >= share * self.total]
+    
+    def decay(self, factor: float) -> None:
+        """Scale every weight and error."""
+        self.weights *= factor
+        self.errors *= factor
+        self.total *= factor
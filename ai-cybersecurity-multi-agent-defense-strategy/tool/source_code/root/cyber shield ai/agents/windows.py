@@ -0,0 +1,207 @@
+import logging
+from typing import Dict, Any, Optional, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class WindowAggregator:
+    """
+    Tumbling and sliding time windows over record timestamps.
+    Records are bucketed by timestamp into panes of `pane` seconds, kept
+    in a ring just large enough for the widest window. Each pane holds
+    incremental aggregates (records and bytes), and a window is the sum
+    of its panes: a sliding window of width W covers the last W seconds
+    of complete panes, a tumbling window the last complete W-aligned
+    block. The current window additionally includes the open pane, so it
+    reflects traffic up to the newest record. Panes depend only on
+    timestamps, so window results are the same however the records were
+    batched.
+    """
+    
+    def __init__(self, widths: Sequence[float] = (1.0, 10.0, 60.0), pane: float = 1.0):
+        """
+        Initialize empty windows.
+        
+        Args:
+            widths: Window widths in seconds, each a multiple of the pane
+            pane: Pane width in seconds
+        """
+        self.pane = pane
+        self.widths = tuple(widths)
+        self.spans = [int(round(w / pane)) for w in self.widths]
+        if any(span < 1 or abs(span * pane - w) > 1e-9 for span, w in zip(self.spans, self.widths)):
+            raise ValueError(f"Window widths {self.widths} must be multiples of the {pane}s pane")
+        
+        # One slot per complete pane of the widest window, plus the open pane
+        self.size = max(self.spans) + 1
+        self.records = np.zeros(self.size)
+        self.bytes = np.zeros(self.size)
+        self.first: Optional[int] = None
+        self.head: Optional[int] = None
+        self.latest: Optional[float] = None
+        self.late_records = 0
+    
+    def add(self, timestamps: np.ndarray, sizes: np.ndarray) -> Tuple[np.ndarray, int]:
+        """
+        Bucket records into panes.
+        The newest pane seen so far stays open; every pane before it is
+        closed. Records for an already closed pane still count towards
+        windows while the pane is in the ring, and are dropped as late once
+        it has left.
+        
+        Args:
+            timestamps: Record times in seconds
+            sizes: Payload bytes per record
+        
+        Returns:
+            Tuple of (record counts of the non-empty panes closed by this
+            call, number of empty panes closed)
+        """
+        if not len(timestamps):
+            return np.zeros(0), 0
+        panes = np.floor(np.asarray(timestamps, dtype=np.float64) / self.pane).astype(np.int64)
+        sizes = np.asarray(sizes, dtype=np.float64)
+        newest = int(panes.max())
+        latest = float(np.max(timestamps))
+        self.latest = latest if self.latest is None else max(self.latest, latest)
+        if self.head is None:
+            self.first = self.head = int(panes.min())
+        opened = self.head
+        
+        # Closed panes: the previously open one with its earlier records, and
+        # every pane of this batch before the newest
+        closed = np.zeros(0)
+        empty = 0
+        if newest > self.head:
+            closing = (panes >= self.head) & (panes < newest)
+            busy, counts = np.unique(panes[closing], return_counts=True)
+            counts = counts.astype(np.float64)
+            carried = self.records[self.head % self.size]
+            if carried:
+                if len(busy) and busy[0] == self.head:
+                    counts[0] += carried
+                else:
+                    busy = np.insert(busy, 0, self.head)
+                    counts = np.insert(counts, 0, carried)
+            closed = counts
+            empty = newest - self.head - len(busy)
+            
+            # Reuse the slots of panes that fall out of the ring
+            if newest - self.head >= self.size:
+                self.records.fill(0)
+                self.bytes.fill(0)
+            else:
+                slots = np.arange(self.head + 1, newest + 1) % self.size
+                self.records[slots] = 0
+                self.bytes[slots] = 0
+            self.head = newest
+        
+        # Lateness is measured against the newest pane seen so far, not this batch's;
+        # records for panes closed before this batch that have left the ring are dropped
+        in_ring = panes > self.head - self.size
+        self.late_records += int(np.count_nonzero(~in_ring & (panes < opened)))
+        slots = panes[in_ring] % self.size
+        self.records += np.bincount(slots, minlength=self.size)
+        self.bytes += np.bincount(slots, weights=sizes[in_ring], minlength=self.size)
+        return closed, int(empty)
+    
+    def _sum(self, start: int, stop: int) -> Tuple[float, float]:
+        """Sum the aggregates of panes [start, stop)."""
+        slots = np.arange(start, stop) % self.size
+        return float(self.records[slots].sum()), float(self.bytes[slots].sum())
+    
+    def sliding(self, width: float) -> Optional[Dict[str, float]]:
+        """
+        Get the sliding window of a width ending at the last complete pane.
+        Until the window has filled, it covers the complete panes seen so far.
+        
+        Args:
+            width: One of the configured widths
+        
+        Returns:
+            Window records, bytes and per-second rates, or None before any pane closed
+        """
+        if self.head is None or self.head == self.first:
+            return None
+        span = min(self.spans[self.widths.index(width)], self.head - self.first)
+        records, size = self._sum(self.head - span, self.head)
+        seconds = span * self.pane
+        return {"records": records, "bytes": size, "seconds": seconds,
+                "rate": records / seconds, "byte_rate": size / seconds}
+    
+    def current(self, width: float) -> Optional[Dict[str, float]]:
+        """
+        Get the window of a width ending at the newest record.
+        It covers the open pane up to the newest record, the complete panes
+        before it, and the pro-rated share of the oldest pane that still
+        falls inside the width. Until the width has filled, it covers the
+        record time seen so far.
+        
+        Args:
+            width: One of the configured widths
+        
+        Returns:
+            Window records, bytes and per-second rates, or None before any record time has passed
+        """
+        if self.head is None:
+            return None
+        span = self.spans[self.widths.index(width)]
+        history = self.latest - self.first * self.pane
+        seconds = min(width, history)
+        if seconds <= 0:
+            return None
+        
+        records, size = self._sum(max(self.head - span + 1, self.first), self.head + 1)
+        if history > width:
+            # Only the part of the oldest pane after (newest - width) is inside the window
+            share = 1.0 - min(1.0, (self.latest - self.head * self.pane) / self.pane)
+            oldest = (self.head - span) % self.size
+            records += share * self.records[oldest]
+            size += share * self.bytes[oldest]
+        return {"records": records, "bytes": size, "seconds": seconds,
+                "rate": records / seconds, "byte_rate": size / seconds}
+    
+    def tumbling(self, width: float) -> Optional[Dict[str, float]]:
+        """
+        Get the last complete tumbling window of a width.
+        
+        Args:
+            width: One of the configured widths
+        
+        Returns:
+            Window start, records, bytes and per-second rates, or None before one completed
+        """
+        if self.head is None:
+            return None
+        span = self.spans[self.widths.index(width)]
+        stop = (self.head // span) * span
+        if stop - span < self.first:
+            return None
+        records, size = self._sum(stop - span, stop)
+        seconds = span * self.pane
+        return {"start": (stop - span) * self.pane, "records": records, "bytes": size,
+                "seconds": seconds, "rate": records / seconds, "byte_rate": size / seconds}
+    
+    def clear(self) -> None:
+        """Forget every pane."""
+        self.records.fill(0)
+        self.bytes.fill(0)
+        self.first = self.head = None
+        self.latest = None
+        self.late_records = 0
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Summarize every window.
+        
+        Returns:
+            Dictionary with the current, sliding and tumbling windows keyed by
+            width, e.g. "10s", and the number of late records dropped
+        """
+        labels = [f"{w:g}s" for w in self.widths]
+        return {
+            "current": {label: self.current(w) for label, w in zip(labels, self.widths)},
+            "sliding": {label: self.sliding(w) for label, w in zip(labels, self.widths)},
+            "tumbling": {label: self.tumbling(w) for label, w in zip(labels, self.widths)},
+            "late_records": self.late_records
+        }
@@ -1,11 +1,25 @@
 # Simulation package initialization
+from simulation.archive import TrafficRecorder, TrafficReplayer
+from simulation.attacks import AttackGenerator, register_attack_generator
+from simulation.capture import NetFlowCsvReader, PcapReader
 from simulation.environment import SimulationEnvironment
+from simulation.loadgen import LoadGenerator, ramp_schedule
 from simulation.network import NetworkSimulator
 from simulation.scenarios import get_all_scenarios, load_scenario
+from simulation.sharding import ShardedTrafficGenerator
 
 __all__ = [
     'SimulationEnvironment',
     'NetworkSimulator',
+    'ShardedTrafficGenerator',
+    'LoadGenerator',
+    'ramp_schedule',
+    'TrafficRecorder',
+    'TrafficReplayer',
+    'PcapReader',
+    'NetFlowCsvReader',
+    'AttackGenerator',
+    'register_attack_generator',
     'get_all_scenarios',
     'load_scenario'
 ]
@@ -0,0 +1,114 @@
+import logging
+import ipaddress
+from typing import Any, List, Sequence, Union
+import numpy as np
+
+from simulation.traffic import format_ips
+
+logger = logging.getLogger(__name__)
+
+NetworkLike = Union[str, ipaddress.IPv4Network]
+
+class AddressPool:
+    """
+    Pool of IPv4 host addresses held as integer ranges or a uint32 array.
+    Addresses are sampled by index and only rendered as strings on request.
+    """
+    
+    def __init__(self, networks: Sequence[NetworkLike] = (), addresses: Any = None):
+        """
+        Initialize an address pool.
+        
+        Args:
+            networks: Networks whose usable host addresses form the pool
+            addresses: Explicit addresses, used instead of networks when given
+        """
+        self.networks = [ipaddress.IPv4Network(n) for n in networks]
+        
+        if addresses is not None:
+            self._addresses = np.asarray(addresses, dtype=np.uint32)
+            self._starts = np.zeros(0, dtype=np.int64)
+            self._offsets = np.zeros(1, dtype=np.int64)
+            self.size = len(self._addresses)
+            return
+        
+        self._addresses = None
+        starts = []
+        counts = []
+        for net in self.networks:
+            if net.prefixlen >= 31:
+                # Point-to-point and host networks use every address
+                starts.append(int(net.network_address))
+                counts.append(net.num_addresses)
+            else:
+                starts.append(int(net.network_address) + 1)
+                counts.append(net.num_addresses - 2)
+        
+        self._starts = np.array(starts, dtype=np.int64)
+        self._offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+        self.size = int(self._offsets[-1])
+    
+    @classmethod
+    def from_addresses(cls, addresses: Any) -> 'AddressPool':
+        """Create a pool from an explicit array of uint32 addresses."""
+        return cls(addresses=addresses)
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def at(self, indices: Any) -> np.ndarray:
+        """
+        Look up addresses by pool index.
+        
+        Args:
+            indices: Integer index or array of indices in [0, len(pool))
+        
+        Returns:
+            Array of uint32 addresses
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._addresses is not None:
+            return self._addresses[indices]
+        
+        network = self.network_index(indices)
+        return (self._starts[network] + indices - self._offsets[network]).astype(np.uint32)
+    
+    def network_index(self, indices: Any) -> np.ndarray:
+        """
+        Find which network each pool index belongs to.
+        
+        Args:
+            indices: Array of pool indices
+        
+        Returns:
+            Array of positions in `networks` (zeros for explicit address pools)
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._addresses is not None:
+            return np.zeros(indices.shape, dtype=np.int64)
+        return np.searchsorted(self._offsets, indices, side='right') - 1
+    
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """
+        Draw addresses uniformly from the pool.
+        
+        Args:
+            rng: Random generator to draw from
+            count: Number of addresses
+        
+        Returns:
+            Array of uint32 addresses
+        """
+        return self.at(rng.integers(0, self.size, count))
+    
+    def strings(self, indices: Any) -> List[str]:
+        """
+        Render pool entries as dotted-quad strings.
+        
+        Args:
+            indices: Array of pool indices
+        
+        Returns:
+            List of address strings
+        """
+        return format_ips(self.at(indices))
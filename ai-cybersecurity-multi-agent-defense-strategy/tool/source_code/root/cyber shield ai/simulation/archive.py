@@ -0,0 +1,223 @@
+import json
+import logging
+import os
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
+
+from simulation.traffic import PATTERN_SETS, TrafficBatch, register_pattern
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_VERSION = 1
+
+def _column_path(path: str, field: str) -> str:
+    return os.path.join(path, f"{field}.bin")
+
+class TrafficRecorder:
+    """
+    Writes traffic batches to an on-disk columnar archive.
+    The archive is a directory holding one raw fixed-width file per TrafficBatch
+    field, a step offset index and a JSON manifest. Columns are appended as
+    steps arrive, so recording never holds more than one batch in memory.
+    """
+    
+    def __init__(self, path: str):
+        """
+        Create an empty archive.
+        
+        Args:
+            path: Archive directory; created if missing, existing columns are overwritten
+        """
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        
+        self._files = {field: open(_column_path(path, field), 'wb') for field in TrafficBatch.FIELDS}
+        self._steps: List[int] = []
+        self._offsets: List[int] = [0]
+        self.closed = False
+    
+    def __enter__(self) -> 'TrafficRecorder':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def write(self, step: int, batch: TrafficBatch) -> None:
+        """
+        Append the traffic of one step.
+        
+        Args:
+            step: Simulation step the batch belongs to
+            batch: Traffic generated for the step
+        """
+        if self.closed:
+            raise ValueError("Cannot write to a closed traffic archive")
+        
+        for field, handle in self._files.items():
+            handle.write(np.ascontiguousarray(getattr(batch, field)).tobytes())
+        
+        self._steps.append(int(step))
+        self._offsets.append(self._offsets[-1] + len(batch))
+    
+    def record(self, source: Any, start_step: int, stop_step: int) -> int:
+        """
+        Generate and append the traffic of a range of steps.
+        
+        Args:
+            source: Traffic source with a generate_traffic_batch(step) method,
+                such as NetworkSimulator
+            start_step: First step to record
+            stop_step: Step after the last one to record
+        
+        Returns:
+            Number of records written
+        """
+        written = 0
+        for step in range(start_step, stop_step):
+            batch = source.generate_traffic_batch(step)
+            self.write(step, batch)
+            written += len(batch)
+        return written
+    
+    def close(self) -> None:
+        """Flush the columns and write the step index and manifest."""
+        if self.closed:
+            return
+        
+        for handle in self._files.values():
+            handle.close()
+        
+        np.save(os.path.join(self.path, 'steps.npy'), np.array(self._steps, dtype=np.int64))
+        np.save(os.path.join(self.path, 'offsets.npy'), np.array(self._offsets, dtype=np.int64))
+        
+        # Pattern codes are process-local, so persist the table they index
+        manifest = {
+            'version': ARCHIVE_VERSION,
+            'records': self._offsets[-1],
+            'steps': len(self._steps),
+            'fields': {field: np.dtype(dtype).str for field, dtype in TrafficBatch.FIELDS.items()},
+            'patterns': [list(p) for p in PATTERN_SETS]
+        }
+        with open(os.path.join(self.path, 'manifest.json'), 'w') as f:
+            json.dump(manifest, f)
+        
+        self.closed = True
+        logger.info(f"Recorded {manifest['records']} records over {manifest['steps']} steps to {self.path}")
+
+class TrafficReplayer:
+    """
+    Replays a traffic archive written by TrafficRecorder.
+    Columns are memory-mapped and per-step batches are views into them, so
+    replay does no parsing or copying. The replayer exposes the same
+    generate_traffic / generate_traffic_batch interface as NetworkSimulator
+    and can be used as the traffic source of SimulationEnvironment.
+    """
+    
+    def __init__(self, path: str, loop: bool = False):
+        """
+        Open an archive.
+        
+        Args:
+            path: Archive directory
+            loop: Wrap around to the first recorded step after the last one
+                instead of returning empty batches
+        """
+        self.path = path
+        self.loop = loop
+        
+        with open(os.path.join(path, 'manifest.json')) as f:
+            self.manifest: Dict[str, Any] = json.load(f)
+        if self.manifest.get('version') != ARCHIVE_VERSION:
+            raise ValueError(f"Unsupported traffic archive version: {self.manifest.get('version')}")
+        
+        self.steps = np.load(os.path.join(path, 'steps.npy'))
+        self.offsets = np.load(os.path.join(path, 'offsets.npy'))
+        
+        records = self.manifest['records']
+        self._columns: Dict[str, np.ndarray] = {}
+        for field, dtype in self.manifest['fields'].items():
+            if records:
+                self._columns[field] = np.memmap(_column_path(path, field), dtype=np.dtype(dtype),
+                                                 mode='r', shape=(records,))
+            else:
+                self._columns[field] = np.zeros(0, dtype=np.dtype(dtype))
+        
+        # Translate recorded pattern codes to this process's codes; only the
+        # pattern column is copied, and only when the tables disagree
+        mapping = np.array([register_pattern(p) for p in self.manifest['patterns']], dtype=np.uint16)
+        if not np.array_equal(mapping, np.arange(len(mapping))):
+            self._columns['pattern'] = mapping[self._columns['pattern']]
+        
+        # Steps are usually recorded contiguously, which allows O(1) lookup
+        self._contiguous = bool(len(self.steps) == 0 or
+                                np.array_equal(self.steps, self.steps[0] + np.arange(len(self.steps))))
+    
+    def __len__(self) -> int:
+        return len(self.steps)
+    
+    @property
+    def record_count(self) -> int:
+        return int(self.offsets[-1])
+    
+    def _position(self, step: int) -> Optional[int]:
+        """Find the index entry holding a step, or None if it was not recorded."""
+        if not len(self.steps):
+            return None
+        
+        first = int(self.steps[0])
+        if self.loop:
+            step = first + (step - first) % (int(self.steps[-1]) + 1 - first)
+        
+        if self._contiguous:
+            position = step - first
+            return position if 0 <= position < len(self.steps) else None
+        
+        position = int(np.searchsorted(self.steps, step))
+        if position < len(self.steps) and self.steps[position] == step:
+            return position
+        return None
+    
+    def batch_at(self, position: int) -> TrafficBatch:
+        """
+        Get the batch stored at an index position.
+        
+        Args:
+            position: Index into the recorded steps
+        
+        Returns:
+            TrafficBatch viewing the memory-mapped columns
+        """
+        start, stop = int(self.offsets[position]), int(self.offsets[position + 1])
+        return TrafficBatch(**{field: column[start:stop] for field, column in self._columns.items()})
+    
+    def generate_traffic_batch(self, step: int) -> TrafficBatch:
+        """
+        Get the recorded traffic of a step.
+        
+        Args:
+            step: Simulation step
+        
+        Returns:
+            TrafficBatch for the step, empty if the step was not recorded
+        """
+        position = self._position(step)
+        if position is None:
+            return TrafficBatch.empty()
+        return self.batch_at(position)
+    
+    def generate_traffic(self, step: int) -> List[Dict[str, Any]]:
+        """
+        Get the recorded traffic of a step as dictionary records.
+        
+        Args:
+            step: Simulation step
+        
+        Returns:
+            List of network traffic records
+        """
+        return self.generate_traffic_batch(step).to_records()
+    
+    def __iter__(self) -> Iterator[Tuple[int, TrafficBatch]]:
+        """Iterate over (step, batch) pairs in recording order."""
+        for position in range(len(self.steps)):
+            yield int(self.steps[position]), self.batch_at(position)
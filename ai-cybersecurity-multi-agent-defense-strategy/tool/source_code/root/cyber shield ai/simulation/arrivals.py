@@ -0,0 +1,143 @@
+import logging
+from typing import Dict, Any, Optional
+import numpy as np
+
+from simulation.clock import SimulationClock
+
+logger = logging.getLogger(__name__)
+
+class ArrivalModel:
+    """
+    Base class for models of how many traffic records arrive per step.
+    Stateless models are sampled for many steps in one vectorized call.
+    """
+    
+    def __init__(self, rate: float, clock: SimulationClock):
+        """
+        Initialize the model.
+        
+        Args:
+            rate: Mean records per step
+            clock: Simulated clock mapping steps to time of day
+        """
+        self.rate = float(rate)
+        self.clock = clock
+    
+    def rates(self, steps: np.ndarray) -> np.ndarray:
+        """Get the expected number of records at each step."""
+        return np.full(len(steps), self.rate)
+    
+    def counts(self, rng: np.random.Generator, steps: np.ndarray) -> np.ndarray:
+        """
+        Sample record counts for consecutive steps.
+        
+        Args:
+            rng: Random generator
+            steps: Step numbers in increasing order
+        
+        Returns:
+            Number of records per step
+        """
+        return rng.poisson(self.rates(np.asarray(steps)))
+    
+    def count(self, rng: np.random.Generator, step: int) -> int:
+        """Sample the record count of one step."""
+        return int(self.counts(rng, np.array([step]))[0])
+    
+    def reset(self) -> None:
+        """Forget any state carried between steps."""
+
+class UniformVarianceArrivals(ArrivalModel):
+    """Rate scaled by a uniform factor in [1 - variance, 1 + variance] (the original model)."""
+    
+    def __init__(self, rate: float, clock: SimulationClock, variance: float = 0.3):
+        super().__init__(rate, clock)
+        self.variance = variance
+    
+    def counts(self, rng: np.random.Generator, steps: np.ndarray) -> np.ndarray:
+        factor = 1 + rng.uniform(-self.variance, self.variance, len(steps))
+        return (self.rate * factor).astype(np.int64)
+
+class PoissonArrivals(ArrivalModel):
+    """Homogeneous Poisson arrivals with a constant rate."""
+
+class DiurnalArrivals(ArrivalModel):
+    """
+    Poisson arrivals modulated by time of day.
+    The rate follows rate * (1 + amplitude * cos(2 * pi * (hour - peak_hour) / 24)),
+    where the hour comes from the simulated clock (UTC).
+    """
+    
+    def __init__(self, rate: float, clock: SimulationClock,
+                 amplitude: float = 0.6, peak_hour: float = 14.0):
+        super().__init__(rate, clock)
+        self.amplitude = min(max(amplitude, 0.0), 1.0)
+        self.peak_hour = peak_hour
+    
+    def rates(self, steps: np.ndarray) -> np.ndarray:
+        # Evaluate at the middle of each step
+        seconds = self.clock.start_time + (steps + 0.5) * self.clock.step_duration
+        hours = (seconds % 86400) / 3600
+        return self.rate * (1 + self.amplitude * np.cos(2 * np.pi * (hours - self.peak_hour) / 24))
+
+class HawkesArrivals(ArrivalModel):
+    """
+    Discrete-time self-exciting (Hawkes) arrivals.
+    Every record raises the intensity of later steps by `excitation`, and
+    that boost decays by `decay` per step, giving bursts that feed on
+    themselves. The baseline is scaled so the long-run mean stays at `rate`.
+    The branching ratio excitation / (1 - decay) must stay below 1.
+    """
+    
+    def __init__(self, rate: float, clock: SimulationClock,
+                 excitation: float = 0.5, decay: float = 0.3):
+        super().__init__(rate, clock)
+        self.decay = min(max(decay, 0.0), 0.99)
+        self.branching_ratio = excitation / (1 - self.decay)
+        if self.branching_ratio >= 1:
+            raise ValueError(f"Hawkes branching ratio {self.branching_ratio:.2f} must be below 1")
+        self.excitation = excitation
+        self.baseline = self.rate * (1 - self.branching_ratio)
+        self.reset()
+    
+    def reset(self) -> None:
+        self._boost = 0.0
+    
+    def counts(self, rng: np.random.Generator, steps: np.ndarray) -> np.ndarray:
+        # Each step depends on the previous one, so only the draws are batched
+        counts = np.empty(len(steps), dtype=np.int64)
+        for i in range(len(steps)):
+            counts[i] = rng.poisson(self.baseline + self._boost)
+            self._boost = self.decay * self._boost + self.excitation * counts[i]
+        return counts
+
+ARRIVAL_MODELS = {
+    'uniform': UniformVarianceArrivals,
+    'poisson': PoissonArrivals,
+    'diurnal': DiurnalArrivals,
+    'hawkes': HawkesArrivals
+}
+
+def create_arrival_model(spec: Optional[Dict[str, Any]], rate: float, clock: SimulationClock,
+                         variance: float = 0.3) -> ArrivalModel:
+    """
+    Create an arrival model from a network_params specification.
+    
+    Args:
+        spec: Dictionary with a 'type' key naming an entry of ARRIVAL_MODELS
+            plus that model's parameters; None selects the uniform-variance model
+        rate: Mean records per step
+        clock: Simulated clock
+        variance: Variance of the uniform-variance model
+    
+    Returns:
+        ArrivalModel instance
+    """
+    spec = dict(spec or {'type': 'uniform', 'variance': variance})
+    model_type = spec.pop('type', 'poisson')
+    model_class = ARRIVAL_MODELS.get(model_type)
+    if model_class is None:
+        raise ValueError(f"Unknown arrival model: {model_type}")
+    
+    logger.debug(f"Using {model_type} arrival model with rate {rate}")
+    return model_class(rate, clock, **spec)
@@ -0,0 +1,279 @@
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Callable, List, Optional, Type
+import numpy as np
+
+from simulation.traffic import PROTOCOL_CODES, TrafficBatch, ip_to_int, protocol_code, register_pattern
+
+logger = logging.getLogger(__name__)
+
+class AttackGenerator(ABC):
+    """
+    Base class for attack traffic generators.
+    A generator turns one active attack pattern into a columnar batch for
+    the current step. Generators are stateless; everything they need comes
+    from the attack pattern and the network simulator passed to generate().
+    """
+    
+    # Pattern names attached to every record of the attack
+    patterns: List[str] = []
+    
+    @abstractmethod
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        """
+        Generate the attack's traffic for one step.
+        
+        Args:
+            network: NetworkSimulator providing rng, inventory, address pools and ports
+            attack: Attack pattern with 'source', 'target_ips', 'targets' and 'config'
+            count: Number of records to generate
+        
+        Returns:
+            TrafficBatch of malicious records
+        """
+        pass
+    
+    def pattern_code(self, *extra: str) -> int:
+        """Return the pattern code of this generator's patterns plus any extra names."""
+        return register_pattern(list(self.patterns) + list(extra))
+    
+    @staticmethod
+    def source_ip(attack: Dict[str, Any]) -> int:
+        """Return the attacker's address as an integer."""
+        return ip_to_int(attack['source']['ip'])
+
+ATTACK_GENERATORS: Dict[str, AttackGenerator] = {}
+
+def register_attack_generator(name: str) -> Callable[[Type[AttackGenerator]], Type[AttackGenerator]]:
+    """
+    Class decorator registering an attack generator under an attack type.
+    
+    Args:
+        name: Attack type, as used in attack patterns' 'type' key
+    
+    Returns:
+        Decorator that registers and returns the class
+    """
+    def decorator(cls: Type[AttackGenerator]) -> Type[AttackGenerator]:
+        if name in ATTACK_GENERATORS:
+            logger.warning(f"Replacing attack generator for {name}")
+        ATTACK_GENERATORS[name] = cls()
+        return cls
+    return decorator
+
+def get_attack_generator(name: str) -> Optional[AttackGenerator]:
+    """Return the generator registered for an attack type, or None."""
+    return ATTACK_GENERATORS.get(name)
+
+@register_attack_generator('port_scan')
+class PortScanGenerator(AttackGenerator):
+    """Probes of sequential port ranges or of the services the targets run."""
+    
+    patterns = ['port_scan', 'reconnaissance']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        target_ips = attack['target_ips']
+        
+        # Determine port pattern
+        port_pattern = attack['config'].get('port_pattern', 'sequential')
+        
+        if port_pattern == 'sequential':
+            # Sequential port scanning
+            port = rng.choice([1, 22, 80, 443, 1024, 8080], count) + rng.integers(0, 21, count)
+        else:
+            # Common ports scanning, probing the services the targets actually run
+            hosts = network.inventory.host_index(target_ips)
+            entries = network.inventory.service_entries(hosts[hosts >= 0])
+            if len(entries):
+                port = network.inventory.service_ports[network.inventory.service_id[rng.choice(entries, count)]]
+            else:
+                port = rng.choice(list(network.common_ports.values()), count)
+        
+        return TrafficBatch(
+            source_ip=self.source_ip(attack),
+            destination_ip=rng.choice(target_ips, count),
+            protocol=rng.choice([PROTOCOL_CODES['tcp'], PROTOCOL_CODES['udp']], count),
+            port=port,
+            payload_size=rng.integers(40, 101, count),
+            is_malicious=True,
+            confidence=0.7 + rng.uniform(0, 0.2, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('brute_force')
+class BruteForceGenerator(AttackGenerator):
+    """Repeated authentication attempts against one service."""
+    
+    patterns = ['brute_force', 'authentication_attack']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        target_service = attack['config'].get('target_service', 'ssh')
+        
+        return TrafficBatch(
+            source_ip=self.source_ip(attack),
+            destination_ip=rng.choice(attack['target_ips'], count),
+            protocol=protocol_code(target_service),
+            port=network.common_ports.get(target_service, 22),
+            payload_size=rng.integers(200, 501, count),
+            is_malicious=True,
+            confidence=0.8 + rng.uniform(0, 0.15, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('data_exfiltration')
+class ExfiltrationGenerator(AttackGenerator):
+    """Data volume split across records sent from the targets to the attacker."""
+    
+    patterns = ['data_exfiltration', 'data_theft']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        data_volume = attack['config'].get('data_volume', 10000)
+        
+        # Split the data volume across multiple records
+        volume_per_record = data_volume / max(1, count)
+        
+        exfil_protocols = [PROTOCOL_CODES['https'], PROTOCOL_CODES['dns'], PROTOCOL_CODES['smtp']]
+        
+        return TrafficBatch(
+            source_ip=rng.choice(attack['target_ips'], count),  # Exfiltrating FROM target
+            destination_ip=self.source_ip(attack),  # TO attacker
+            protocol=rng.choice(exfil_protocols, count),
+            port=rng.choice([443, 53, 25], count),
+            payload_size=(volume_per_record * rng.uniform(0.8, 1.2, count)).astype(np.int64),
+            is_malicious=True,
+            confidence=0.75 + rng.uniform(0, 0.2, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('ddos')
+class DdosGenerator(AttackGenerator):
+    """SYN, UDP or HTTP floods from many external sources."""
+    
+    patterns = ['ddos']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        attack_vector = attack['config'].get('attack_vector', 'syn_flood')
+        
+        # Set protocol and port based on attack vector
+        if attack_vector == 'syn_flood':
+            protocol = np.full(count, PROTOCOL_CODES['tcp'])
+            port = rng.choice([80, 443, 8080], count)
+            payload_size = rng.integers(40, 101, count)
+        elif attack_vector == 'udp_flood':
+            protocol = np.full(count, PROTOCOL_CODES['udp'])
+            port = rng.integers(1, 65536, count)
+            payload_size = rng.integers(300, 1201, count)
+        else:  # http_flood
+            is_https = rng.random(count) < 0.5
+            protocol = np.where(is_https, PROTOCOL_CODES['https'], PROTOCOL_CODES['http'])
+            port = np.where(is_https, 443, 80)
+            payload_size = rng.integers(800, 2001, count)
+        
+        # For DDoS, every record comes from a different external source
+        return TrafficBatch(
+            source_ip=network.external_pool.sample(rng, count),
+            destination_ip=rng.choice(attack['target_ips'], count),
+            protocol=protocol,
+            port=port,
+            payload_size=payload_size,
+            is_malicious=True,
+            confidence=0.85 + rng.uniform(0, 0.1, count),
+            pattern=self.pattern_code(attack_vector)
+        )
+
+@register_attack_generator('slowloris')
+class SlowlorisGenerator(AttackGenerator):
+    """Many tiny keep-alive fragments holding web server connections open."""
+    
+    patterns = ['slowloris', 'ddos']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        
+        # A handful of attacker hosts, each holding many connections
+        sources = network.external_pool.sample(rng, attack['config'].get('source_count', 3))
+        is_https = rng.random(count) < attack['config'].get('https_ratio', 0.5)
+        
+        return TrafficBatch(
+            source_ip=rng.choice(sources, count),
+            destination_ip=rng.choice(attack['target_ips'], count),
+            protocol=np.where(is_https, PROTOCOL_CODES['https'], PROTOCOL_CODES['http']),
+            port=np.where(is_https, 443, 80),
+            payload_size=rng.integers(5, 61, count),
+            is_malicious=True,
+            confidence=0.6 + rng.uniform(0, 0.2, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('dns_tunnelling')
+class DnsTunnellingGenerator(AttackGenerator):
+    """Data encoded in long DNS queries from the targets to an attacker-run resolver."""
+    
+    patterns = ['dns_tunnelling', 'data_exfiltration']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        
+        # Queries sit close to the 255-byte name limit
+        return TrafficBatch(
+            source_ip=rng.choice(attack['target_ips'], count),
+            destination_ip=self.source_ip(attack),
+            protocol=PROTOCOL_CODES['dns'],
+            port=53,
+            payload_size=rng.integers(180, 256, count),
+            is_malicious=True,
+            confidence=0.65 + rng.uniform(0, 0.2, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('c2_beaconing')
+class BeaconingGenerator(AttackGenerator):
+    """Periodic fixed-size check-ins from implanted targets to the attacker."""
+    
+    patterns = ['command_and_control', 'beaconing']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        config = attack['config']
+        
+        # Beacons have a near-constant size with a little jitter
+        beacon_size = config.get('beacon_size', 256)
+        jitter = config.get('jitter', 0.1)
+        
+        return TrafficBatch(
+            source_ip=rng.choice(attack['target_ips'], count),
+            destination_ip=self.source_ip(attack),
+            protocol=PROTOCOL_CODES['https'],
+            port=config.get('port', 443),
+            payload_size=(beacon_size * rng.uniform(1 - jitter, 1 + jitter, count)).astype(np.int64),
+            is_malicious=True,
+            confidence=0.55 + rng.uniform(0, 0.25, count),
+            pattern=self.pattern_code()
+        )
+
+@register_attack_generator('credential_stuffing')
+class CredentialStuffingGenerator(AttackGenerator):
+    """Leaked credentials replayed against a login endpoint from a botnet."""
+    
+    patterns = ['credential_stuffing', 'authentication_attack']
+    
+    def generate(self, network: Any, attack: Dict[str, Any], count: int) -> TrafficBatch:
+        rng = network.rng
+        
+        # Each bot only tries a few logins to stay under rate limits
+        bots = network.external_pool.sample(rng, max(1, count // attack['config'].get('attempts_per_bot', 3)))
+        
+        return TrafficBatch(
+            source_ip=rng.choice(bots, count),
+            destination_ip=rng.choice(attack['target_ips'], count),
+            protocol=PROTOCOL_CODES['https'],
+            port=443,
+            payload_size=rng.integers(300, 701, count),
+            is_malicious=True,
+            confidence=0.7 + rng.uniform(0, 0.2, count),
+            pattern=self.pattern_code()
+        )
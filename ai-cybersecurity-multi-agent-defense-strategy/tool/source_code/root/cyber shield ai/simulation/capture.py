@@ -0,0 +1,393 @@
+import csv
+import logging
+import struct
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Dict, Any, Iterator, List, Optional
+import numpy as np
+
+from simulation.traffic import PROTOCOL_CODES, TrafficBatch, ip_to_int, protocol_code, rechunk
+
+logger = logging.getLogger(__name__)
+
+# IANA protocol numbers of the transport protocols we classify
+IP_PROTO_ICMP = 1
+IP_PROTO_TCP = 6
+IP_PROTO_UDP = 17
+IP_PROTOCOL_NUMBERS = {'icmp': IP_PROTO_ICMP, 'tcp': IP_PROTO_TCP, 'udp': IP_PROTO_UDP}
+
+# Application protocols recognised by well-known destination port
+_TCP_PORT_PROTOCOLS = {80: 'http', 443: 'https', 22: 'ssh', 21: 'ftp', 23: 'telnet', 25: 'smtp', 53: 'dns'}
+_UDP_PORT_PROTOCOLS = {53: 'dns'}
+
+def _port_table(default: str, ports: Dict[int, str]) -> np.ndarray:
+    table = np.full(1 << 16, PROTOCOL_CODES[default], dtype=np.uint8)
+    for port, name in ports.items():
+        table[port] = PROTOCOL_CODES[name]
+    return table
+
+_TCP_PORT_TABLE = _port_table('tcp', _TCP_PORT_PROTOCOLS)
+_UDP_PORT_TABLE = _port_table('udp', _UDP_PORT_PROTOCOLS)
+
+def classify_protocols(ip_protocols: np.ndarray, ports: np.ndarray) -> np.ndarray:
+    """
+    Map IP protocol numbers and destination ports to protocol codes.
+    
+    Args:
+        ip_protocols: IANA protocol numbers
+        ports: Destination ports
+    
+    Returns:
+        Protocol codes indexing PROTOCOLS
+    """
+    ports = np.asarray(ports, dtype=np.uint16)
+    codes = np.zeros(len(ports), dtype=np.uint8)
+    codes[ip_protocols == IP_PROTO_ICMP] = PROTOCOL_CODES['icmp']
+    
+    tcp = ip_protocols == IP_PROTO_TCP
+    codes[tcp] = _TCP_PORT_TABLE[ports[tcp]]
+    udp = ip_protocols == IP_PROTO_UDP
+    codes[udp] = _UDP_PORT_TABLE[ports[udp]]
+    return codes
+
+class CaptureReader(ABC):
+    """
+    Base class of streaming capture readers.
+    Subclasses parse the file incrementally into TrafficBatch chunks; the
+    reader re-splits them into fixed-size batches so memory stays bounded by
+    the read buffer and the batch size, whatever the size of the capture.
+    A reader doubles as a SimulationEnvironment traffic source that hands out
+    the next batch on every step.
+    """
+    
+    def __init__(self, path: str, batch_records: int = 1024):
+        """
+        Initialize the reader.
+        
+        Args:
+            path: Capture file
+            batch_records: Records per emitted batch
+        """
+        self.path = path
+        self.batch_records = max(1, int(batch_records))
+        self._stream: Optional[Iterator[TrafficBatch]] = None
+    
+    @abstractmethod
+    def _parse(self) -> Iterator[TrafficBatch]:
+        """Yield parsed chunks of arbitrary size."""
+        pass
+    
+    def __iter__(self) -> Iterator[TrafficBatch]:
+        """Iterate over the whole capture in fixed-size batches."""
+        return rechunk(self._parse(), self.batch_records)
+    
+    def generate_traffic_batch(self, step: int) -> TrafficBatch:
+        """
+        Get the next batch of the capture.
+        
+        Args:
+            step: Simulation step (batches are handed out in order regardless)
+        
+        Returns:
+            Next TrafficBatch, empty once the capture is exhausted
+        """
+        if self._stream is None:
+            self._stream = iter(self)
+        return next(self._stream, None) or TrafficBatch.empty()
+    
+    def generate_traffic(self, step: int) -> List[Dict[str, Any]]:
+        """
+        Get the next batch of the capture as dictionary records.
+        
+        Args:
+            step: Simulation step
+        
+        Returns:
+            List of network traffic records
+        """
+        return self.generate_traffic_batch(step).to_records()
+    
+    def rewind(self) -> None:
+        """Restart traffic source reads from the beginning of the capture."""
+        self._stream = None
+
+class PcapReader(CaptureReader):
+    """
+    Streaming reader for classic libpcap files.
+    Supports micro- and nanosecond timestamps in either byte order, and
+    Ethernet (with 802.1Q tags), raw IP and Linux cooked link types. Only
+    IPv4 packets are emitted. Record headers are walked in Python, while
+    header fields of all packets in a buffer are extracted with NumPy
+    gathers.
+    """
+    
+    LINKTYPE_ETHERNET = 1
+    LINKTYPE_RAW = 101
+    LINKTYPE_LINUX_SLL = 113
+    LINKTYPE_IPV4 = 228
+    
+    _MAGIC = {
+        b'\xd4\xc3\xb2\xa1': ('<', 1e-6),
+        b'\xa1\xb2\xc3\xd4': ('>', 1e-6),
+        b'\x4d\x3c\xb2\xa1': ('<', 1e-9),
+        b'\xa1\xb2\x3c\x4d': ('>', 1e-9)
+    }
+    
+    # Largest header span read past the link layer: IPv4 options plus TCP offset byte
+    _HEADER_SLACK = 128
+    
+    def __init__(self, path: str, batch_records: int = 1024, buffer_size: int = 4 << 20):
+        """
+        Initialize the reader.
+        
+        Args:
+            path: pcap file
+            batch_records: Records per emitted batch
+            buffer_size: Bytes read from the file at a time
+        """
+        super().__init__(path, batch_records)
+        self.buffer_size = max(1 << 16, int(buffer_size))
+    
+    def _parse(self) -> Iterator[TrafficBatch]:
+        with open(self.path, 'rb') as f:
+            header = f.read(24)
+            if len(header) < 24 or header[:4] not in self._MAGIC:
+                raise ValueError(f"{self.path} is not a classic pcap file")
+            
+            order, resolution = self._MAGIC[header[:4]]
+            linktype = struct.unpack(order + 'I', header[20:24])[0] & 0x0FFFFFFF
+            if linktype not in (self.LINKTYPE_ETHERNET, self.LINKTYPE_RAW,
+                                self.LINKTYPE_LINUX_SLL, self.LINKTYPE_IPV4):
+                raise ValueError(f"Unsupported pcap link type: {linktype}")
+            
+            record_header = struct.Struct(order + 'IIII')
+            buffer = b''
+            while True:
+                data = f.read(self.buffer_size)
+                if not data:
+                    break
+                buffer += data
+                
+                # Walk the complete records in the buffer
+                offsets, lengths, seconds, fractions = [], [], [], []
+                position = 0
+                end = len(buffer)
+                while position + 16 <= end:
+                    ts_sec, ts_frac, incl_len, _ = record_header.unpack_from(buffer, position)
+                    if position + 16 + incl_len > end:
+                        break
+                    offsets.append(position + 16)
+                    lengths.append(incl_len)
+                    seconds.append(ts_sec)
+                    fractions.append(ts_frac)
+                    position += 16 + incl_len
+                
+                if offsets:
+                    batch = self._decode(buffer, linktype, np.array(offsets), np.array(lengths),
+                                         np.array(seconds) + np.array(fractions) * resolution)
+                    if len(batch):
+                        yield batch
+                buffer = buffer[position:]
+            
+            if buffer:
+                logger.warning(f"Ignoring {len(buffer)} trailing bytes of truncated record in {self.path}")
+    
+    def _decode(self, buffer: bytes, linktype: int, offsets: np.ndarray,
+                lengths: np.ndarray, timestamps: np.ndarray) -> TrafficBatch:
+        """
+        Extract IPv4 flow fields from the packets of a buffer.
+        
+        Args:
+            buffer: Raw pcap bytes
+            linktype: Link-layer header type
+            offsets: Offset of each packet's data in the buffer
+            lengths: Captured length of each packet
+            timestamps: Epoch timestamp of each packet
+        
+        Returns:
+            TrafficBatch with one record per IPv4 packet
+        """
+        # Zero padding keeps every gather in bounds; lengths decide validity
+        raw = np.frombuffer(buffer + bytes(self._HEADER_SLACK), dtype=np.uint8)
+        
+        def u8(index: np.ndarray) -> np.ndarray:
+            return raw[index].astype(np.int64)
+        
+        def u16(index: np.ndarray) -> np.ndarray:
+            return (u8(index) << 8) | u8(index + 1)
+        
+        # Locate the network layer
+        if linktype == self.LINKTYPE_ETHERNET:
+            ethertype = u16(offsets + 12)
+            tagged = ethertype == 0x8100
+            ethertype = np.where(tagged, u16(offsets + 16), ethertype)
+            l3 = offsets + np.where(tagged, 18, 14)
+            is_ipv4 = ethertype == 0x0800
+        elif linktype == self.LINKTYPE_LINUX_SLL:
+            l3 = offsets + 16
+            is_ipv4 = u16(offsets + 14) == 0x0800
+        else:
+            l3 = offsets
+            is_ipv4 = np.ones(len(offsets), dtype=bool)
+        
+        header_length = (u8(l3) & 0x0F) * 4
+        is_ipv4 &= ((u8(l3) >> 4) == 4) & (lengths >= l3 - offsets + 20) & (header_length >= 20)
+        
+        keep = np.flatnonzero(is_ipv4)
+        l3, header_length = l3[keep], header_length[keep]
+        lengths, offsets = lengths[keep], offsets[keep]
+        
+        ip_protocol = u8(l3 + 9)
+        total_length = u16(l3 + 2)
+        source = (u16(l3 + 12) << 16) | u16(l3 + 14)
+        destination = (u16(l3 + 16) << 16) | u16(l3 + 18)
+        
+        # Transport ports and header sizes, where the capture holds them
+        l4 = l3 + header_length
+        captured = lengths - (l4 - offsets)
+        tcp = ip_protocol == IP_PROTO_TCP
+        udp = ip_protocol == IP_PROTO_UDP
+        has_ports = (tcp | udp) & (captured >= 4)
+        port = np.where(has_ports, u16(l4 + 2), 0)
+        
+        transport_header = np.where(udp, 8, 0)
+        tcp_offset = tcp & (captured >= 13)
+        transport_header = np.where(tcp_offset, (u8(l4 + 12) >> 4) * 4, transport_header)
+        payload = np.maximum(total_length - header_length - transport_header, 0)
+        
+        return TrafficBatch(
+            source_ip=source,
+            destination_ip=destination,
+            protocol=classify_protocols(ip_protocol, port),
+            port=port,
+            payload_size=payload,
+            timestamp=timestamps[keep]
+        )
+
+class NetFlowCsvReader(CaptureReader):
+    """
+    Streaming reader for NetFlow-style CSV exports.
+    Columns are matched by name against common aliases used by nfdump,
+    softflowd and similar exporters; the protocol column may hold IANA
+    numbers or protocol names, and timestamps may be epoch seconds or ISO
+    8601 strings.
+    """
+    
+    COLUMN_ALIASES = {
+        'source_ip': ('source_ip', 'src_ip', 'srcaddr', 'sa', 'ipv4_src_addr', 'src_addr'),
+        'destination_ip': ('destination_ip', 'dst_ip', 'dstaddr', 'da', 'ipv4_dst_addr', 'dst_addr'),
+        'protocol': ('protocol', 'proto', 'pr', 'prot'),
+        'port': ('port', 'dst_port', 'dstport', 'dp', 'l4_dst_port'),
+        'payload_size': ('payload_size', 'bytes', 'ibyt', 'in_bytes', 'doctets', 'octets'),
+        'timestamp': ('timestamp', 'ts', 'first', 'start_time', 'stime', 'first_switched')
+    }
+    
+    REQUIRED = ('source_ip', 'destination_ip')
+    
+    def __init__(self, path: str, batch_records: int = 1024,
+                 columns: Optional[Dict[str, str]] = None):
+        """
+        Initialize the reader.
+        
+        Args:
+            path: CSV file with a header row
+            batch_records: Records per emitted batch
+            columns: Optional explicit mapping of record field to CSV column name
+        """
+        super().__init__(path, batch_records)
+        self.columns = columns or {}
+    
+    def _resolve_columns(self, header: List[str]) -> Dict[str, int]:
+        """Find the CSV column index of each record field."""
+        positions = {name.strip().lower(): i for i, name in enumerate(header)}
+        resolved = {}
+        for field, aliases in self.COLUMN_ALIASES.items():
+            names = (self.columns[field],) if field in self.columns else aliases
+            for name in names:
+                if name.lower() in positions:
+                    resolved[field] = positions[name.lower()]
+                    break
+        
+        missing = [field for field in self.REQUIRED if field not in resolved]
+        if missing:
+            raise ValueError(f"{self.path} has no column for: {', '.join(missing)}")
+        return resolved
+    
+    @staticmethod
+    def _parse_timestamp(value: str) -> float:
+        try:
+            return float(value)
+        except ValueError:
+            return datetime.fromisoformat(value.strip()).timestamp()
+    
+    def _parse(self) -> Iterator[TrafficBatch]:
+        with open(self.path, newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            columns = self._resolve_columns(header)
+            
+            # Only complete IPv4 flows fit the record schema
+            source, destination = columns['source_ip'], columns['destination_ip']
+            width = max(columns.values()) + 1
+            rows: List[List[str]] = []
+            short = 0
+            for row in reader:
+                if not row:
+                    continue
+                if len(row) < width:
+                    short += 1
+                elif ':' not in row[source] and ':' not in row[destination]:
+                    rows.append(row)
+                if len(rows) >= self.batch_records:
+                    yield self._decode(rows, columns)
+                    rows = []
+            if rows:
+                yield self._decode(rows, columns)
+            
+            if short:
+                logger.warning(f"Skipped {short} rows of {self.path} with fewer than {width} columns")
+    
+    def _decode(self, rows: List[List[str]], columns: Dict[str, int]) -> TrafficBatch:
+        """
+        Convert parsed CSV rows to a batch.
+        
+        Args:
+            rows: CSV rows
+            columns: Column index of each record field
+        
+        Returns:
+            TrafficBatch with one record per row
+        """
+        def column(field: str) -> Optional[List[str]]:
+            index = columns.get(field)
+            return None if index is None else [row[index].strip() for row in rows]
+        
+        ports = column('port')
+        port = np.array([int(float(p or 0)) for p in ports], dtype=np.int64) if ports else 0
+        
+        # IP protocols, given as numbers or transport names, are classified by
+        # port like pcap; application protocol names map directly
+        protocols = column('protocol')
+        if protocols is None:
+            protocol = 0
+        else:
+            ip_protocol = np.array([int(p) if p.isdigit() else IP_PROTOCOL_NUMBERS.get(p.lower(), -1)
+                                    for p in protocols])
+            protocol = np.where(
+                ip_protocol >= 0,
+                classify_protocols(ip_protocol, np.broadcast_to(port, (len(rows),))),
+                [protocol_code(p.lower()) for p in protocols]
+            )
+        
+        sizes = column('payload_size')
+        timestamps = column('timestamp')
+        return TrafficBatch(
+            source_ip=[ip_to_int(ip) for ip in column('source_ip')],
+            destination_ip=[ip_to_int(ip) for ip in column('destination_ip')],
+            protocol=protocol,
+            port=port,
+            payload_size=[int(float(s or 0)) for s in sizes] if sizes else 0,
+            timestamp=[self._parse_timestamp(t) for t in timestamps] if timestamps else 0.0
+        )
@@ -0,0 +1,47 @@
+import logging
+import time
+from datetime import datetime
+from typing import Optional
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def format_timestamp(timestamp: float) -> str:
+    """Render an epoch timestamp as an ISO 8601 string."""
+    return datetime.fromtimestamp(timestamp).isoformat()
+
+class SimulationClock:
+    """
+    Simulated clock mapping simulation steps to epoch time.
+    Step n covers [start_time + n * step_duration, start_time + (n + 1) * step_duration),
+    independent of how long the step takes to compute.
+    """
+    
+    def __init__(self, start_time: Optional[float] = None, step_duration: float = 1.0):
+        """
+        Initialize the clock.
+        
+        Args:
+            start_time: Epoch time of step 0; defaults to the current wall-clock time
+            step_duration: Simulated seconds covered by one step
+        """
+        self.start_time = time.time() if start_time is None else float(start_time)
+        self.step_duration = float(step_duration)
+    
+    def step_start(self, step: int) -> float:
+        """Get the simulated epoch time at which a step begins."""
+        return self.start_time + step * self.step_duration
+    
+    def timestamps(self, step: int, count: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        Draw timestamps spread uniformly over a step.
+        
+        Args:
+            step: Simulation step
+            count: Number of timestamps
+            rng: Random generator
+        
+        Returns:
+            Unsorted float64 epoch timestamps within the step
+        """
+        return self.step_start(step) + rng.random(count) * self.step_duration
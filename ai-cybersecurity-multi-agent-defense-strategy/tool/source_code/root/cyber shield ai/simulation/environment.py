@@ -1,6 +1,5 @@
 import logging
 import time
-import random
 from typing import Dict, Any, List, Optional, Tuple
 import numpy as np
 
@@ -8,7 +7,9 @@ from agents.coordinator import CoordinatorAgent
 from agents.defense import DefenseAgent
 from agents.offense import OffenseAgent
 from agents.detection import DetectionAgent
+from simulation.clock import SimulationClock, format_timestamp
 from simulation.network import NetworkSimulator
+from simulation.streams import RandomStreams
 
 logger = logging.getLogger(__name__)
 
@@ -39,8 +40,19 @@ class SimulationEnvironment:
         self.coordinator.register_agent("offense", self.offense_agent)
         self.coordinator.register_agent("detection", self.detection_agent)
         
+        # Simulated clock; each step covers step_duration simulated seconds
+        self.clock = SimulationClock(self.config.get("start_time"),
+                                     self.config.get("step_duration", 1.0))
+        
         # Network simulator for generating traffic and events
-        self.network = NetworkSimulator()
+        self.network = NetworkSimulator(clock=self.clock)
+        
+        # Source of per-step traffic; the network simulator unless replaced
+        self.traffic_source = self.network
+        
+        # Seeded random streams, one per component
+        self.streams = RandomStreams(self.config.get("seed"))
+        self._apply_streams()
         
         # Current simulation state
         self.current_scenario = None
@@ -69,13 +81,28 @@ class SimulationEnvironment:
         """
         self.current_scenario = scenario
         
+        # Restart every random stream so the run depends only on the seed
+        self.reseed(scenario.get("seed", self.config.get("seed")))
+        
+        # Restart simulated time at the scenario's start
+        self.clock = SimulationClock(
+            scenario.get("start_time", self.config.get("start_time")),
+            scenario.get("step_duration", self.config.get("step_duration", 1.0))
+        )
+        self.network.clock = self.clock
+        
         # Reset simulation state
         self.simulation_running = False
         self.simulation_results = {}
         self.step_count = 0
         
-        # Reset network simulator with scenario parameters
-        self.network.reset(scenario.get("network_params", {}))
+        # Reset network simulator with scenario parameters; segment firewalls and
+        # host susceptibility follow the scenario's defenses unless overridden
+        network_params = dict(scenario.get("network_params", {}))
+        defense_measures = scenario.get("attack_params", {}).get("defense_measures", {})
+        network_params.setdefault("network_segmentation", defense_measures.get("network_segmentation", 0.0))
+        network_params.setdefault("endpoint_protection", defense_measures.get("endpoint_protection", 0.0))
+        self.network.reset(network_params)
         
         # Set scenario in coordinator
         scenario_result = self.coordinator.process({
@@ -88,9 +115,42 @@ class SimulationEnvironment:
         return {
             "status": "success",
             "scenario": scenario.get("name", "Unnamed"),
+            "seed": self.streams.seed,
             "coordinator_result": scenario_result
         }
     
+    def reseed(self, seed: Optional[int] = None) -> None:
+        """
+        Derive fresh random streams for every component from a seed.
+        
+        Args:
+            seed: Simulation seed; new entropy is drawn when omitted
+        """
+        self.streams = RandomStreams(seed)
+        self._apply_streams()
+        
+        logger.debug(f"Simulation streams seeded with {self.streams.seed}")
+    
+    def _apply_streams(self) -> None:
+        """Hand each component its own generator from the current streams."""
+        self.network.rng = self.streams.generator("network")
+        self.coordinator.set_rng(self.streams.generator("coordinator"))
+        self.defense_agent.set_rng(self.streams.generator("defense"))
+        self.offense_agent.set_rng(self.streams.generator("offense"))
+        self.detection_agent.set_rng(self.streams.generator("detection"))
+    
+    def set_traffic_source(self, source: Optional[Any] = None) -> None:
+        """
+        Replace the source of per-step traffic.
+        
+        Args:
+            source: Object with a generate_traffic(step) method returning traffic
+                records, such as a TrafficReplayer; None restores the network simulator
+        """
+        self.traffic_source = source if source is not None else self.network
+        
+        logger.info(f"Traffic source set to {type(self.traffic_source).__name__}")
+    
     def start_simulation(self, 
                         duration_seconds: Optional[int] = None,
                         step_delay: float = 0.5) -> Dict[str, Any]:
@@ -116,7 +176,10 @@ class SimulationEnvironment:
         # Initialize simulation results
         self.simulation_results = {
             "scenario": self.current_scenario.get("name", "Unnamed"),
+            "seed": self.streams.seed,
             "start_time": self.simulation_start_time,
+            "simulated_start_time": self.clock.start_time,
+            "step_duration": self.clock.step_duration,
             "status": "running",
             "steps_completed": 0,
             "events": [],
@@ -158,6 +221,7 @@ class SimulationEnvironment:
             self.simulation_results["status"] = "completed"
             self.simulation_results["end_time"] = time.time()
             self.simulation_results["duration_seconds"] = time.time() - self.simulation_start_time
+            self.simulation_results["simulated_end_time"] = self.clock.step_start(self.step_count)
             
             # Calculate final metrics
             self._calculate_final_metrics()
@@ -197,6 +261,7 @@ class SimulationEnvironment:
         self.simulation_results["status"] = "stopped"
         self.simulation_results["end_time"] = time.time()
         self.simulation_results["duration_seconds"] = time.time() - self.simulation_start_time
+        self.simulation_results["simulated_end_time"] = self.clock.step_start(self.step_count)
         
         # Calculate final metrics
         self._calculate_final_metrics()
@@ -209,14 +274,36 @@ class SimulationEnvironment:
             "duration_seconds": self.simulation_results["duration_seconds"]
         }
     
-    def get_results(self) -> Dict[str, Any]:
+    def get_results(self, iso_timestamps: bool = False) -> Dict[str, Any]:
         """
         Get the simulation results.
         
+        Args:
+            iso_timestamps: Render simulated event and record timestamps as ISO
+                strings instead of epoch seconds
+            
         Returns:
             Dictionary with simulation results
         """
-        return self.simulation_results
+        if not iso_timestamps:
+            return self.simulation_results
+        
+        results = dict(self.simulation_results)
+        for key in ("simulated_start_time", "simulated_end_time"):
+            if key in results:
+                results[key] = format_timestamp(results[key])
+        
+        # Events are shallow-copied so the stored results keep numeric timestamps
+        events = []
+        for event in results.get("events", []):
+            event = dict(event, timestamp=format_timestamp(event["timestamp"]))
+            data = event.get("data")
+            if isinstance(data, dict) and isinstance(data.get("timestamp"), float):
+                event["data"] = dict(data, timestamp=format_timestamp(data["timestamp"]))
+            events.append(event)
+        results["events"] = events
+        
+        return results
     
     def _execute_step(self) -> Dict[str, Any]:
         """
@@ -226,7 +313,8 @@ class SimulationEnvironment:
             Dictionary with step results
         """
         # Generate network traffic
-        traffic_data = self.network.generate_traffic(self.step_count)
+        traffic_data = self.traffic_source.generate_traffic(self.step_count)
+        step_time = self.clock.step_start(self.step_count)
         
         # Analyze traffic with detection agent
         detection_result = self.detection_agent.process({
@@ -252,7 +340,7 @@ class SimulationEnvironment:
         for traffic in traffic_data:
             step_events.append({
                 "type": "network_traffic",
-                "timestamp": time.time(),
+                "timestamp": traffic["timestamp"],
                 "data": traffic
             })
         
@@ -261,7 +349,7 @@ class SimulationEnvironment:
             for threat in detection_result["detected_threats"]:
                 step_events.append({
                     "type": "threat_detected",
-                    "timestamp": time.time(),
+                    "timestamp": step_time,
                     "data": threat
                 })
         
@@ -269,7 +357,7 @@ class SimulationEnvironment:
         if defense_result:
             step_events.append({
                 "type": "defense_response",
-                "timestamp": time.time(),
+                "timestamp": step_time,
                 "data": {
                     "recommendations": defense_result.get("recommended_countermeasures", []),
                     "actions_taken": defense_result.get("actions_taken", [])
@@ -286,7 +374,7 @@ class SimulationEnvironment:
             
             step_events.append({
                 "type": "attack_simulation",
-                "timestamp": time.time(),
+                "timestamp": step_time,
                 "data": attack_result
             })
         
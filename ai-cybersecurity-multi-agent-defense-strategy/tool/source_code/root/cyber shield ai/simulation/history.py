@@ -0,0 +1,137 @@
+import logging
+from typing import Dict, Any
+import numpy as np
+
+from simulation.traffic import PROTOCOLS, TrafficBatch
+
+logger = logging.getLogger(__name__)
+
+class TrafficHistory:
+    """
+    Fixed-capacity columnar ring buffer of traffic records.
+    Running counters and refcounted unique-IP tables are updated on insert
+    and eviction, so statistics never rescan the buffer.
+    """
+    
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize the history buffer.
+        
+        Args:
+            capacity: Maximum number of records kept
+        """
+        self.capacity = max(1, int(capacity))
+        self._columns = {
+            field: np.zeros(self.capacity, dtype=dtype) for field, dtype in TrafficBatch.FIELDS.items()
+        }
+        self.clear()
+    
+    def clear(self) -> None:
+        """Remove every record and reset the counters."""
+        self._start = 0
+        self.size = 0
+        self.malicious_count = 0
+        self.protocol_counts = np.zeros(len(PROTOCOLS), dtype=np.int64)
+        self.source_refs: Dict[int, int] = {}
+        self.destination_refs: Dict[int, int] = {}
+    
+    def __len__(self) -> int:
+        return self.size
+    
+    def append(self, batch: TrafficBatch) -> None:
+        """
+        Append a batch, evicting the oldest records once the buffer is full.
+        
+        Args:
+            batch: Records to add
+        """
+        count = len(batch)
+        if count == 0:
+            return
+        
+        # Only the newest `capacity` records of an oversized batch can survive
+        if count > self.capacity:
+            batch = batch.take(slice(count - self.capacity, None))
+            count = self.capacity
+        
+        overflow = self.size + count - self.capacity
+        if overflow > 0:
+            self._evict(overflow)
+        
+        positions = (self._start + self.size + np.arange(count)) % self.capacity
+        for field, column in self._columns.items():
+            column[positions] = getattr(batch, field)
+        self.size += count
+        
+        self._update_counters(batch.protocol, batch.is_malicious,
+                              batch.source_ip, batch.destination_ip, 1)
+    
+    def _evict(self, count: int) -> None:
+        """Drop the `count` oldest records and withdraw them from the counters."""
+        positions = (self._start + np.arange(count)) % self.capacity
+        self._update_counters(
+            self._columns['protocol'][positions],
+            self._columns['is_malicious'][positions],
+            self._columns['source_ip'][positions],
+            self._columns['destination_ip'][positions],
+            -1
+        )
+        self._start = (self._start + count) % self.capacity
+        self.size -= count
+    
+    def _update_counters(self, protocols: np.ndarray, malicious: np.ndarray,
+                         source_ips: np.ndarray, destination_ips: np.ndarray, sign: int) -> None:
+        """Add (sign=1) or withdraw (sign=-1) records from the running counters."""
+        self.protocol_counts += sign * np.bincount(protocols, minlength=len(PROTOCOLS))
+        self.malicious_count += sign * int(np.count_nonzero(malicious))
+        self._update_refs(self.source_refs, source_ips, sign)
+        self._update_refs(self.destination_refs, destination_ips, sign)
+    
+    @staticmethod
+    def _update_refs(refs: Dict[int, int], ips: np.ndarray, sign: int) -> None:
+        """Adjust reference counts of distinct addresses, dropping those that reach zero."""
+        unique, counts = np.unique(ips, return_counts=True)
+        for ip, count in zip(unique.tolist(), counts.tolist()):
+            remaining = refs.get(ip, 0) + sign * count
+            if remaining > 0:
+                refs[ip] = remaining
+            else:
+                refs.pop(ip, None)
+    
+    def to_batch(self) -> TrafficBatch:
+        """
+        Copy the buffered records, oldest first.
+        
+        Returns:
+            TrafficBatch with the history contents
+        """
+        positions = (self._start + np.arange(self.size)) % self.capacity
+        return TrafficBatch(**{field: column[positions] for field, column in self._columns.items()})
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get statistics about the buffered traffic in O(#protocols).
+        
+        Returns:
+            Dictionary with traffic statistics
+        """
+        if not self.size:
+            return {
+                'total_traffic': 0,
+                'malicious_ratio': 0,
+                'protocol_distribution': {},
+                'source_ips': 0,
+                'destination_ips': 0
+            }
+        
+        return {
+            'total_traffic': self.size,
+            'malicious_count': self.malicious_count,
+            'malicious_ratio': self.malicious_count / self.size,
+            'protocol_distribution': {
+                PROTOCOLS[code]: int(self.protocol_counts[code]) / self.size
+                for code in np.flatnonzero(self.protocol_counts)
+            },
+            'source_ips': len(self.source_refs),
+            'destination_ips': len(self.destination_refs)
+        }
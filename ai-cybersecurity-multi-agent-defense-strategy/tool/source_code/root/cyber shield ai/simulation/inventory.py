@@ -0,0 +1,308 @@
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+
+from simulation.addresses import AddressPool
+from simulation.traffic import format_ips, protocol_code
+
+logger = logging.getLogger(__name__)
+
+# Host roles and operating systems, stored as small integer codes
+ROLES = ['server', 'endpoint']
+ROLE_SERVER = 0
+ROLE_ENDPOINT = 1
+
+OS_NAMES = ['Linux', 'Windows Server', 'Windows 10', 'Windows 11', 'MacOS']
+SERVER_OS = [0, 1]
+ENDPOINT_OS = [2, 3, 4, 0]
+
+def _nth_set_bit_table(width: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build lookup tables for selecting set bits of a bitmask.
+    
+    Args:
+        width: Number of bits in the mask
+    
+    Returns:
+        Tuple of (table where row m lists the set bit positions of m first,
+        popcount of every mask)
+    """
+    masks = np.arange(1 << width)
+    bits = (masks[:, None] >> np.arange(width)) & 1
+    order = np.argsort(1 - bits, axis=1, kind='stable')
+    return order, bits.sum(axis=1)
+
+class HostInventory:
+    """
+    Struct-of-arrays inventory of internal hosts.
+    Servers occupy indices [0, server_count) and endpoints follow them.
+    Services are stored as bitmasks over the inventory's service table and
+    flattened into a service entry table ordered by host, with offsets per
+    host and a secondary index by service for queries.
+    """
+    
+    def __init__(self, ip: np.ndarray, role: np.ndarray, os: np.ndarray,
+                 vulnerability_count: np.ndarray, services: np.ndarray,
+                 vulnerable_services: np.ndarray, subnet: np.ndarray,
+                 service_ports: Dict[str, int]):
+        """
+        Initialize the inventory from column arrays.
+        
+        Args:
+            ip: Host addresses (uint32)
+            role: Role codes indexing ROLES
+            os: Operating system codes indexing OS_NAMES
+            vulnerability_count: Known vulnerabilities per host
+            services: Bitmask of services running on each host
+            vulnerable_services: Bitmask of vulnerable services on each host
+            subnet: Index of the internal network each host lives in
+            service_ports: Service name to port mapping; bit i is the i-th entry
+        """
+        self.ip = ip
+        self.role = role
+        self.os = os
+        self.vulnerability_count = vulnerability_count
+        self.services = services
+        self.vulnerable_services = vulnerable_services
+        self.subnet = subnet
+        
+        self.service_names = list(service_ports)
+        self.service_ports = np.array(list(service_ports.values()), dtype=np.uint16)
+        self.service_protocols = np.array([protocol_code(s) for s in self.service_names], dtype=np.uint8)
+        self._bit_table, self._popcount = _nth_set_bit_table(len(self.service_names))
+        
+        self.server_count = int(np.count_nonzero(role == ROLE_SERVER))
+        self.address_pool = AddressPool.from_addresses(ip)
+        
+        # Sorted addresses for address-to-host lookups
+        self._ip_order = np.argsort(ip, kind='stable')
+        self._sorted_ip = ip[self._ip_order]
+        
+        self._build_service_table()
+    
+    def _build_service_table(self) -> None:
+        """Flatten the service bitmasks into per-entry arrays."""
+        service_count = len(self.service_names)
+        running = ((self.services[:, None] >> np.arange(service_count)) & 1).astype(bool)
+        
+        # Entries of host i are [service_offsets[i], service_offsets[i + 1])
+        host, service = np.nonzero(running)
+        self.service_host = host
+        self.service_id = service
+        self.service_vulnerable = ((self.vulnerable_services[host] >> service) & 1).astype(bool)
+        self.service_offsets = np.concatenate(([0], np.cumsum(running.sum(axis=1))))
+        
+        # Entries of service s are _by_service[_by_service_offsets[s]:_by_service_offsets[s + 1]]
+        self._by_service = np.argsort(service, kind='stable')
+        self._by_service_offsets = np.concatenate(([0], np.cumsum(np.bincount(service, minlength=service_count))))
+    
+    @classmethod
+    def generate(cls, rng: np.random.Generator, pool: AddressPool, server_count: int,
+                 endpoint_count: int, service_ports: Dict[str, int]) -> 'HostInventory':
+        """
+        Generate a random inventory of servers and endpoints.
+        
+        Args:
+            rng: Random generator
+            pool: Internal address pool; hosts take its first addresses
+            server_count: Number of servers
+            endpoint_count: Number of endpoints
+            service_ports: Service name to port mapping
+        
+        Returns:
+            Generated HostInventory
+        """
+        host_count = server_count + endpoint_count
+        if host_count > len(pool):
+            raise ValueError(f"Internal networks hold {len(pool)} hosts, cannot place {host_count}")
+        
+        index = np.arange(host_count)
+        role = np.where(index < server_count, ROLE_SERVER, ROLE_ENDPOINT).astype(np.uint8)
+        
+        os = np.concatenate((
+            rng.choice(SERVER_OS, server_count),
+            rng.choice(ENDPOINT_OS, endpoint_count)
+        )).astype(np.uint8)
+        vulnerability_count = np.concatenate((
+            rng.integers(0, 4, server_count),
+            rng.integers(0, 3, endpoint_count)
+        )).astype(np.uint8)
+        
+        # Each server runs 1-4 distinct services, 30% of which are vulnerable
+        service_count = len(service_ports)
+        weights = (1 << np.arange(service_count)).astype(np.uint16)
+        permutation = np.argsort(rng.random((server_count, service_count)), axis=1)
+        running = permutation < rng.integers(1, 5, server_count)[:, None]
+        vulnerable = running & (rng.random((server_count, service_count)) < 0.3)
+        
+        services = np.zeros(host_count, dtype=np.uint16)
+        vulnerable_services = np.zeros(host_count, dtype=np.uint16)
+        services[:server_count] = running.astype(np.uint16) @ weights
+        vulnerable_services[:server_count] = vulnerable.astype(np.uint16) @ weights
+        
+        return cls(
+            ip=pool.at(index),
+            role=role,
+            os=os,
+            vulnerability_count=vulnerability_count,
+            services=services,
+            vulnerable_services=vulnerable_services,
+            subnet=pool.network_index(index).astype(np.uint16),
+            service_ports=service_ports
+        )
+    
+    def __len__(self) -> int:
+        return len(self.ip)
+    
+    @property
+    def endpoint_count(self) -> int:
+        return len(self) - self.server_count
+    
+    def server_ips(self) -> np.ndarray:
+        """Return the addresses of all servers."""
+        return self.ip[:self.server_count]
+    
+    def host_index(self, ips: np.ndarray) -> np.ndarray:
+        """
+        Find hosts by address.
+        
+        Args:
+            ips: uint32 addresses
+        
+        Returns:
+            Host index per address, or -1 where no host has the address
+        """
+        ips = np.asarray(ips, dtype=np.uint32)
+        if not len(self._sorted_ip):
+            return np.full(len(ips), -1, dtype=np.int64)
+        
+        position = np.minimum(np.searchsorted(self._sorted_ip, ips), len(self._sorted_ip) - 1)
+        return np.where(self._sorted_ip[position] == ips, self._ip_order[position], -1)
+    
+    def service_index(self, name: str) -> int:
+        """Return the index of a service in the service table, or -1 if unknown."""
+        return self.service_names.index(name) if name in self.service_names else -1
+    
+    def hosts_with_service(self, name: str, vulnerable: Optional[bool] = None) -> np.ndarray:
+        """
+        Find the hosts running a service, e.g. hosts running vulnerable ssh.
+        
+        Args:
+            name: Service name
+            vulnerable: Only vulnerable (True) or only patched (False) instances;
+                None returns every host running the service
+        
+        Returns:
+            Host indices in increasing order
+        """
+        index = self.service_index(name)
+        if index < 0:
+            return np.zeros(0, dtype=np.int64)
+        
+        entries = self._by_service[self._by_service_offsets[index]:self._by_service_offsets[index + 1]]
+        if vulnerable is not None:
+            entries = entries[self.service_vulnerable[entries] == vulnerable]
+        return self.service_host[entries]
+    
+    def service_entries(self, hosts: np.ndarray) -> np.ndarray:
+        """
+        Get the service entries of a set of hosts.
+        
+        Args:
+            hosts: Host indices
+        
+        Returns:
+            Positions into service_host / service_id / service_vulnerable
+        """
+        hosts = np.asarray(hosts, dtype=np.int64)
+        starts = self.service_offsets[hosts]
+        counts = self.service_offsets[hosts + 1] - starts
+        total = int(counts.sum())
+        
+        # Concatenated aranges over each host's entry range
+        shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        return shifts + np.arange(total)
+    
+    def services_on(self, host: int) -> List[Dict[str, Any]]:
+        """
+        List all services on a host.
+        
+        Args:
+            host: Host index
+        
+        Returns:
+            Service dictionaries with name, port, version and vulnerability flag
+        """
+        start, stop = self.service_offsets[host], self.service_offsets[host + 1]
+        return [
+            {
+                'name': self.service_names[service],
+                'port': int(self.service_ports[service]),
+                'version': self._service_version(int(self.ip[host]), service),
+                'is_vulnerable': vulnerable
+            }
+            for service, vulnerable in zip(self.service_id[start:stop].tolist(),
+                                           self.service_vulnerable[start:stop].tolist())
+        ]
+    
+    def sample_vulnerable_services(self, rng: np.random.Generator,
+                                   hosts: np.ndarray) -> np.ndarray:
+        """
+        Pick one vulnerable service per host.
+        
+        Args:
+            rng: Random generator
+            hosts: Host indices
+        
+        Returns:
+            Service index per host, or -1 where the host has none
+        """
+        masks = self.vulnerable_services[hosts]
+        counts = self._popcount[masks]
+        exposed = counts > 0
+        
+        selected = np.full(len(hosts), -1, dtype=np.int64)
+        rank = (rng.random(int(exposed.sum())) * counts[exposed]).astype(np.int64)
+        selected[exposed] = self._bit_table[masks[exposed], rank]
+        return selected
+    
+    def _service_version(self, ip: int, bit: int) -> str:
+        """Derive a stable version string for a service from the host address."""
+        h = (ip * 2654435761 + bit * 40503) & 0xFFFFFFFF
+        return f"{1 + h % 5}.{(h >> 8) % 10}.{(h >> 16) % 10}"
+    
+    def to_dicts(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Render a range of hosts in the dictionary format.
+        
+        Args:
+            start: First host index
+            stop: End of the range (defaults to the whole inventory)
+        
+        Returns:
+            List of server or endpoint dictionaries
+        """
+        stop = len(self) if stop is None else stop
+        names = format_ips(self.ip[start:stop])
+        
+        hosts = []
+        for i, ip in zip(range(start, stop), names):
+            if self.role[i] == ROLE_SERVER:
+                hosts.append({
+                    'ip': ip,
+                    'name': f"server-{i + 1}",
+                    'services': self.services_on(i),
+                    'os': OS_NAMES[self.os[i]],
+                    'vulnerability_count': int(self.vulnerability_count[i])
+                })
+            else:
+                number = i - self.server_count + 1
+                hosts.append({
+                    'ip': ip,
+                    'name': f"endpoint-{number}",
+                    'os': OS_NAMES[self.os[i]],
+                    'user': f"user-{number}",
+                    'vulnerability_count': int(self.vulnerability_count[i])
+                })
+        
+        return hosts
@@ -0,0 +1,214 @@
+import logging
+import time
+from typing import Dict, Any, Callable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from agents.detection import DetectionAgent
+from simulation.traffic import TrafficBatch
+
+logger = logging.getLogger(__name__)
+
+# Latency percentiles reported per stage
+PERCENTILES = (50, 90, 99, 99.9)
+
+def ramp_schedule(start_rate: float, stop_rate: float, stages: int = 5,
+                  stage_duration: float = 10.0, geometric: bool = False) -> List[Tuple[float, float]]:
+    """
+    Build a ramp of load stages.
+    
+    Args:
+        start_rate: Records per second of the first stage
+        stop_rate: Records per second of the last stage
+        stages: Number of stages
+        stage_duration: Wall-clock seconds per stage
+        geometric: Space the rates geometrically instead of linearly
+    
+    Returns:
+        List of (records per second, duration) stages
+    """
+    spacing = np.geomspace if geometric else np.linspace
+    return [(float(rate), float(stage_duration)) for rate in spacing(start_rate, stop_rate, max(1, stages))]
+
+def detection_consumer(agent: Optional[DetectionAgent] = None) -> Callable[[TrafficBatch], Any]:
+    """
+    Wrap a DetectionAgent as a load consumer.
+    Batches are handed over in columnar form, so no record conversion is measured.
+    
+    Args:
+        agent: Agent to feed; a fresh, activated one when omitted
+    
+    Returns:
+        Callable analysing one batch
+    """
+    if agent is None:
+        agent = DetectionAgent()
+        agent.activate()
+    
+    def consume(batch: TrafficBatch) -> Any:
+        return agent.process({"operation": "analyze_traffic", "traffic_data": batch})
+    return consume
+
+class _RecordStream:
+    """Cuts a stream of traffic batches into chunks of any size."""
+    
+    def __init__(self, batches: Iterator[TrafficBatch]):
+        self._batches = batches
+        self._pending: List[TrafficBatch] = []
+        self._available = 0
+    
+    def take(self, count: int) -> TrafficBatch:
+        while self._available < count:
+            batch = next(self._batches)
+            self._pending.append(batch)
+            self._available += len(batch)
+        
+        joined = TrafficBatch.concatenate(self._pending)
+        rest = joined.take(slice(count, None))
+        self._pending = [rest] if len(rest) else []
+        self._available = len(rest)
+        return joined.take(slice(0, count))
+
+class LoadGenerator:
+    """
+    Open-loop load generator feeding simulated traffic to a consumer at a target rate.
+    Each stage releases a chunk of records every `tick` seconds on a fixed
+    schedule. When the consumer falls behind, chunks are released late and
+    the delay is charged to every record as latency, measured from the time
+    the record was due rather than from when it was handed over, so a
+    saturated consumer shows up as growing lag instead of a lower send rate.
+    The records of a stage are generated before its clock starts, so the
+    schedule measures only the consumer; a stage whose generation took
+    longer than its duration is reported as generator-bound.
+    """
+    
+    def __init__(self, network: Any, consumer: Optional[Callable[[TrafficBatch], Any]] = None,
+                 tick: float = 0.05, max_lag: float = 1.0, latency_slo: Optional[float] = None,
+                 start_step: int = 0):
+        """
+        Initialize the load generator.
+        
+        Args:
+            network: NetworkSimulator (or anything with its iter_traffic) supplying records
+            consumer: Callable receiving each chunk; defaults to a DetectionAgent
+            tick: Seconds between chunk releases
+            max_lag: Consumer lag in seconds above which a stage is not sustainable
+            latency_slo: Optional p99 latency in seconds a sustainable stage must meet
+            start_step: First simulation step to draw traffic from
+        """
+        self.consumer = consumer or detection_consumer()
+        self.tick = tick
+        self.max_lag = max_lag
+        self.latency_slo = latency_slo
+        self._stream = _RecordStream(network.iter_traffic(start_step, record_history=False))
+    
+    def run(self, stages: Sequence[Tuple[float, float]], stop_on_saturation: bool = True) -> Dict[str, Any]:
+        """
+        Run a load schedule.
+        
+        Args:
+            stages: (records per second, duration in seconds) per stage, e.g. from ramp_schedule
+            stop_on_saturation: Skip the remaining stages once one is not sustainable
+        
+        Returns:
+            Report with per-stage results, the maximum sustainable rate and its latencies
+        """
+        results = []
+        for rate, duration in stages:
+            result = self._run_stage(rate, duration)
+            results.append(result)
+            logger.info(f"Load stage {rate:.0f} rec/s: achieved {result['achieved_rate']:.0f} rec/s, "
+                        f"p99 {result['latency']['p99'] * 1000:.1f} ms, "
+                        f"{'sustained' if result['sustained'] else 'saturated'}")
+            if result['generator_bound']:
+                logger.warning(f"Load stage {rate:.0f} rec/s: generating records took "
+                               f"{result['generation_seconds']:.2f}s, longer than the stage; "
+                               f"the simulator cannot produce this rate in real time")
+            if stop_on_saturation and not result['sustained']:
+                break
+        
+        sustained = [r for r in results if r['sustained']]
+        best = max(sustained, key=lambda r: r['target_rate']) if sustained else None
+        saturated = [r['target_rate'] for r in results if not r['sustained']]
+        
+        return {
+            'stages': results,
+            'max_sustainable_rate': best['target_rate'] if best else 0.0,
+            'max_sustainable_achieved_rate': best['achieved_rate'] if best else 0.0,
+            'saturation_rate': min(saturated) if saturated else None,
+            'latency': best['latency'] if best else None
+        }
+    
+    def _run_stage(self, rate: float, duration: float) -> Dict[str, Any]:
+        """
+        Drive the consumer at one rate.
+        
+        Args:
+            rate: Target records per second
+            duration: Stage length in seconds
+        
+        Returns:
+            Stage result with throughput, lag and latency percentiles
+        """
+        chunk = max(1, int(round(rate * self.tick)))
+        interval = chunk / rate
+        chunks = max(1, int(duration / interval))
+        
+        # Arrival offset of each record within its chunk
+        arrival_offsets = (np.arange(chunk) + 1) / rate - interval
+        
+        # Generate the whole stage before the clock starts, so generation cost
+        # cannot be mistaken for consumer saturation
+        started = time.perf_counter()
+        batches = [self._stream.take(chunk) for _ in range(chunks)]
+        generation = time.perf_counter() - started
+        
+        latencies = []
+        lags = np.zeros(chunks)
+        busy = 0.0
+        records = 0
+        
+        stage_start = time.perf_counter()
+        for k, batch in enumerate(batches):
+            # The chunk is due once its last record has arrived
+            due = stage_start + (k + 1) * interval
+            now = time.perf_counter()
+            if now < due:
+                time.sleep(due - now)
+            
+            started = time.perf_counter()
+            lags[k] = started - due
+            self.consumer(batch)
+            done = time.perf_counter()
+            
+            busy += done - started
+            records += len(batch)
+            latencies.append(done - (due + arrival_offsets))
+            
+            # Give up on a stage whose backlog is clearly unrecoverable
+            if lags[k] > 10 * self.max_lag:
+                lags = lags[:k + 1]
+                break
+        
+        elapsed = time.perf_counter() - stage_start
+        latencies = np.concatenate(latencies)
+        latency = {f"p{p:g}".replace('.', '_'): float(v) for p, v in zip(PERCENTILES, np.percentile(latencies, PERCENTILES))}
+        latency['mean'] = float(latencies.mean())
+        latency['max'] = float(latencies.max())
+        
+        sustained = bool(len(lags) == chunks and lags[-1] <= self.max_lag and
+                         (self.latency_slo is None or latency['p99'] <= self.latency_slo))
+        
+        return {
+            'target_rate': rate,
+            'achieved_rate': records / elapsed,
+            'records': records,
+            'duration': elapsed,
+            'chunk_records': chunk,
+            'max_lag': float(lags.max()),
+            'final_lag': float(lags[-1]),
+            'consumer_utilization': busy / elapsed,
+            'generation_seconds': generation,
+            'generator_bound': generation > duration,
+            'latency': latency,
+            'sustained': sustained
+        }
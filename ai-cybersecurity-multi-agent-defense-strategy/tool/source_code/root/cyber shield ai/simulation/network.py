@@ -1,10 +1,22 @@
 import logging
-import random
-import time
 import ipaddress
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import numpy as np
-from datetime import datetime, timedelta
+
+from simulation.addresses import AddressPool
+from simulation.arrivals import create_arrival_model
+from simulation.attacks import get_attack_generator
+from simulation.clock import SimulationClock
+from simulation.history import TrafficHistory
+from simulation.inventory import HostInventory
+from simulation.propagation import CompromiseModel
+from simulation.sampling import AliasTable
+from simulation.schedule import AttackSchedule
+from simulation.topology import NetworkTopology
+from simulation.traffic import (
+    PROTOCOLS, PROTOCOL_CODES, TrafficBatch, format_ips, protocol_code, rechunk,
+    register_pattern
+)
 
 logger = logging.getLogger(__name__)
 
@@ -14,32 +26,57 @@ class NetworkSimulator:
     Generates realistic network traffic patterns, including both normal and malicious traffic.
     """
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None,
+                 rng: Optional[np.random.Generator] = None,
+                 clock: Optional[SimulationClock] = None):
         """
         Initialize the network simulator.
         
         Args:
             config: Optional configuration parameters
+            rng: Random generator; defaults to one seeded from config['seed']
+            clock: Simulated clock stamping traffic; defaults to one built from
+                config['start_time'] and config['step_duration']
         """
         self.config = config or {}
         
+        # Random generator shared by infrastructure, attack and traffic generation
+        self.rng = rng if rng is not None else np.random.default_rng(self.config.get('seed'))
+        
+        # Simulated time, decoupled from the wall clock
+        self.clock = clock or SimulationClock(self.config.get('start_time'),
+                                              self.config.get('step_duration', 1.0))
+        
         # Network configuration
         self.internal_network = ipaddress.IPv4Network('192.168.1.0/24')
+        self.internal_networks = [self.internal_network]
         self.external_networks = [
             ipaddress.IPv4Network('203.0.113.0/24'),  # TEST-NET-3 (documentation)
             ipaddress.IPv4Network('198.51.100.0/24'), # TEST-NET-2 (documentation)
             ipaddress.IPv4Network('192.0.2.0/24')     # TEST-NET-1 (documentation)
         ]
         
-        # Infrastructure components
-        self.servers = []
-        self.endpoints = []
+        # Address pools, sampled by index instead of enumerating hosts
+        self.internal_pool = AddressPool([self.internal_network])
+        self.topology = NetworkTopology(self.internal_networks)
+        self.external_pool = AddressPool(self.external_networks)
+        self.host_pool = AddressPool.from_addresses([])
+        self.threat_actor_pool = AddressPool.from_addresses([])
+        
+        # Infrastructure components; hosts live in a compact array inventory
+        self.inventory: Optional[HostInventory] = None
         self.threat_actors = []
         
+        # Lateral movement between hosts (enabled per scenario)
+        self.compromise: Optional[CompromiseModel] = None
+        self.compromise_traffic_rate = 1.0
+        
         # Traffic parameters
         self.baseline_traffic_rate = 5  # packets per step
         self.traffic_variance = 0.3     # variance in traffic rate
         self.malicious_traffic_ratio = 0.0  # ratio of malicious to normal traffic
+        self.arrival_model = create_arrival_model(None, self.baseline_traffic_rate, self.clock,
+                                                  self.traffic_variance)
         
         # Common protocols and ports
         self.protocols = ['tcp', 'udp', 'http', 'https', 'dns', 'smtp', 'ssh', 'ftp']
@@ -53,12 +90,31 @@ class NetworkSimulator:
             'telnet': 23
         }
         
-        # Attack patterns (populated during reset)
+        # Lookup tables from protocol code to simulated protocols and standard ports
+        self._protocol_codes = np.array([protocol_code(p) for p in self.protocols], dtype=np.uint8)
+        self._protocol_ports = np.zeros(len(PROTOCOLS), dtype=np.int64)
+        for name, port in self.common_ports.items():
+            self._protocol_ports[protocol_code(name)] = port
+        
+        # Malicious traffic patterns and their payload size ranges
+        self.malicious_patterns = ['command_and_control', 'data_exfiltration', 'exploit_attempt', 'reconnaissance']
+        self._malicious_pattern_codes = np.array([register_pattern([p]) for p in self.malicious_patterns])
+        self._malicious_payload_low = np.array([100, 5000, 500, 50])
+        self._malicious_payload_high = np.array([1000, 50000, 3000, 200])
+        
+        # Categorical samplers (rebuilt on reset from the scenario's distributions)
+        self.protocol_sampler = AliasTable.from_mix(self.protocols)
+        self.host_sampler = AliasTable.zipf(1, 0.0)
+        self.external_sampler = AliasTable.zipf(len(self.external_pool), 0.0)
+        self.pattern_sampler = AliasTable.from_mix(self.malicious_patterns)
+        
+        # Attack patterns (populated during reset) and their step index
         self.attack_patterns = []
+        self.attack_schedule = AttackSchedule()
         
-        # Traffic history
-        self.traffic_history = []
-        self.max_history = 1000
+        # Traffic history ring buffer
+        self.max_history = self.config.get('max_history', 1000)
+        self.traffic_history = TrafficHistory(self.max_history)
         
         # Initialize with default configuration
         self.reset()
@@ -78,14 +134,58 @@ class NetworkSimulator:
         self.malicious_traffic_ratio = config.get('malicious_ratio', 0.05)
         self.baseline_traffic_rate = config.get('traffic_rate', 5)
         
+        # Per-step volume model ('arrival_model' spec; defaults to uniform variance)
+        self.arrival_model = create_arrival_model(config.get('arrival_model'), self.baseline_traffic_rate,
+                                                  self.clock, self.traffic_variance)
+        
+        # Internal topology, optionally spread over several subnets
+        internal_networks = config.get('internal_networks', ['192.168.1.0/24'])
+        if isinstance(internal_networks, str):
+            internal_networks = [internal_networks]
+        self.internal_networks = [ipaddress.IPv4Network(n) for n in internal_networks]
+        self.internal_network = self.internal_networks[0]
+        self.internal_pool = AddressPool(self.internal_networks)
+        
+        # Routed topology over the internal segments; routes are computed here once
+        self.topology = NetworkTopology(self.internal_networks, config.get('topology'))
+        
+        # Strength of segment firewalls against malicious cross-segment traffic; a
+        # strength is a blocking probability, so scenario values are clamped to [0, 1]
+        self.network_segmentation = min(1.0, max(0.0, float(config.get('network_segmentation', 0.0))))
+        self.blocked_traffic = 0
+        
         # Generate infrastructure
         self._generate_infrastructure(config)
         
-        # Generate attack patterns
+        # Build the categorical distributions used by traffic generation
+        self._build_samplers(config)
+        
+        # Lateral movement between hosts, if the scenario enables it
+        self.compromise = None
+        lateral_movement = config.get('lateral_movement')
+        if lateral_movement:
+            self.compromise = CompromiseModel.from_config(
+                self.rng, self.inventory, self.topology, lateral_movement,
+                segmentation=self.network_segmentation,
+                endpoint_protection=min(1.0, max(0.0, float(config.get('endpoint_protection', 0.0))))
+            )
+            self.compromise_traffic_rate = lateral_movement.get('records_per_host', 1.0)
+        
+        # Generate attack patterns and index them by step
         self._generate_attack_patterns(config)
+        self.attack_schedule = AttackSchedule(self.attack_patterns)
+        
+        # Add attacks scripted by the scenario
+        for attack in config.get('scripted_attacks', []):
+            self.add_attack(attack)
         
         # Reset traffic history
-        self.traffic_history = []
+        max_history = config.get('max_history', self.max_history)
+        if max_history != self.max_history:
+            self.max_history = max_history
+            self.traffic_history = TrafficHistory(max_history)
+        else:
+            self.traffic_history.clear()
         
         logger.info(f"Network simulator reset with malicious ratio: {self.malicious_traffic_ratio}")
     
@@ -96,76 +196,72 @@ class NetworkSimulator:
         Args:
             config: Configuration parameters
         """
-        # Generate servers
         server_count = config.get('server_count', 5)
-        self.servers = []
-        
-        for i in range(server_count):
-            ip = str(list(self.internal_network.hosts())[i])
-            server = {
-                'ip': ip,
-                'name': f"server-{i+1}",
-                'services': self._generate_services(),
-                'os': random.choice(['Linux', 'Windows Server']),
-                'vulnerability_count': random.randint(0, 3)
-            }
-            self.servers.append(server)
-        
-        # Generate endpoints
         endpoint_count = config.get('endpoint_count', 10)
-        self.endpoints = []
-        
-        for i in range(endpoint_count):
-            ip = str(list(self.internal_network.hosts())[i + server_count])
-            endpoint = {
-                'ip': ip,
-                'name': f"endpoint-{i+1}",
-                'os': random.choice(['Windows 10', 'Windows 11', 'MacOS', 'Linux']),
-                'user': f"user-{i+1}",
-                'vulnerability_count': random.randint(0, 2)
-            }
-            self.endpoints.append(endpoint)
+        
+        # Generate servers and endpoints; servers take the first internal addresses
+        self.inventory = HostInventory.generate(
+            self.rng, self.internal_pool, server_count, endpoint_count, self.common_ports
+        )
+        self.host_pool = self.inventory.address_pool
         
         # Generate threat actors
         threat_actor_count = config.get('threat_actor_count', 3)
         self.threat_actors = []
         
+        actor_ips = self.external_pool.sample(self.rng, threat_actor_count)
+        actor_names = format_ips(actor_ips)
+        self.threat_actor_pool = AddressPool.from_addresses(actor_ips)
+        
         for i in range(threat_actor_count):
-            external_net = random.choice(self.external_networks)
-            ip = str(random.choice(list(external_net.hosts())))
             actor = {
-                'ip': ip,
+                'ip': actor_names[i],
                 'name': f"threat-actor-{i+1}",
-                'sophistication': random.uniform(0.3, 0.9),
-                'preferred_techniques': random.sample([
+                'sophistication': self.rng.uniform(0.3, 0.9),
+                'preferred_techniques': self.rng.choice([
                     'reconnaissance', 'exploitation', 'lateral_movement', 
                     'data_exfiltration', 'persistence'
-                ], k=random.randint(2, 4))
+                ], size=self.rng.integers(2, 5), replace=False).tolist()
             }
             self.threat_actors.append(actor)
+        
+        logger.debug(f"Generated {server_count} servers and {endpoint_count} endpoints "
+                     f"across {len(self.internal_networks)} internal networks")
     
-    def _generate_services(self) -> List[Dict[str, Any]]:
+    def _build_samplers(self, config: Dict[str, Any]) -> None:
         """
-        Generate a list of services for a server.
+        Build alias tables for the scenario's traffic distributions.
         
-        Returns:
-            List of service dictionaries
-        """
-        service_count = random.randint(1, 4)
-        available_services = list(self.common_ports.items())
-        selected_services = random.sample(available_services, min(service_count, len(available_services)))
-        
-        services = []
-        for name, port in selected_services:
-            service = {
-                'name': name,
-                'port': port,
-                'version': f"{random.randint(1, 5)}.{random.randint(0, 9)}.{random.randint(0, 9)}",
-                'is_vulnerable': random.random() < 0.3
-            }
-            services.append(service)
+        Args:
+            config: Network parameters; recognises 'protocol_mix' (protocol name
+                to weight), 'host_zipf' and 'external_zipf' (Zipf exponents of
+                internal and external host popularity, 0 for uniform) and
+                'malicious_pattern_mix' (pattern name to weight)
+        """
+        protocol_mix = config.get('protocol_mix')
+        if protocol_mix:
+            # A mix may introduce any known protocol, not just the defaults
+            names = [p for p in protocol_mix if p in PROTOCOL_CODES]
+            self._protocol_codes = np.array([protocol_code(p) for p in names], dtype=np.uint8)
+            self.protocol_sampler = AliasTable.from_mix(names, protocol_mix)
+        else:
+            self._protocol_codes = np.array([protocol_code(p) for p in self.protocols], dtype=np.uint8)
+            self.protocol_sampler = AliasTable.from_mix(self.protocols)
         
-        return services
+        # Lower host indices (servers first) are the most popular under Zipf
+        self.host_sampler = AliasTable.zipf(len(self.host_pool), config.get('host_zipf', 0.0))
+        self.external_sampler = AliasTable.zipf(len(self.external_pool), config.get('external_zipf', 0.0))
+        self.pattern_sampler = AliasTable.from_mix(self.malicious_patterns, config.get('malicious_pattern_mix'))
+    
+    @property
+    def servers(self) -> List[Dict[str, Any]]:
+        """Dictionary view of the simulated servers."""
+        return self.inventory.to_dicts(0, self.inventory.server_count)
+    
+    @property
+    def endpoints(self) -> List[Dict[str, Any]]:
+        """Dictionary view of the simulated endpoints."""
+        return self.inventory.to_dicts(self.inventory.server_count)
     
     def _generate_attack_patterns(self, config: Dict[str, Any]) -> None:
         """
@@ -177,28 +273,28 @@ class NetworkSimulator:
         # Attack types and their characteristics
         attack_types = {
             'port_scan': {
-                'duration': random.randint(3, 8),
-                'intensity': random.uniform(0.4, 0.8),
+                'duration': int(self.rng.integers(3, 9)),
+                'intensity': self.rng.uniform(0.4, 0.8),
                 'target_selection': 'sequential',
                 'port_pattern': 'sequential'
             },
             'brute_force': {
-                'duration': random.randint(5, 12),
-                'intensity': random.uniform(0.5, 0.9),
+                'duration': int(self.rng.integers(5, 13)),
+                'intensity': self.rng.uniform(0.5, 0.9),
                 'target_selection': 'single',
-                'target_service': random.choice(['ssh', 'ftp', 'smtp'])
+                'target_service': str(self.rng.choice(['ssh', 'ftp', 'smtp']))
             },
             'data_exfiltration': {
-                'duration': random.randint(2, 5),
-                'intensity': random.uniform(0.2, 0.6),
+                'duration': int(self.rng.integers(2, 6)),
+                'intensity': self.rng.uniform(0.2, 0.6),
                 'target_selection': 'single',
-                'data_volume': random.randint(1000, 50000)
+                'data_volume': int(self.rng.integers(1000, 50001))
             },
             'ddos': {
-                'duration': random.randint(4, 10),
-                'intensity': random.uniform(0.7, 1.0),
+                'duration': int(self.rng.integers(4, 11)),
+                'intensity': self.rng.uniform(0.7, 1.0),
                 'target_selection': 'single',
-                'attack_vector': random.choice(['syn_flood', 'udp_flood', 'http_flood'])
+                'attack_vector': str(self.rng.choice(['syn_flood', 'udp_flood', 'http_flood']))
             }
         }
         
@@ -206,32 +302,37 @@ class NetworkSimulator:
         attack_probability = config.get('attack_probability', 0.3)
         self.attack_patterns = []
         
-        if random.random() < attack_probability:
+        if self.rng.random() < attack_probability:
             # Select one or more attack types
-            attack_count = random.randint(1, 3)
-            selected_attacks = random.sample(list(attack_types.keys()), min(attack_count, len(attack_types)))
+            attack_count = int(self.rng.integers(1, 4))
+            selected_attacks = self.rng.choice(
+                list(attack_types.keys()), min(attack_count, len(attack_types)), replace=False
+            ).tolist()
             
             for attack_name in selected_attacks:
                 attack_config = attack_types[attack_name]
                 
-                # Select target(s)
-                if attack_config['target_selection'] == 'single':
-                    targets = [random.choice(self.servers)]
+                # Select target(s) as server indices
+                server_count = self.inventory.server_count
+                if attack_name == 'brute_force':
+                    targets = self._service_targets(attack_config['target_service'])
+                elif attack_config['target_selection'] == 'single':
+                    targets = self.rng.integers(0, server_count, 1)
                 elif attack_config['target_selection'] == 'multiple':
-                    target_count = random.randint(2, min(4, len(self.servers)))
-                    targets = random.sample(self.servers, target_count)
+                    target_count = int(self.rng.integers(2, min(4, server_count) + 1))
+                    targets = self.rng.choice(server_count, target_count, replace=False)
                 else:  # sequential
-                    targets = self.servers.copy()
-                    random.shuffle(targets)
+                    targets = self.rng.permutation(server_count)
                 
                 # Create attack pattern
                 attack = {
                     'type': attack_name,
-                    'start_step': random.randint(10, 30),
+                    'start_step': int(self.rng.integers(10, 31)),
                     'duration': attack_config['duration'],
                     'intensity': attack_config['intensity'],
                     'targets': targets,
-                    'source': random.choice(self.threat_actors),
+                    'target_ips': self.inventory.ip[targets],
+                    'source': self.threat_actors[self.rng.integers(0, len(self.threat_actors))],
                     'config': attack_config
                 }
                 
@@ -239,193 +340,379 @@ class NetworkSimulator:
                 
                 logger.debug(f"Generated attack pattern: {attack_name} targeting {len(targets)} servers")
     
+    def _service_targets(self, service: str) -> np.ndarray:
+        """
+        Pick one server for an attack on a service.
+        Servers exposing a vulnerable instance are preferred over servers
+        merely running it, which are preferred over any server.
+        
+        Args:
+            service: Service name
+        
+        Returns:
+            Array with one server index
+        """
+        for vulnerable in (True, None):
+            candidates = self.inventory.hosts_with_service(service, vulnerable)
+            if len(candidates):
+                return candidates[self.rng.integers(0, len(candidates), 1)]
+        return self.rng.integers(0, self.inventory.server_count, 1)
+    
+    def add_attack(self, attack: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Schedule an additional attack pattern, including while a simulation is running.
+        
+        Args:
+            attack: Attack with 'type', 'start_step' and 'duration'; 'intensity',
+                'targets' (server indices), 'source' (threat actor) and 'config' are optional
+        
+        Returns:
+            The scheduled attack pattern
+        """
+        if get_attack_generator(attack['type']) is None:
+            logger.warning(f"No traffic generator registered for attack type: {attack['type']}")
+        
+        if 'targets' in attack:
+            targets = np.asarray(attack['targets'], dtype=np.int64)
+        else:
+            targets = self.rng.integers(0, self.inventory.server_count, 1)
+        
+        source = attack.get('source')
+        if source is None:
+            source = self.threat_actors[self.rng.integers(0, len(self.threat_actors))]
+        
+        pattern = {
+            'type': attack['type'],
+            'start_step': int(attack['start_step']),
+            'duration': int(attack['duration']),
+            'intensity': attack.get('intensity', 0.5),
+            'targets': targets,
+            'target_ips': self.inventory.ip[targets],
+            'source': source,
+            'config': attack.get('config', {})
+        }
+        
+        self.attack_patterns.append(pattern)
+        self.attack_schedule.add(pattern)
+        
+        return pattern
+    
     def generate_traffic(self, step: int) -> List[Dict[str, Any]]:
         """
         Generate network traffic for a simulation step.
         
         Args:
             step: The current simulation step
-            
+        
         Returns:
             List of network traffic records
         """
+        return self.generate_traffic_batch(step).to_records()
+    
+    def generate_traffic_batch(self, step: int) -> TrafficBatch:
+        """
+        Generate network traffic for a simulation step as a columnar batch.
+        
+        Args:
+            step: The current simulation step
+        
+        Returns:
+            TrafficBatch with the step's normal, malicious and attack traffic
+        """
+        batch = self._build_step_traffic(step)
+        
+        # Add to history (with size limit)
+        self.traffic_history.append(batch)
+        
+        return batch
+    
+    def iter_traffic(self, start_step: int = 0, stop_step: Optional[int] = None,
+                     batch_records: Optional[int] = None,
+                     record_history: bool = True) -> Iterator[TrafficBatch]:
+        """
+        Lazily generate traffic over a range of steps.
+        A step is only generated when the consumer asks for more records, so
+        a slow consumer naturally throttles generation.
+        
+        Args:
+            start_step: First step to generate
+            stop_step: Step after the last one; None generates indefinitely
+            batch_records: Re-chunk the output into batches of this many records;
+                None yields one batch per step
+            record_history: Append generated traffic to traffic_history
+        
+        Returns:
+            Iterator of TrafficBatch objects in time order
+        """
+        def steps() -> Iterator[TrafficBatch]:
+            step = start_step
+            while stop_step is None or step < stop_step:
+                batch = self._build_step_traffic(step)
+                if record_history:
+                    self.traffic_history.append(batch)
+                yield batch
+                step += 1
+        
+        if batch_records is None:
+            return steps()
+        return rechunk(steps(), batch_records)
+    
+    def _build_step_traffic(self, step: int) -> TrafficBatch:
+        """
+        Generate the traffic of a step without touching the history.
+        
+        Args:
+            step: The current simulation step
+        
+        Returns:
+            TrafficBatch ordered by timestamp
+        """
+        rng = self.rng
+        
         # Determine baseline traffic amount for this step
         base_amount = self.baseline_traffic_rate
-        variance = random.uniform(-self.traffic_variance, self.traffic_variance)
-        traffic_amount = max(1, int(base_amount * (1 + variance)))
+        traffic_amount = max(1, self.arrival_model.count(rng, step))
         
         # Check for active attacks
-        active_attacks = [
-            a for a in self.attack_patterns 
-            if a['start_step'] <= step < (a['start_step'] + a['duration'])
-        ]
+        active_attacks = self.attack_schedule.active(step)
         
         # Increase traffic for active attacks
         for attack in active_attacks:
-            attack_traffic = int(base_amount * attack['intensity'] * random.uniform(0.8, 1.2))
+            attack_traffic = int(base_amount * attack['intensity'] * rng.uniform(0.8, 1.2))
             traffic_amount += attack_traffic
         
-        # Generate traffic records
-        traffic_records = []
-        
         # Generate normal traffic
         normal_amount = traffic_amount
         if active_attacks:
             # Reduce normal traffic slightly during attacks
             normal_amount = max(1, int(normal_amount * 0.8))
         
-        for _ in range(normal_amount):
-            traffic_records.append(self._generate_normal_traffic())
+        batches = [self._generate_normal_traffic(normal_amount)]
         
         # Generate attack traffic
         for attack in active_attacks:
-            attack_records = self._generate_attack_traffic(attack, step)
-            traffic_records.extend(attack_records)
+            batches.append(self._generate_attack_traffic(attack, step))
         
         # Add random malicious traffic (outside of specific attack patterns)
-        if random.random() < self.malicious_traffic_ratio and not active_attacks:
+        if rng.random() < self.malicious_traffic_ratio and not active_attacks:
             malicious_count = max(1, int(traffic_amount * self.malicious_traffic_ratio))
-            for _ in range(malicious_count):
-                traffic_records.append(self._generate_malicious_traffic())
+            batches.append(self._generate_malicious_traffic(malicious_count))
         
-        # Add to history (with size limit)
-        self.traffic_history.extend(traffic_records)
-        if len(self.traffic_history) > self.max_history:
-            self.traffic_history = self.traffic_history[-self.max_history:]
+        # Spread compromise, then let compromised hosts probe and beacon
+        if self.compromise is not None:
+            self.compromise.step(rng, step)
+            batches.append(self._generate_compromise_traffic())
+        
+        batch = TrafficBatch.concatenate(batches)
+        
+        # Route every flow and let segment firewalls stop malicious crossings
+        batch.path = self.topology.route_ips(batch.source_ip, batch.destination_ip)
+        batch = self._enforce_segmentation(batch)
         
-        return traffic_records
+        # Spread records over the step's simulated interval, in time order
+        timestamps = self.clock.timestamps(step, len(batch), rng)
+        order = np.argsort(timestamps, kind='stable')
+        batch = batch.take(order)
+        batch.timestamp = timestamps[order]
+        
+        return batch
     
-    def _generate_normal_traffic(self) -> Dict[str, Any]:
+    def _enforce_segmentation(self, batch: TrafficBatch) -> TrafficBatch:
         """
-        Generate a normal (benign) network traffic record.
+        Drop malicious flows stopped by the internal firewalls on their path.
+        Each internal firewall crossed stops a flow with probability
+        network_segmentation; the perimeter firewall is not counted.
+        
+        Args:
+            batch: Routed traffic
         
         Returns:
-            Dictionary representing a network traffic record
+            The traffic that got through
+        """
+        if self.network_segmentation <= 0:
+            return batch
+        
+        crossings = self.topology.internal_firewall_count[batch.path]
+        exposed = batch.is_malicious & (crossings > 0)
+        if not exposed.any():
+            return batch
+        
+        passed = self.rng.random(len(batch)) < (1 - self.network_segmentation) ** crossings
+        keep = ~exposed | passed
+        self.blocked_traffic += int(len(batch) - np.count_nonzero(keep))
+        return batch.take(keep)
+    
+    def _sample_protocols(self, count: int) -> Tuple[np.ndarray, np.ndarray]:
         """
-        # Randomly select source and destination
-        internal_hosts = self.endpoints + self.servers
+        Sample protocols from the configured mix with their standard ports.
         
-        if random.random() < 0.7:  # Internal to internal
-            source = random.choice(internal_hosts)
-            destination = random.choice(internal_hosts)
-            while destination == source:
-                destination = random.choice(internal_hosts)
-            
-            source_ip = source['ip']
-            dest_ip = destination['ip']
-        else:  # External to internal or vice versa
-            if random.random() < 0.5:  # External to internal
-                external_net = random.choice(self.external_networks)
-                source_ip = str(random.choice(list(external_net.hosts())))
-                destination = random.choice(internal_hosts)
-                dest_ip = destination['ip']
-            else:  # Internal to external
-                source = random.choice(internal_hosts)
-                source_ip = source['ip']
-                external_net = random.choice(self.external_networks)
-                dest_ip = str(random.choice(list(external_net.hosts())))
+        Args:
+            count: Number of records
+        
+        Returns:
+            Tuple of (protocol codes, ports)
+        """
+        protocols = self._protocol_codes[self.protocol_sampler.sample(self.rng, count)]
+        ports = self._protocol_ports[protocols]
+        
+        # Protocols without a well-known port use an ephemeral one
+        unassigned = ports == 0
+        ports[unassigned] = self.rng.integers(1024, 65536, int(unassigned.sum()))
+        
+        return protocols, ports
+    
+    def _sample_external(self, count: int) -> np.ndarray:
+        """Sample external addresses by popularity."""
+        return self.external_pool.at(self.external_sampler.sample(self.rng, count))
+    
+    def _generate_normal_traffic(self, count: int) -> TrafficBatch:
+        """
+        Generate normal (benign) network traffic records.
+        
+        Args:
+            count: Number of records to generate
+        
+        Returns:
+            TrafficBatch of benign traffic
+        """
+        rng = self.rng
+        host_count = len(self.host_pool)
+        
+        # Select source and destination hosts by popularity, then move any
+        # destination that equals its source to another host
+        source_index = self.host_sampler.sample(rng, count)
+        dest_index = self.host_sampler.sample(rng, count)
+        same = np.flatnonzero(source_index == dest_index)
+        dest_index[same] = (dest_index[same] + rng.integers(1, max(2, host_count), len(same))) % host_count
+        source_ip = self.host_pool.at(source_index)
+        dest_ip = self.host_pool.at(dest_index)
+        
+        # 30% of traffic crosses the perimeter, split evenly between directions
+        external = rng.random(count) >= 0.7
+        inbound = external & (rng.random(count) < 0.5)
+        outbound = external & ~inbound
+        source_ip[inbound] = self._sample_external(int(inbound.sum()))
+        dest_ip[outbound] = self._sample_external(int(outbound.sum()))
         
         # Select protocol and port
-        protocol = random.choice(self.protocols)
-        port = self.common_ports.get(protocol, random.randint(1024, 65535))
+        protocol, port = self._sample_protocols(count)
         
         # Generate payload size
-        if protocol in ['http', 'https']:
-            payload_size = random.randint(200, 8000)
-        elif protocol in ['dns']:
-            payload_size = random.randint(40, 300)
-        else:
-            payload_size = random.randint(50, 2000)
-        
-        # Create traffic record
-        traffic = {
-            'source_ip': source_ip,
-            'destination_ip': dest_ip,
-            'protocol': protocol,
-            'port': port,
-            'payload_size': payload_size,
-            'timestamp': datetime.now().isoformat(),
-            'is_malicious': False,
-            'confidence': 0.0,
-            'patterns': []
-        }
-        
-        return traffic
+        is_web = (protocol == PROTOCOL_CODES['http']) | (protocol == PROTOCOL_CODES['https'])
+        is_dns = protocol == PROTOCOL_CODES['dns']
+        low = np.where(is_web, 200, np.where(is_dns, 40, 50))
+        high = np.where(is_web, 8000, np.where(is_dns, 300, 2000))
+        
+        return TrafficBatch(
+            source_ip=source_ip,
+            destination_ip=dest_ip,
+            protocol=protocol,
+            port=port,
+            payload_size=rng.integers(low, high + 1),
+            is_malicious=False,
+            confidence=0.0,
+            pattern=0
+        )
     
-    def _generate_malicious_traffic(self) -> Dict[str, Any]:
+    def _generate_malicious_traffic(self, count: int) -> TrafficBatch:
         """
-        Generate a malicious network traffic record.
+        Generate malicious network traffic records.
+        
+        Args:
+            count: Number of records to generate
         
         Returns:
-            Dictionary representing a malicious network traffic record
-        """
-        # Select a threat actor as the source
-        threat_actor = random.choice(self.threat_actors)
-        source_ip = threat_actor['ip']
-        
-        # Select a target
-        target = random.choice(self.servers + self.endpoints)
-        dest_ip = target['ip']
-        
-        # Select protocol and port based on vulnerability
-        if isinstance(target, dict) and 'services' in target:
-            # Target is a server
-            vulnerable_services = [s for s in target.get('services', []) if s.get('is_vulnerable', False)]
-            if vulnerable_services:
-                service = random.choice(vulnerable_services)
-                protocol = service['name']
-                port = service['port']
-            else:
-                protocol = random.choice(self.protocols)
-                port = self.common_ports.get(protocol, random.randint(1024, 65535))
-        else:
-            # Target is an endpoint or doesn't have services
-            protocol = random.choice(self.protocols)
-            port = self.common_ports.get(protocol, random.randint(1024, 65535))
-        
-        # Determine malicious pattern
-        pattern_types = ['command_and_control', 'data_exfiltration', 'exploit_attempt', 'reconnaissance']
-        pattern = random.choice(pattern_types)
-        
-        # Generate payload size based on pattern
-        if pattern == 'data_exfiltration':
-            payload_size = random.randint(5000, 50000)
-        elif pattern == 'command_and_control':
-            payload_size = random.randint(100, 1000)
-        elif pattern == 'exploit_attempt':
-            payload_size = random.randint(500, 3000)
-        else:  # reconnaissance
-            payload_size = random.randint(50, 200)
-        
-        # Create traffic record
-        traffic = {
-            'source_ip': source_ip,
-            'destination_ip': dest_ip,
-            'protocol': protocol,
-            'port': port,
-            'payload_size': payload_size,
-            'timestamp': datetime.now().isoformat(),
-            'is_malicious': True,
-            'confidence': random.uniform(0.6, 0.95),
-            'patterns': [pattern]
-        }
+            TrafficBatch of malicious traffic
+        """
+        rng = self.rng
+        
+        # Select threat actors as sources and hosts as targets
+        source_ip = self.threat_actor_pool.sample(rng, count)
+        target_index = self.host_sampler.sample(rng, count)
+        dest_ip = self.host_pool.at(target_index)
+        
+        protocol, port = self._sample_protocols(count)
+        
+        # Targets with vulnerable services are attacked through one of them
+        service = self.inventory.sample_vulnerable_services(rng, target_index)
+        exposed = service >= 0
+        protocol[exposed] = self.inventory.service_protocols[service[exposed]]
+        port[exposed] = self.inventory.service_ports[service[exposed]]
+        
+        # Determine malicious pattern and matching payload size
+        pattern = self.pattern_sampler.sample(rng, count)
+        
+        return TrafficBatch(
+            source_ip=source_ip,
+            destination_ip=dest_ip,
+            protocol=protocol,
+            port=port,
+            payload_size=rng.integers(self._malicious_payload_low[pattern],
+                                      self._malicious_payload_high[pattern] + 1),
+            is_malicious=True,
+            confidence=rng.uniform(0.6, 0.95, count),
+            pattern=self._malicious_pattern_codes[pattern]
+        )
+    
+    def _generate_compromise_traffic(self) -> TrafficBatch:
+        """
+        Generate traffic from compromised hosts.
+        Half the records are lateral-movement probes along host links, the
+        other half command-and-control beacons to threat actors.
         
-        return traffic
+        Returns:
+            TrafficBatch of malicious traffic
+        """
+        rng = self.rng
+        count = int(self.compromise.compromised_count * self.compromise_traffic_rate)
+        if not count:
+            return TrafficBatch.empty()
+        
+        # Lateral movement over remote administration and file sharing services
+        sources, targets = self.compromise.sample_links(rng, (count + 1) // 2)
+        lateral_ports = np.array([22, 445, 3389, 5985])
+        lateral_protocols = np.array([PROTOCOL_CODES['ssh'], PROTOCOL_CODES['tcp'],
+                                      PROTOCOL_CODES['tcp'], PROTOCOL_CODES['http']])
+        service = rng.integers(0, len(lateral_ports), len(sources))
+        lateral = TrafficBatch(
+            source_ip=self.inventory.ip[sources],
+            destination_ip=self.inventory.ip[targets],
+            protocol=lateral_protocols[service],
+            port=lateral_ports[service],
+            payload_size=rng.integers(100, 1501, len(sources)),
+            is_malicious=True,
+            confidence=rng.uniform(0.5, 0.8, len(sources)),
+            pattern=register_pattern(['lateral_movement'])
+        )
+        
+        # Beacons from random compromised hosts
+        infected = np.flatnonzero(self.compromise.compromised)
+        beacon_count = count // 2
+        beacons = TrafficBatch(
+            source_ip=self.inventory.ip[infected[rng.integers(0, len(infected), beacon_count)]],
+            destination_ip=self.threat_actor_pool.sample(rng, beacon_count),
+            protocol=PROTOCOL_CODES['https'],
+            port=443,
+            payload_size=rng.integers(64, 513, beacon_count),
+            is_malicious=True,
+            confidence=rng.uniform(0.6, 0.9, beacon_count),
+            pattern=register_pattern(['command_and_control'])
+        )
+        
+        return TrafficBatch.concatenate([lateral, beacons])
     
-    def _generate_attack_traffic(self, attack: Dict[str, Any], step: int) -> List[Dict[str, Any]]:
+    def _generate_attack_traffic(self, attack: Dict[str, Any], step: int) -> TrafficBatch:
         """
         Generate traffic records for a specific attack.
         
         Args:
             attack: Attack configuration
             step: Current simulation step
-            
+        
         Returns:
-            List of traffic records for the attack
+            TrafficBatch of traffic for the attack
         """
         attack_type = attack['type']
-        source = attack['source']
-        targets = attack['targets']
         intensity = attack['intensity']
         
         # Determine how many records to generate based on attack intensity and progress
@@ -440,159 +727,14 @@ class NetworkSimulator:
             # Sustained phase
             volume_factor = 1.0
         
-        record_count = max(1, int(intensity * 10 * volume_factor * random.uniform(0.8, 1.2)))
-        
-        # Generate attack-specific traffic
-        records = []
-        
-        if attack_type == 'port_scan':
-            records = self._generate_port_scan_traffic(source, targets, record_count, attack['config'])
-        elif attack_type == 'brute_force':
-            records = self._generate_brute_force_traffic(source, targets, record_count, attack['config'])
-        elif attack_type == 'data_exfiltration':
-            records = self._generate_exfiltration_traffic(source, targets, record_count, attack['config'])
-        elif attack_type == 'ddos':
-            records = self._generate_ddos_traffic(source, targets, record_count, attack['config'])
-        
-        return records
-    
-    def _generate_port_scan_traffic(self, source: Dict[str, Any], targets: List[Dict[str, Any]], 
-                                   count: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate traffic for a port scanning attack."""
-        records = []
-        
-        # Determine port pattern
-        port_pattern = config.get('port_pattern', 'sequential')
-        
-        for _ in range(count):
-            target = random.choice(targets)
-            
-            if port_pattern == 'sequential':
-                # Sequential port scanning
-                port_base = random.choice([1, 22, 80, 443, 1024, 8080])
-                port = port_base + random.randint(0, 20)
-            else:
-                # Common ports scanning
-                port = random.choice(list(self.common_ports.values()))
-            
-            record = {
-                'source_ip': source['ip'],
-                'destination_ip': target['ip'],
-                'protocol': random.choice(['tcp', 'udp']),
-                'port': port,
-                'payload_size': random.randint(40, 100),
-                'timestamp': datetime.now().isoformat(),
-                'is_malicious': True,
-                'confidence': 0.7 + random.uniform(0, 0.2),
-                'patterns': ['port_scan', 'reconnaissance']
-            }
-            
-            records.append(record)
-        
-        return records
-    
-    def _generate_brute_force_traffic(self, source: Dict[str, Any], targets: List[Dict[str, Any]], 
-                                     count: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate traffic for a brute force attack."""
-        records = []
-        
-        target_service = config.get('target_service', 'ssh')
-        port = self.common_ports.get(target_service, 22)
-        
-        for _ in range(count):
-            target = random.choice(targets)
-            
-            record = {
-                'source_ip': source['ip'],
-                'destination_ip': target['ip'],
-                'protocol': target_service,
-                'port': port,
-                'payload_size': random.randint(200, 500),
-                'timestamp': datetime.now().isoformat(),
-                'is_malicious': True,
-                'confidence': 0.8 + random.uniform(0, 0.15),
-                'patterns': ['brute_force', 'authentication_attack']
-            }
-            
-            records.append(record)
-        
-        return records
-    
-    def _generate_exfiltration_traffic(self, source: Dict[str, Any], targets: List[Dict[str, Any]], 
-                                      count: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate traffic for a data exfiltration attack."""
-        records = []
-        
-        data_volume = config.get('data_volume', 10000)
-        
-        # Split the data volume across multiple records
-        volume_per_record = data_volume / max(1, count)
-        
-        for _ in range(count):
-            target = random.choice(targets)
-            
-            record = {
-                'source_ip': target['ip'],  # Exfiltrating FROM target
-                'destination_ip': source['ip'],  # TO attacker
-                'protocol': random.choice(['https', 'dns', 'smtp']),
-                'port': random.choice([443, 53, 25]),
-                'payload_size': int(volume_per_record * random.uniform(0.8, 1.2)),
-                'timestamp': datetime.now().isoformat(),
-                'is_malicious': True,
-                'confidence': 0.75 + random.uniform(0, 0.2),
-                'patterns': ['data_exfiltration', 'data_theft']
-            }
-            
-            records.append(record)
-        
-        return records
-    
-    def _generate_ddos_traffic(self, source: Dict[str, Any], targets: List[Dict[str, Any]], 
-                              count: int, config: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Generate traffic for a DDoS attack."""
-        records = []
-        
-        attack_vector = config.get('attack_vector', 'syn_flood')
+        record_count = max(1, int(intensity * 10 * volume_factor * self.rng.uniform(0.8, 1.2)))
         
-        # For DDoS, generate traffic from multiple sources
-        external_nets = self.external_networks.copy()
+        # Attack types are implemented by registered generators
+        generator = get_attack_generator(attack_type)
+        if generator is None:
+            return TrafficBatch.empty()
         
-        for _ in range(count):
-            target = random.choice(targets)
-            
-            # Use a different source IP for each record
-            external_net = random.choice(external_nets)
-            source_ip = str(random.choice(list(external_net.hosts())))
-            
-            # Set protocol and port based on attack vector
-            if attack_vector == 'syn_flood':
-                protocol = 'tcp'
-                port = random.choice([80, 443, 8080])
-                payload_size = random.randint(40, 100)
-            elif attack_vector == 'udp_flood':
-                protocol = 'udp'
-                port = random.randint(1, 65535)
-                payload_size = random.randint(300, 1200)
-            else:  # http_flood
-                protocol = random.choice(['http', 'https'])
-                port = 443 if protocol == 'https' else 80
-                payload_size = random.randint(800, 2000)
-            
-            record = {
-                'source_ip': source_ip,
-                'destination_ip': target['ip'],
-                'protocol': protocol,
-                'port': port,
-                'payload_size': payload_size,
-                'timestamp': datetime.now().isoformat(),
-                'is_malicious': True,
-                'confidence': 0.85 + random.uniform(0, 0.1),
-                'patterns': ['ddos', attack_vector]
-            }
-            
-            records.append(record)
-        
-        return records
+        return generator.generate(self, attack, record_count)
     
     def get_infrastructure(self) -> Dict[str, Any]:
         """
@@ -604,7 +746,9 @@ class NetworkSimulator:
         return {
             'servers': self.servers,
             'endpoints': self.endpoints,
-            'threat_actors': self.threat_actors
+            'threat_actors': self.threat_actors,
+            'topology': self.topology.describe(),
+            'compromise': self.compromise.summary() if self.compromise is not None else None
         }
     
     def get_traffic_stats(self) -> Dict[str, Any]:
@@ -614,37 +758,4 @@ class NetworkSimulator:
         Returns:
             Dictionary with traffic statistics
         """
-        if not self.traffic_history:
-            return {
-                'total_traffic': 0,
-                'malicious_ratio': 0,
-                'protocol_distribution': {},
-                'source_ips': 0,
-                'destination_ips': 0
-            }
-        
-        # Calculate basic stats
-        total_traffic = len(self.traffic_history)
-        malicious_count = sum(1 for t in self.traffic_history if t.get('is_malicious', False))
-        malicious_ratio = malicious_count / total_traffic if total_traffic > 0 else 0
-        
-        # Protocol distribution
-        protocols = {}
-        for traffic in self.traffic_history:
-            protocol = traffic.get('protocol', 'unknown')
-            protocols[protocol] = protocols.get(protocol, 0) + 1
-        
-        protocol_distribution = {p: count / total_traffic for p, count in protocols.items()}
-        
-        # Unique IPs
-        source_ips = set(t.get('source_ip', '') for t in self.traffic_history)
-        destination_ips = set(t.get('destination_ip', '') for t in self.traffic_history)
-        
-        return {
-            'total_traffic': total_traffic,
-            'malicious_count': malicious_count,
-            'malicious_ratio': malicious_ratio,
-            'protocol_distribution': protocol_distribution,
-            'source_ips': len(source_ips),
-            'destination_ips': len(destination_ips)
-        }
+        return self.traffic_history.stats()
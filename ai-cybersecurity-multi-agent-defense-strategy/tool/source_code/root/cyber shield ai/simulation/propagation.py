@@ -0,0 +1,257 @@
+import logging
+from typing import Dict, Any, Tuple
+import numpy as np
+
+from simulation.inventory import HostInventory
+from simulation.topology import NetworkTopology
+
+logger = logging.getLogger(__name__)
+
+class HostGraph:
+    """
+    Directed host adjacency in compressed sparse row form.
+    Edge e runs from its CSR row (the source host) to indices[e] and carries
+    the per-step probability that a compromised source compromises the target.
+    """
+    
+    def __init__(self, host_count: int, sources: np.ndarray, targets: np.ndarray,
+                 probabilities: np.ndarray):
+        """
+        Build the CSR arrays from an edge list.
+        
+        Args:
+            host_count: Number of hosts
+            sources: Source host per edge
+            targets: Target host per edge
+            probabilities: Transmission probability per edge
+        """
+        order = np.argsort(sources, kind='stable')
+        self.host_count = host_count
+        self.indices = targets[order].astype(np.int64)
+        self.indptr = np.concatenate(([0], np.cumsum(np.bincount(sources, minlength=host_count))))
+        
+        # Store log(1 - p) so combining several infected neighbours is a sum
+        self.log_survival = np.log1p(-np.clip(probabilities[order], 0.0, 1.0 - 1e-12))
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices)
+    
+    def out_edges(self, hosts: np.ndarray) -> np.ndarray:
+        """
+        Get the edge positions leaving a set of hosts.
+        
+        Args:
+            hosts: Source host indices
+        
+        Returns:
+            Positions into indices / log_survival
+        """
+        starts = self.indptr[hosts]
+        counts = self.indptr[hosts + 1] - starts
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(0, dtype=np.int64)
+        
+        # Concatenated aranges over the CSR rows of the hosts
+        shifts = np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts)
+        return shifts + np.arange(total)
+    
+    @classmethod
+    def build(cls, rng: np.random.Generator, inventory: HostInventory, topology: NetworkTopology,
+              spread_rate: float, peers: int = 6, server_peers: int = 3,
+              segmentation: float = 0.0) -> 'HostGraph':
+        """
+        Generate a random host graph following the network layout.
+        Every host links to `peers` random hosts in its own subnet and to
+        `server_peers` random servers anywhere; links are symmetric. Links
+        that cross internal firewalls are weakened by segmentation.
+        
+        Args:
+            rng: Random generator
+            inventory: Host inventory
+            topology: Routed topology of the internal networks
+            spread_rate: Per-step transmission probability of an unfiltered link
+            peers: Same-subnet links per host
+            server_peers: Server links per host
+            segmentation: Strength of each internal firewall on a link's route
+        
+        Returns:
+            HostGraph over the inventory's host indices
+        """
+        host_count = len(inventory)
+        hosts = np.arange(host_count)
+        
+        # Hosts grouped by subnet, so same-subnet peers are a random offset in the group
+        subnet = inventory.subnet.astype(np.int64)
+        by_subnet = np.argsort(subnet, kind='stable')
+        group_size = np.bincount(subnet, minlength=len(topology.networks))
+        group_start = np.concatenate(([0], np.cumsum(group_size)[:-1]))
+        
+        local_sources = np.repeat(hosts, peers)
+        local_groups = subnet[local_sources]
+        local_targets = by_subnet[group_start[local_groups] +
+                                  (rng.random(len(local_sources)) * group_size[local_groups]).astype(np.int64)]
+        
+        server_sources = np.repeat(hosts, server_peers if inventory.server_count else 0)
+        server_targets = rng.integers(0, max(1, inventory.server_count), len(server_sources))
+        
+        sources = np.concatenate((local_sources, server_sources))
+        targets = np.concatenate((local_targets, server_targets))
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+        sources, targets = np.concatenate((sources, targets)), np.concatenate((targets, sources))
+        
+        # Internal firewalls on the route between the two hosts' segments filter the link
+        routes = topology.route(subnet[sources], subnet[targets])
+        probabilities = spread_rate * (1 - segmentation) ** topology.internal_firewall_count[routes]
+        
+        return cls(host_count, sources, targets, probabilities)
+
+class CompromiseModel:
+    """
+    Stochastic compromise propagation over a HostGraph.
+    Host state lives in NumPy arrays. Each step, infection pressure is
+    accumulated over the out-edges of compromised hosts with one gather and
+    one bincount, so the cost is proportional to the edges leaving the
+    compromised set rather than to the whole network.
+    """
+    
+    def __init__(self, graph: HostGraph, inventory: HostInventory,
+                 endpoint_protection: float = 0.0, remediation_rate: float = 0.0):
+        """
+        Initialize the model with no compromised hosts.
+        
+        Args:
+            graph: Host adjacency
+            inventory: Host inventory supplying vulnerability counts
+            endpoint_protection: Strength of endpoint defenses, scaling susceptibility down
+            remediation_rate: Per-step probability that a compromised host is cleaned
+        """
+        self.graph = graph
+        self.remediation_rate = remediation_rate
+        
+        # Each known vulnerability halves the chance an exposure fails
+        vulnerabilities = inventory.vulnerability_count.astype(np.float64)
+        self.susceptibility = (1 - 0.5 ** (vulnerabilities + 1)) * (1 - endpoint_protection)
+        
+        self.compromised = np.zeros(graph.host_count, dtype=bool)
+        self.compromised_step = np.full(graph.host_count, -1, dtype=np.int64)
+        self.newly_compromised = np.zeros(0, dtype=np.int64)
+    
+    @classmethod
+    def from_config(cls, rng: np.random.Generator, inventory: HostInventory,
+                    topology: NetworkTopology, spec: Dict[str, Any],
+                    segmentation: float = 0.0, endpoint_protection: float = 0.0) -> 'CompromiseModel':
+        """
+        Build a model from a network_params 'lateral_movement' specification.
+        
+        Args:
+            rng: Random generator
+            inventory: Host inventory
+            topology: Routed topology
+            spec: Keys 'spread_rate', 'peers', 'server_peers', 'remediation_rate'
+                and 'initial_compromised' (endpoints compromised at the start)
+            segmentation: Strength of internal firewalls
+            endpoint_protection: Strength of endpoint defenses
+        
+        Returns:
+            CompromiseModel with the initial hosts compromised
+        """
+        graph = HostGraph.build(
+            rng, inventory, topology,
+            spread_rate=spec.get('spread_rate', 0.05),
+            peers=spec.get('peers', 6),
+            server_peers=spec.get('server_peers', 3),
+            segmentation=segmentation
+        )
+        # A scenario-level protection overrides the network's; either must stay a probability
+        protection = float(np.clip(spec.get('endpoint_protection', endpoint_protection), 0.0, 1.0))
+        model = cls(graph, inventory, protection, spec.get('remediation_rate', 0.0))
+        
+        # Patient zero: endpoints, e.g. phishing victims
+        initial = min(spec.get('initial_compromised', 1), inventory.endpoint_count)
+        if initial:
+            endpoints = inventory.server_count + rng.choice(inventory.endpoint_count, initial, replace=False)
+            model.compromise(endpoints, 0)
+        
+        logger.debug(f"Compromise model over {graph.host_count} hosts and {graph.edge_count} links")
+        return model
+    
+    @property
+    def compromised_count(self) -> int:
+        return int(np.count_nonzero(self.compromised))
+    
+    def compromise(self, hosts: np.ndarray, step: int) -> None:
+        """
+        Mark hosts as compromised.
+        
+        Args:
+            hosts: Host indices
+            step: Step of the compromise
+        """
+        hosts = np.asarray(hosts, dtype=np.int64)
+        fresh = hosts[~self.compromised[hosts]]
+        self.compromised[fresh] = True
+        self.compromised_step[fresh] = step
+    
+    def step(self, rng: np.random.Generator, step: int) -> np.ndarray:
+        """
+        Advance propagation by one step.
+        
+        Args:
+            rng: Random generator
+            step: Current simulation step
+        
+        Returns:
+            Indices of hosts compromised during this step
+        """
+        infected = np.flatnonzero(self.compromised)
+        edges = self.graph.out_edges(infected)
+        
+        # P(escape) of a host is the product of (1 - p) over its infected neighbours
+        log_escape = np.bincount(self.graph.indices[edges], weights=self.graph.log_survival[edges],
+                                 minlength=self.graph.host_count)
+        exposed = np.flatnonzero((log_escape < 0) & ~self.compromised)
+        probability = -np.expm1(log_escape[exposed]) * self.susceptibility[exposed]
+        new = exposed[rng.random(len(exposed)) < probability]
+        
+        # Remediation cleans hosts compromised in earlier steps
+        if self.remediation_rate > 0 and len(infected):
+            cleaned = infected[rng.random(len(infected)) < self.remediation_rate]
+            self.compromised[cleaned] = False
+            self.compromised_step[cleaned] = -1
+        
+        self.compromise(new, step)
+        self.newly_compromised = new
+        return new
+    
+    def sample_links(self, rng: np.random.Generator, count: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Pick random links leaving compromised hosts, e.g. for lateral-movement probes.
+        
+        Args:
+            rng: Random generator
+            count: Number of links
+        
+        Returns:
+            Tuple of (source hosts, target hosts)
+        """
+        infected = np.flatnonzero(self.compromised)
+        if not len(infected) or not count:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        
+        sources = infected[rng.integers(0, len(infected), count)]
+        degree = self.graph.indptr[sources + 1] - self.graph.indptr[sources]
+        sources = sources[degree > 0]
+        degree = degree[degree > 0]
+        edges = self.graph.indptr[sources] + (rng.random(len(sources)) * degree).astype(np.int64)
+        return sources, self.graph.indices[edges]
+    
+    def summary(self) -> Dict[str, Any]:
+        """Get compromise counts for reporting."""
+        return {
+            'compromised_hosts': self.compromised_count,
+            'newly_compromised': len(self.newly_compromised),
+            'host_links': self.graph.edge_count
+        }
@@ -0,0 +1,106 @@
+import logging
+from typing import Dict, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class AliasTable:
+    """
+    Walker/Vose alias table for O(1) sampling from a fixed categorical distribution.
+    Construction is O(n); each draw costs one integer and one uniform variate,
+    and any number of draws is taken in a single vectorized call.
+    """
+    
+    def __init__(self, weights: Sequence[float]):
+        """
+        Build the table.
+        
+        Args:
+            weights: Non-negative weight per category; need not be normalized
+        """
+        weights = np.asarray(weights, dtype=np.float64)
+        total = weights.sum() if len(weights) else 0.0
+        if len(weights) == 0 or total <= 0 or np.any(weights < 0):
+            raise ValueError("Alias table needs non-negative weights with a positive sum")
+        
+        n = len(weights)
+        self.probabilities = weights / total
+        self.uniform = bool(np.all(weights == weights[0]))
+        self._accept = np.ones(n, dtype=np.float64)
+        self._alias = np.arange(n, dtype=np.int64)
+        
+        if not self.uniform:
+            self._build(self.probabilities * n)
+    
+    def _build(self, scaled: np.ndarray) -> None:
+        """Pair under-full columns with over-full ones (Vose's method)."""
+        scaled = scaled.copy()
+        small = np.flatnonzero(scaled < 1.0).tolist()
+        large = np.flatnonzero(scaled >= 1.0).tolist()
+        
+        while small and large:
+            s = small.pop()
+            l = large[-1]
+            self._accept[s] = scaled[s]
+            self._alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            if scaled[l] < 1.0:
+                small.append(large.pop())
+        
+        # Leftovers are full columns up to rounding error
+        for i in small + large:
+            self._accept[i] = 1.0
+    
+    @classmethod
+    def zipf(cls, size: int, exponent: float = 1.0) -> 'AliasTable':
+        """
+        Build a Zipf distribution where rank i has weight 1 / (i + 1) ** exponent.
+        
+        Args:
+            size: Number of categories
+            exponent: Skew; 0 gives a uniform distribution
+        
+        Returns:
+            AliasTable over range(size)
+        """
+        return cls(1.0 / np.arange(1, size + 1, dtype=np.float64) ** exponent)
+    
+    @classmethod
+    def from_mix(cls, names: Sequence[str], mix: Optional[Dict[str, float]] = None) -> 'AliasTable':
+        """
+        Build a distribution over named categories.
+        
+        Args:
+            names: Category names in index order
+            mix: Optional name to weight mapping; names it omits get weight 0,
+                and no mapping gives a uniform distribution
+        
+        Returns:
+            AliasTable over the indices of `names`
+        """
+        if not mix:
+            return cls(np.ones(len(names)))
+        
+        unknown = set(mix) - set(names)
+        if unknown:
+            logger.warning(f"Ignoring weights for unknown categories: {sorted(unknown)}")
+        return cls([mix.get(name, 0.0) for name in names])
+    
+    def __len__(self) -> int:
+        return len(self._alias)
+    
+    def sample(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """
+        Draw category indices.
+        
+        Args:
+            rng: Random generator
+            count: Number of draws
+        
+        Returns:
+            Array of indices into the weights
+        """
+        index = rng.integers(0, len(self._alias), count)
+        if self.uniform:
+            return index
+        return np.where(rng.random(count) < self._accept[index], index, self._alias[index])
@@ -1,7 +1,7 @@
 import logging
 import json
-import random
 from typing import Dict, Any, List, Optional
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
@@ -116,7 +116,9 @@ DEFAULT_SCENARIOS = [
             "endpoint_count": 12,
             "malicious_ratio": 0.08,
             "traffic_rate": 6,
-            "attack_probability": 0.9
+            "attack_probability": 0.9,
+            "protocol_mix": {"https": 6, "http": 3, "dns": 2, "tcp": 1, "udp": 1, "smtp": 0.5, "ssh": 0.5},
+            "host_zipf": 1.1
         },
         "attack_params": {
             "attack_type": "web_app_attack",
@@ -147,7 +149,8 @@ DEFAULT_SCENARIOS = [
             "endpoint_count": 8,
             "malicious_ratio": 0.2,
             "traffic_rate": 15,
-            "attack_probability": 1.0
+            "attack_probability": 1.0,
+            "arrival_model": {"type": "hawkes", "excitation": 0.6, "decay": 0.2}
         },
         "attack_params": {
             "attack_type": "ddos",
@@ -173,12 +176,14 @@ DEFAULT_SCENARIOS = [
         "type": "attack_simulation",
         "difficulty": "hard",
         "max_steps": 90,
+        "step_duration": 960,
         "network_params": {
             "server_count": 8,
             "endpoint_count": 18,
             "malicious_ratio": 0.07,
             "traffic_rate": 7,
-            "attack_probability": 0.8
+            "attack_probability": 0.8,
+            "arrival_model": {"type": "diurnal", "amplitude": 0.8, "peak_hour": 14}
         },
         "attack_params": {
             "attack_type": "insider",
@@ -241,7 +246,8 @@ DEFAULT_SCENARIOS = [
             "endpoint_count": 25,
             "malicious_ratio": 0.12,
             "traffic_rate": 10,
-            "attack_probability": 1.0
+            "attack_probability": 1.0,
+            "lateral_movement": {"initial_compromised": 1, "spread_rate": 0.04, "records_per_host": 0.5}
         },
         "attack_params": {
             "attack_type": "apt",
@@ -294,12 +300,14 @@ def load_scenario(scenario_id: str) -> Optional[Dict[str, Any]]:
     logger.warning(f"Scenario with ID '{scenario_id}' not found")
     return None
 
-def get_scenario_by_difficulty(difficulty: str) -> Optional[Dict[str, Any]]:
+def get_scenario_by_difficulty(difficulty: str,
+                               rng: Optional[np.random.Generator] = None) -> Optional[Dict[str, Any]]:
     """
     Get a random scenario of the specified difficulty.
     
     Args:
         difficulty: Difficulty level (easy, medium, hard, expert)
+        rng: Optional random generator for reproducible selection
         
     Returns:
         Scenario dictionary or None if none available
@@ -310,7 +318,8 @@ def get_scenario_by_difficulty(difficulty: str) -> Optional[Dict[str, Any]]:
         logger.warning(f"No scenarios found with difficulty '{difficulty}'")
         return None
     
-    return random.choice(matching_scenarios)
+    rng = rng if rng is not None else np.random.default_rng()
+    return matching_scenarios[rng.integers(0, len(matching_scenarios))]
 
 def get_training_scenarios() -> List[Dict[str, Any]]:
     """
@@ -321,23 +330,27 @@ def get_training_scenarios() -> List[Dict[str, Any]]:
     """
     return [s for s in DEFAULT_SCENARIOS if s.get("type") == "training_session"]
 
-def generate_custom_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
+def generate_custom_scenario(params: Dict[str, Any],
+                             rng: Optional[np.random.Generator] = None) -> Dict[str, Any]:
     """
     Generate a custom scenario based on provided parameters.
     
     Args:
         params: Parameters for scenario generation
+        rng: Optional random generator; defaults to one seeded from params['seed']
         
     Returns:
         Generated scenario dictionary
     """
+    rng = rng if rng is not None else np.random.default_rng(params.get("seed"))
+    
     scenario_type = params.get("type", "attack_simulation")
     attack_type = params.get("attack_type", "reconnaissance")
     difficulty = params.get("difficulty", "medium")
     
     # Base scenario template
     scenario = {
-        "id": f"custom_{scenario_type}_{attack_type}_{int(random.random() * 10000)}",
+        "id": f"custom_{scenario_type}_{attack_type}_{int(rng.random() * 10000)}",
         "name": params.get("name", f"Custom {attack_type.title()} Scenario"),
         "description": params.get("description", f"Custom scenario simulating {attack_type} activities"),
         "type": scenario_type,
@@ -354,34 +367,34 @@ def generate_custom_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
     # Set network parameters based on difficulty
     if difficulty == "easy":
         scenario["network_params"] = {
-            "server_count": random.randint(3, 6),
-            "endpoint_count": random.randint(5, 12),
-            "malicious_ratio": random.uniform(0.05, 0.1),
-            "traffic_rate": random.randint(3, 5),
-            "attack_probability": random.uniform(0.7, 0.9)
+            "server_count": int(rng.integers(3, 7)),
+            "endpoint_count": int(rng.integers(5, 13)),
+            "malicious_ratio": rng.uniform(0.05, 0.1),
+            "traffic_rate": int(rng.integers(3, 6)),
+            "attack_probability": rng.uniform(0.7, 0.9)
         }
     elif difficulty == "medium":
         scenario["network_params"] = {
-            "server_count": random.randint(6, 10),
-            "endpoint_count": random.randint(12, 20),
-            "malicious_ratio": random.uniform(0.1, 0.15),
-            "traffic_rate": random.randint(5, 8),
-            "attack_probability": random.uniform(0.8, 1.0)
+            "server_count": int(rng.integers(6, 11)),
+            "endpoint_count": int(rng.integers(12, 21)),
+            "malicious_ratio": rng.uniform(0.1, 0.15),
+            "traffic_rate": int(rng.integers(5, 9)),
+            "attack_probability": rng.uniform(0.8, 1.0)
         }
     elif difficulty == "hard":
         scenario["network_params"] = {
-            "server_count": random.randint(8, 15),
-            "endpoint_count": random.randint(15, 30),
-            "malicious_ratio": random.uniform(0.15, 0.2),
-            "traffic_rate": random.randint(8, 12),
+            "server_count": int(rng.integers(8, 16)),
+            "endpoint_count": int(rng.integers(15, 31)),
+            "malicious_ratio": rng.uniform(0.15, 0.2),
+            "traffic_rate": int(rng.integers(8, 13)),
             "attack_probability": 1.0
         }
     else:  # expert
         scenario["network_params"] = {
-            "server_count": random.randint(10, 20),
-            "endpoint_count": random.randint(20, 40),
-            "malicious_ratio": random.uniform(0.2, 0.3),
-            "traffic_rate": random.randint(10, 15),
+            "server_count": int(rng.integers(10, 21)),
+            "endpoint_count": int(rng.integers(20, 41)),
+            "malicious_ratio": rng.uniform(0.2, 0.3),
+            "traffic_rate": int(rng.integers(10, 16)),
             "attack_probability": 1.0
         }
     
@@ -399,22 +412,22 @@ def generate_custom_scenario(params: Dict[str, Any]) -> Dict[str, Any]:
     defense_level = {"easy": 0.3, "medium": 0.5, "hard": 0.7, "expert": 0.8}.get(difficulty, 0.5)
     
     defense_measures = {
-        "firewall_rules": defense_level * random.uniform(0.8, 1.2),
-        "ids_configuration": defense_level * random.uniform(0.8, 1.2),
-        "patch_management": defense_level * random.uniform(0.7, 1.1),
-        "endpoint_protection": defense_level * random.uniform(0.7, 1.1)
+        "firewall_rules": defense_level * rng.uniform(0.8, 1.2),
+        "ids_configuration": defense_level * rng.uniform(0.8, 1.2),
+        "patch_management": defense_level * rng.uniform(0.7, 1.1),
+        "endpoint_protection": defense_level * rng.uniform(0.7, 1.1)
     }
     
     # Add attack-specific defenses
     if attack_type == "ransomware":
-        defense_measures["backup_systems"] = defense_level * random.uniform(0.8, 1.2)
+        defense_measures["backup_systems"] = defense_level * rng.uniform(0.8, 1.2)
     elif attack_type == "data_exfiltration":
-        defense_measures["data_encryption"] = defense_level * random.uniform(0.8, 1.2)
-        defense_measures["network_segmentation"] = defense_level * random.uniform(0.8, 1.2)
+        defense_measures["data_encryption"] = defense_level * rng.uniform(0.8, 1.2)
+        defense_measures["network_segmentation"] = defense_level * rng.uniform(0.8, 1.2)
     elif attack_type == "ddos":
-        defense_measures["ddos_protection"] = defense_level * random.uniform(0.8, 1.2)
+        defense_measures["ddos_protection"] = defense_level * rng.uniform(0.8, 1.2)
     elif attack_type == "web_app_attack":
-        defense_measures["web_application_firewall"] = defense_level * random.uniform(0.8, 1.2)
+        defense_measures["web_application_firewall"] = defense_level * rng.uniform(0.8, 1.2)
     
     scenario["attack_params"] = {
         "attack_type": attack_type,
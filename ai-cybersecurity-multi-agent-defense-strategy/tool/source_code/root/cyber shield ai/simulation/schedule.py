@@ -0,0 +1,65 @@
+import logging
+from typing import Dict, Any, Iterable, Iterator, List
+
+logger = logging.getLogger(__name__)
+
+class AttackSchedule:
+    """
+    Step-bucketed index of attack patterns.
+    Each attack is registered in every bucket its [start_step, start_step + duration)
+    interval overlaps, so finding the attacks active at a step only inspects one
+    bucket. Attacks can be added at any time without rebuilding the index.
+    """
+    
+    def __init__(self, attacks: Iterable[Dict[str, Any]] = (), bucket_width: int = 8):
+        """
+        Initialize the schedule.
+        
+        Args:
+            attacks: Attack patterns with 'start_step' and 'duration' keys
+            bucket_width: Number of steps covered by one bucket
+        """
+        self.bucket_width = max(1, int(bucket_width))
+        self._buckets: Dict[int, List[Dict[str, Any]]] = {}
+        self._attacks: List[Dict[str, Any]] = []
+        
+        for attack in attacks:
+            self.add(attack)
+    
+    def add(self, attack: Dict[str, Any]) -> None:
+        """
+        Register an attack pattern.
+        
+        Args:
+            attack: Attack pattern with 'start_step' and 'duration' keys
+        """
+        self._attacks.append(attack)
+        
+        start = attack['start_step']
+        end = start + attack['duration']
+        if end <= start:
+            return
+        
+        for bucket in range(start // self.bucket_width, (end - 1) // self.bucket_width + 1):
+            self._buckets.setdefault(bucket, []).append(attack)
+    
+    def active(self, step: int) -> List[Dict[str, Any]]:
+        """
+        Get the attacks active at a step.
+        
+        Args:
+            step: Simulation step
+        
+        Returns:
+            Attacks with start_step <= step < start_step + duration, in insertion order
+        """
+        return [
+            a for a in self._buckets.get(step // self.bucket_width, ())
+            if a['start_step'] <= step < a['start_step'] + a['duration']
+        ]
+    
+    def __len__(self) -> int:
+        return len(self._attacks)
+    
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self._attacks)
@@ -0,0 +1,251 @@
+import logging
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+import numpy as np
+
+from simulation.clock import SimulationClock
+from simulation.network import NetworkSimulator
+from simulation.streams import RandomStreams
+from simulation.traffic import PATTERN_SETS, TrafficBatch, rechunk, register_pattern
+
+logger = logging.getLogger(__name__)
+
+# Columns are laid out widest first so every column in a block stays aligned
+_LAYOUT = sorted(TrafficBatch.FIELDS.items(), key=lambda item: -np.dtype(item[1]).itemsize)
+
+# Shard handed back by a worker: shared memory block name, record count, pattern table
+ShardHandle = Tuple[str, int, List[Tuple[str, ...]]]
+
+# Per-process state of pool workers
+_worker_network: Optional[NetworkSimulator] = None
+_worker_streams: Optional[RandomStreams] = None
+_worker_compromise: Optional[Tuple[np.ndarray, np.ndarray]] = None
+
+def _init_worker(config: Dict[str, Any], network_params: Dict[str, Any], seed: int) -> None:
+    """Build the worker's simulator; every worker derives the same infrastructure from the seed."""
+    global _worker_network, _worker_streams, _worker_compromise
+    _worker_network = NetworkSimulator(config)
+    _worker_network.reset(network_params)
+    _worker_streams = RandomStreams(seed)
+    
+    compromise = _worker_network.compromise
+    if compromise is not None:
+        _worker_compromise = (compromise.compromised.copy(), compromise.compromised_step.copy())
+
+def _generate_shard(start_step: int, stop_step: int) -> ShardHandle:
+    """
+    Generate a step range in a worker and publish it through shared memory.
+    
+    Args:
+        start_step: First step of the shard
+        stop_step: Step after the last one
+    
+    Returns:
+        Handle of the shared memory block holding the shard's columns
+    """
+    network = _worker_network
+    
+    # The shard's stream depends only on its first step, not on which worker runs it
+    network.rng = _worker_streams.for_worker(start_step).generator('network')
+    network.arrival_model.reset()
+    if _worker_compromise is not None:
+        network.compromise.compromised = _worker_compromise[0].copy()
+        network.compromise.compromised_step = _worker_compromise[1].copy()
+    
+    batch = TrafficBatch.concatenate(list(network.iter_traffic(start_step, stop_step, record_history=False)))
+    
+    size = sum(len(batch) * np.dtype(dtype).itemsize for _, dtype in _LAYOUT)
+    block = shared_memory.SharedMemory(create=True, size=max(1, size))
+    offset = 0
+    for field, dtype in _LAYOUT:
+        np.ndarray(len(batch), dtype=dtype, buffer=block.buf, offset=offset)[:] = getattr(batch, field)
+        offset += len(batch) * np.dtype(dtype).itemsize
+    block.close()
+    
+    # The parent owns the block from here on and unlinks it after merging
+    resource_tracker.unregister(block._name, 'shared_memory')
+    
+    return block.name, len(batch), list(PATTERN_SETS)
+
+class ShardedTrafficGenerator:
+    """
+    Generates NetworkSimulator traffic in a pool of worker processes.
+    The step range is cut into shards of `steps_per_shard` steps. Every
+    worker builds the same infrastructure from the seed and generates whole
+    shards with an RNG stream keyed by the shard, so output is reproducible
+    regardless of the number of workers. Workers write columns into shared
+    memory and return only the block name; the parent merges the shards of
+    a round by timestamp with a single copy per column.
+    
+    Arrival-model and lateral-movement state restarts at every shard, so
+    Hawkes bursts and compromise spread are only modelled within a shard.
+    """
+    
+    def __init__(self, network_params: Optional[Dict[str, Any]] = None,
+                 config: Optional[Dict[str, Any]] = None, workers: Optional[int] = None,
+                 steps_per_shard: int = 100):
+        """
+        Start the worker pool.
+        
+        Args:
+            network_params: Parameters passed to NetworkSimulator.reset in every worker
+            config: NetworkSimulator configuration ('seed', 'start_time', 'step_duration', ...)
+            workers: Number of worker processes; defaults to the CPU count
+            steps_per_shard: Steps generated per task
+        """
+        self.config = dict(config or {})
+        self.network_params = dict(network_params or {})
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.steps_per_shard = max(1, int(steps_per_shard))
+        
+        # Pin the clock and seed so every worker agrees on infrastructure and time
+        self.streams = RandomStreams(self.config.get('seed'))
+        self.clock = SimulationClock(self.config.get('start_time'), self.config.get('step_duration', 1.0))
+        self.config['seed'] = self.streams.seed
+        self.config['start_time'] = self.clock.start_time
+        
+        # Build one simulator here so configuration errors reach the caller,
+        # rather than surfacing as a broken pool from the worker initializer
+        NetworkSimulator(self.config).reset(self.network_params)
+        
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(self.config, self.network_params, self.streams.seed)
+        )
+        
+        logger.info(f"Sharded traffic generation with {self.workers} workers")
+    
+    def __enter__(self) -> 'ShardedTrafficGenerator':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._pool.shutdown(wait=True)
+    
+    def _submit(self, start_step: int, stop_step: int) -> Future:
+        return self._pool.submit(_generate_shard, start_step, stop_step)
+    
+    def _merge(self, shards: List[ShardHandle]) -> TrafficBatch:
+        """
+        Merge shards into one batch ordered by timestamp and free their blocks.
+        
+        Args:
+            shards: Handles returned by the workers
+        
+        Returns:
+            TrafficBatch owning its memory
+        """
+        blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in shards]
+        try:
+            columns = {}
+            offsets = [0] * len(shards)
+            for field, dtype in _LAYOUT:
+                views = []
+                for i, (block, (_, count, _)) in enumerate(zip(blocks, shards)):
+                    views.append(np.ndarray(count, dtype=dtype, buffer=block.buf, offset=offsets[i]))
+                    offsets[i] += count * np.dtype(dtype).itemsize
+                columns[field] = np.concatenate(views) if views else np.zeros(0, dtype=dtype)
+                del views
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+        
+        # Workers register patterns independently; translate their codes to ours
+        position = 0
+        for _, count, patterns in shards:
+            mapping = np.array([register_pattern(p) for p in patterns], dtype=np.uint16)
+            if not np.array_equal(mapping, np.arange(len(mapping))):
+                columns['pattern'][position:position + count] = mapping[columns['pattern'][position:position + count]]
+            position += count
+        
+        batch = TrafficBatch(**columns)
+        
+        # Shards are normally disjoint step ranges already in order
+        if len(batch) > 1 and np.any(np.diff(batch.timestamp) < 0):
+            batch = batch.take(np.argsort(batch.timestamp, kind='stable'))
+        return batch
+    
+    @staticmethod
+    def _release(shards: List[ShardHandle]) -> None:
+        """Free the shared memory of shards that will not be merged."""
+        for name, _, _ in shards:
+            block = shared_memory.SharedMemory(name=name)
+            block.close()
+            block.unlink()
+    
+    def _discard(self, futures: List[Future]) -> None:
+        """Wait for abandoned shards and free their shared memory."""
+        for future in futures:
+            try:
+                self._release([future.result()])
+            except Exception:
+                continue
+    
+    def generate(self, start_step: int, stop_step: int) -> TrafficBatch:
+        """
+        Generate a step range across the pool.
+        
+        Args:
+            start_step: First step
+            stop_step: Step after the last one
+        
+        Returns:
+            TrafficBatch of every record in the range, ordered by timestamp
+        """
+        futures = [self._submit(s, min(s + self.steps_per_shard, stop_step))
+                   for s in range(start_step, stop_step, self.steps_per_shard)]
+        shards = []
+        try:
+            for future in futures:
+                shards.append(future.result())
+        except BaseException:
+            self._release(shards)
+            self._discard(futures[len(shards) + 1:])
+            raise
+        return self._merge(shards)
+    
+    def iter_traffic(self, start_step: int = 0, stop_step: Optional[int] = None,
+                     batch_records: Optional[int] = None) -> Iterator[TrafficBatch]:
+        """
+        Generate traffic continuously, keeping every worker busy.
+        Up to two rounds of shards are in flight; each round of `workers`
+        shards is merged and yielded while the next one is generated.
+        
+        Args:
+            start_step: First step to generate
+            stop_step: Step after the last one; None generates indefinitely
+            batch_records: Re-chunk the output into batches of this many records;
+                None yields one batch per round
+        
+        Returns:
+            Iterator of TrafficBatch objects in time order
+        """
+        def rounds() -> Iterator[TrafficBatch]:
+            pending = deque()
+            step = start_step
+            try:
+                while True:
+                    while len(pending) < 2 * self.workers and (stop_step is None or step < stop_step):
+                        end = step + self.steps_per_shard
+                        if stop_step is not None:
+                            end = min(end, stop_step)
+                        pending.append(self._submit(step, end))
+                        step = end
+                    if not pending:
+                        return
+                    yield self._merge([pending.popleft().result()
+                                       for _ in range(min(self.workers, len(pending)))])
+            finally:
+                self._discard(list(pending))
+        
+        if batch_records is None:
+            return rounds()
+        return rechunk(rounds(), batch_records)
@@ -0,0 +1,263 @@
+import ipaddress
+import logging
+from collections import deque
+from typing import Dict, Any, List, Optional, Sequence
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Node kinds
+NODE_SEGMENT = 0
+NODE_ROUTER = 1
+NODE_FIREWALL = 2
+
+EXTERNAL_SEGMENT = 'internet'
+PERIMETER_FIREWALL = 'fw-perimeter'
+
+class NetworkTopology:
+    """
+    Graph of network segments, routers and firewalls with precomputed routes.
+    Every internal network is a segment and the internet is one more segment.
+    Routes between all segment pairs are computed once by breadth-first search
+    and stored as paths indexed by a dense (source, destination) table, so
+    routing a flow is a single array lookup. Path id 0 means "no path".
+    """
+    
+    def __init__(self, networks: Sequence[ipaddress.IPv4Network],
+                 spec: Optional[Dict[str, Any]] = None):
+        """
+        Build the topology and its routes.
+        
+        Args:
+            networks: Internal networks; segment i is networks[i] and the
+                internet is segment len(networks)
+            spec: Optional layout. With 'links' (pairs of node names, segments
+                named by CIDR or 'internet') plus 'routers' and 'firewalls'
+                lists the graph is taken as given; otherwise a hierarchy is
+                generated with 'segments_per_router' segments per distribution
+                router and, if 'segment_firewalls' is set (default when there
+                are several routers), a firewall between each router and the core
+        """
+        spec = spec or {}
+        self.networks = list(networks)
+        self.segment_count = len(self.networks) + 1
+        self.external_segment = len(self.networks)
+        
+        self.node_names: List[str] = []
+        self.node_kinds: List[int] = []
+        self._node_index: Dict[str, int] = {}
+        self._neighbors: List[List[int]] = []
+        
+        for network in self.networks:
+            self._add_node(str(network), NODE_SEGMENT)
+        self._add_node(EXTERNAL_SEGMENT, NODE_SEGMENT)
+        
+        if 'links' in spec:
+            self._build_explicit(spec)
+        else:
+            self._build_hierarchy(spec)
+        
+        self._compute_routes()
+        self._build_segment_lookup()
+        
+        logger.debug(f"Topology with {len(self.node_names)} nodes and {len(self.path_offsets) - 1} routes")
+    
+    def _add_node(self, name: str, kind: int) -> int:
+        if name in self._node_index:
+            raise ValueError(f"Duplicate topology node: {name}")
+        self._node_index[name] = len(self.node_names)
+        self.node_names.append(name)
+        self.node_kinds.append(kind)
+        self._neighbors.append([])
+        return self._node_index[name]
+    
+    def _link(self, a: str, b: str) -> None:
+        if a not in self._node_index or b not in self._node_index:
+            raise ValueError(f"Link between unknown topology nodes: {a} - {b}")
+        i, j = self._node_index[a], self._node_index[b]
+        self._neighbors[i].append(j)
+        self._neighbors[j].append(i)
+    
+    def _build_explicit(self, spec: Dict[str, Any]) -> None:
+        """Create routers, firewalls and links exactly as specified."""
+        for name in spec.get('routers', []):
+            self._add_node(name, NODE_ROUTER)
+        for name in spec.get('firewalls', []):
+            self._add_node(name, NODE_FIREWALL)
+        for a, b in spec['links']:
+            self._link(a, b)
+    
+    def _build_hierarchy(self, spec: Dict[str, Any]) -> None:
+        """Generate core, distribution routers and firewalls for the segments."""
+        per_router = max(1, int(spec.get('segments_per_router', 8)))
+        router_count = max(1, -(-len(self.networks) // per_router))
+        segment_firewalls = spec.get('segment_firewalls', router_count > 1)
+        
+        self._add_node('core', NODE_ROUTER)
+        self._add_node(PERIMETER_FIREWALL, NODE_FIREWALL)
+        self._link('core', PERIMETER_FIREWALL)
+        self._link(PERIMETER_FIREWALL, EXTERNAL_SEGMENT)
+        
+        for r in range(router_count):
+            router = f"router-{r + 1}"
+            self._add_node(router, NODE_ROUTER)
+            if segment_firewalls:
+                firewall = f"fw-{router}"
+                self._add_node(firewall, NODE_FIREWALL)
+                self._link(router, firewall)
+                self._link(firewall, 'core')
+            else:
+                self._link(router, 'core')
+            
+            for network in self.networks[r * per_router:(r + 1) * per_router]:
+                self._link(str(network), router)
+    
+    def _compute_routes(self) -> None:
+        """Find shortest paths between every pair of segments."""
+        kinds = np.array(self.node_kinds)
+        segments = self.segment_count
+        
+        self.route_ids = np.zeros((segments, segments), dtype=np.uint32)
+        offsets = [0, 0]  # path 0 is the empty "no path"
+        nodes: List[int] = []
+        
+        for source in range(segments):
+            # Breadth-first search; segments are endpoints and never forward traffic
+            parent = np.full(len(self.node_names), -1, dtype=np.int64)
+            parent[source] = source
+            queue = deque([source])
+            while queue:
+                node = queue.popleft()
+                if node != source and kinds[node] == NODE_SEGMENT:
+                    continue
+                for neighbor in self._neighbors[node]:
+                    if parent[neighbor] < 0:
+                        parent[neighbor] = node
+                        queue.append(neighbor)
+            
+            for destination in range(segments):
+                if parent[destination] < 0:
+                    continue
+                hops = [destination]
+                while hops[-1] != source:
+                    hops.append(int(parent[hops[-1]]))
+                nodes.extend(reversed(hops))
+                offsets.append(len(nodes))
+                self.route_ids[source, destination] = len(offsets) - 2
+        
+        # Paths are stored flat: path p visits path_nodes[path_offsets[p]:path_offsets[p + 1]]
+        self.path_offsets = np.array(offsets, dtype=np.int64)
+        self.path_nodes = np.array(nodes, dtype=np.int64)
+        self.path_lengths = np.diff(self.path_offsets)
+        
+        # Firewalls crossed per path, counted once here so enforcement is a lookup
+        path_index = np.repeat(np.arange(len(self.path_lengths)), self.path_lengths)
+        is_firewall = kinds[self.path_nodes] == NODE_FIREWALL
+        perimeter = self._node_index.get(PERIMETER_FIREWALL, -1)
+        self.firewall_count = np.bincount(path_index[is_firewall], minlength=len(self.path_lengths))
+        self.internal_firewall_count = np.bincount(
+            path_index[is_firewall & (self.path_nodes != perimeter)], minlength=len(self.path_lengths)
+        )
+        self._crossing_cache: Dict[int, np.ndarray] = {}
+    
+    def _build_segment_lookup(self) -> None:
+        """Sort segment address ranges for vectorized address-to-segment lookup."""
+        starts = np.array([int(n.network_address) for n in self.networks], dtype=np.int64)
+        ends = np.array([int(n.broadcast_address) for n in self.networks], dtype=np.int64)
+        order = np.argsort(starts, kind='stable')
+        self._starts = starts[order]
+        self._ends = ends[order]
+        self._segments = order
+    
+    def segment_of(self, ips: np.ndarray) -> np.ndarray:
+        """
+        Map addresses to segment indices.
+        
+        Args:
+            ips: uint32 addresses
+        
+        Returns:
+            Segment index per address; addresses outside every internal
+            network belong to the external segment
+        """
+        ips = np.asarray(ips, dtype=np.int64)
+        if not len(self._starts):
+            return np.full(len(ips), self.external_segment, dtype=np.int64)
+        
+        position = np.searchsorted(self._starts, ips, side='right') - 1
+        clipped = np.maximum(position, 0)
+        inside = (position >= 0) & (ips <= self._ends[clipped])
+        return np.where(inside, self._segments[clipped], self.external_segment)
+    
+    def route(self, source_segments: np.ndarray, destination_segments: np.ndarray) -> np.ndarray:
+        """
+        Look up the path id of each flow.
+        
+        Args:
+            source_segments: Source segment per flow
+            destination_segments: Destination segment per flow
+        
+        Returns:
+            Path id per flow (0 where the segments are not connected)
+        """
+        return self.route_ids[source_segments, destination_segments]
+    
+    def route_ips(self, source_ips: np.ndarray, destination_ips: np.ndarray) -> np.ndarray:
+        """Look up the path id of flows given their addresses."""
+        return self.route(self.segment_of(source_ips), self.segment_of(destination_ips))
+    
+    def crosses(self, path_ids: np.ndarray, node: str) -> np.ndarray:
+        """
+        Check which flows traverse a node, such as a firewall.
+        
+        Args:
+            path_ids: Path id per flow
+            node: Node name
+        
+        Returns:
+            Boolean array, True where the flow's path visits the node
+        """
+        index = self._node_index[node]
+        mask = self._crossing_cache.get(index)
+        if mask is None:
+            mask = np.zeros(len(self.path_lengths), dtype=bool)
+            hits = np.flatnonzero(self.path_nodes == index)
+            mask[np.searchsorted(self.path_offsets, hits, side='right') - 1] = True
+            self._crossing_cache[index] = mask
+        return mask[path_ids]
+    
+    def path(self, path_id: int) -> List[str]:
+        """
+        Get the node names along a path.
+        
+        Args:
+            path_id: Path id
+        
+        Returns:
+            Node names from source segment to destination segment
+        """
+        start, stop = self.path_offsets[path_id], self.path_offsets[path_id + 1]
+        return [self.node_names[n] for n in self.path_nodes[start:stop].tolist()]
+    
+    def describe(self) -> Dict[str, Any]:
+        """
+        Summarize the topology.
+        
+        Returns:
+            Dictionary with segments, routers, firewalls and links
+        """
+        links = set()
+        for i, neighbors in enumerate(self._neighbors):
+            for j in neighbors:
+                links.add((min(i, j), max(i, j)))
+        
+        def named(kind: int) -> List[str]:
+            return [n for n, k in zip(self.node_names, self.node_kinds) if k == kind]
+        
+        return {
+            'segments': named(NODE_SEGMENT),
+            'routers': named(NODE_ROUTER),
+            'firewalls': named(NODE_FIREWALL),
+            'links': [[self.node_names[i], self.node_names[j]] for i, j in sorted(links)],
+            'route_count': len(self.path_lengths) - 1
+        }
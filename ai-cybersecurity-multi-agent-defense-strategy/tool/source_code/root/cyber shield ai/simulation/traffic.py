@@ -0,0 +1,252 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Sequence, Tuple
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Protocol codes used by the columnar traffic representation
+PROTOCOLS = ['unknown', 'tcp', 'udp', 'icmp', 'http', 'https', 'dns', 'smtp', 'ssh', 'ftp', 'telnet']
+PROTOCOL_CODES = {name: code for code, name in enumerate(PROTOCOLS)}
+
+# Pattern sets attached to records; code 0 is the empty pattern list of benign traffic
+PATTERN_SETS: List[Tuple[str, ...]] = [()]
+PATTERN_CODES: Dict[Tuple[str, ...], int] = {(): 0}
+
+def register_pattern(patterns: Sequence[str]) -> int:
+    """
+    Register a pattern set and return its code.
+    
+    Args:
+        patterns: Pattern names attached to a traffic record
+    
+    Returns:
+        Integer code identifying the pattern set
+    """
+    key = tuple(patterns)
+    code = PATTERN_CODES.get(key)
+    if code is None:
+        code = len(PATTERN_SETS)
+        PATTERN_SETS.append(key)
+        PATTERN_CODES[key] = code
+    return code
+
+def protocol_code(protocol: str) -> int:
+    """Return the code for a protocol name, falling back to 'unknown'."""
+    return PROTOCOL_CODES.get(protocol, 0)
+
+def ip_to_int(ip: str) -> int:
+    """Convert a dotted-quad IPv4 string to an integer."""
+    a, b, c, d = ip.split('.')
+    return (int(a) << 24) | (int(b) << 16) | (int(c) << 8) | int(d)
+
+def format_ips(ips: np.ndarray) -> List[str]:
+    """
+    Render an array of uint32 IPv4 addresses as dotted-quad strings.
+    
+    Args:
+        ips: Array of addresses
+    
+    Returns:
+        List of address strings
+    """
+    ips = np.asarray(ips, dtype=np.uint32)
+    
+    # Traffic repeats a small set of hosts, so render each distinct address once
+    unique, inverse = np.unique(ips, return_inverse=True)
+    octets = [((unique >> shift) & 0xFF).tolist() for shift in (24, 16, 8, 0)]
+    names = [f"{a}.{b}.{c}.{d}" for a, b, c, d in zip(*octets)]
+    return [names[i] for i in inverse.tolist()]
+
+class TrafficBatch:
+    """
+    Columnar batch of network traffic records.
+    Each field is a NumPy array of equal length; `to_records` provides the
+    dictionary view used by the agents. `labelled` marks records whose
+    `is_malicious` is ground truth: simulated traffic is labelled, imported
+    captures are not.
+    """
+    
+    FIELDS = {
+        'source_ip': np.uint32,
+        'destination_ip': np.uint32,
+        'protocol': np.uint8,
+        'port': np.uint16,
+        'payload_size': np.uint32,
+        'timestamp': np.float64,
+        'is_malicious': np.bool_,
+        'labelled': np.bool_,
+        'confidence': np.float64,
+        'pattern': np.uint16,
+        'path': np.uint32
+    }
+    
+    # Names indexed by the protocol column, for consumers that duck-type batches
+    protocol_names = PROTOCOLS
+    
+    def __init__(self, **columns: np.ndarray):
+        """
+        Initialize a traffic batch from column arrays.
+        
+        Args:
+            columns: One array per entry in FIELDS; scalars are broadcast and
+                missing columns are zero-filled, except `labelled`, which
+                defaults to whether `is_malicious` was given
+        """
+        size = max((len(v) for v in columns.values() if np.ndim(v) > 0), default=0)
+        if columns.get('labelled') is None:
+            columns['labelled'] = columns.get('is_malicious') is not None
+        for field, dtype in self.FIELDS.items():
+            values = columns.get(field)
+            if values is None:
+                values = np.zeros(size, dtype=dtype)
+            else:
+                values = np.asarray(values, dtype=dtype)
+                if values.shape != (size,):
+                    values = np.broadcast_to(values, (size,)).copy()
+            setattr(self, field, values)
+    
+    def __len__(self) -> int:
+        return len(self.source_ip)
+    
+    @classmethod
+    def empty(cls) -> 'TrafficBatch':
+        """Create a batch with no records."""
+        return cls(**{field: np.zeros(0, dtype=dtype) for field, dtype in cls.FIELDS.items()})
+    
+    @classmethod
+    def concatenate(cls, batches: Sequence['TrafficBatch']) -> 'TrafficBatch':
+        """
+        Concatenate several batches into one.
+        
+        Args:
+            batches: Batches to join, in order
+        
+        Returns:
+            A new batch containing every record
+        """
+        batches = [b for b in batches if len(b)]
+        if not batches:
+            return cls.empty()
+        if len(batches) == 1:
+            return batches[0]
+        return cls(**{field: np.concatenate([getattr(b, field) for b in batches]) for field in cls.FIELDS})
+    
+    @classmethod
+    def from_records(cls, records: Sequence[Dict[str, Any]]) -> 'TrafficBatch':
+        """
+        Build a batch from dictionary records.
+        
+        Args:
+            records: Traffic records in the dictionary format
+        
+        Returns:
+            Equivalent columnar batch
+        """
+        timestamps = []
+        for r in records:
+            ts = r.get('timestamp', 0.0)
+            if isinstance(ts, str):
+                ts = datetime.fromisoformat(ts).timestamp()
+            timestamps.append(ts)
+        
+        return cls(
+            source_ip=[ip_to_int(r.get('source_ip', '0.0.0.0')) for r in records],
+            destination_ip=[ip_to_int(r.get('destination_ip', '0.0.0.0')) for r in records],
+            protocol=[protocol_code(r.get('protocol', 'unknown')) for r in records],
+            port=[r.get('port', 0) for r in records],
+            payload_size=[r.get('payload_size', 0) for r in records],
+            timestamp=timestamps,
+            is_malicious=[r.get('is_malicious', False) for r in records],
+            labelled=['is_malicious' in r for r in records],
+            confidence=[r.get('confidence', 0.0) for r in records],
+            pattern=[register_pattern(r.get('patterns', [])) for r in records],
+            path=[r.get('path_id', 0) for r in records]
+        )
+    
+    def take(self, indices: Any) -> 'TrafficBatch':
+        """
+        Select records by index array, boolean mask or slice.
+        
+        Args:
+            indices: Anything accepted by NumPy indexing
+        
+        Returns:
+            A new batch with the selected records
+        """
+        return TrafficBatch(**{field: getattr(self, field)[indices] for field in self.FIELDS})
+    
+    def to_records(self) -> List[Dict[str, Any]]:
+        """
+        Convert the batch to the dictionary record format.
+        Timestamps stay float epoch seconds; ISO rendering is left to callers.
+        Unlabelled records have no 'is_malicious' entry.
+        
+        Returns:
+            List of traffic record dictionaries
+        """
+        if not len(self):
+            return []
+        
+        source_ips = format_ips(self.source_ip)
+        destination_ips = format_ips(self.destination_ip)
+        protocols = [PROTOCOLS[c] for c in self.protocol.tolist()]
+        patterns = [PATTERN_SETS[c] for c in self.pattern.tolist()]
+        
+        records = [
+            {
+                'source_ip': src,
+                'destination_ip': dst,
+                'protocol': proto,
+                'port': port,
+                'payload_size': size,
+                'timestamp': ts,
+                'is_malicious': malicious,
+                'confidence': confidence,
+                'patterns': list(pattern),
+                'path_id': path
+            }
+            for src, dst, proto, port, size, ts, malicious, confidence, pattern, path in zip(
+                source_ips, destination_ips, protocols,
+                self.port.tolist(), self.payload_size.tolist(), self.timestamp.tolist(),
+                self.is_malicious.tolist(), self.confidence.tolist(), patterns, self.path.tolist()
+            )
+        ]
+        for i in np.flatnonzero(~self.labelled).tolist():
+            del records[i]['is_malicious']
+        return records
+
+def rechunk(batches: Iterable[TrafficBatch], size: int) -> Iterator[TrafficBatch]:
+    """
+    Re-split a stream of batches into batches of a fixed size.
+    At most one input batch plus `size` records are held at a time.
+    
+    Args:
+        batches: Input batches of any size
+        size: Records per output batch; the last batch may be shorter
+    
+    Yields:
+        TrafficBatch objects of `size` records, in input order
+    """
+    size = max(1, int(size))
+    pending: List[TrafficBatch] = []
+    pending_count = 0
+    
+    for batch in batches:
+        if not len(batch):
+            continue
+        pending.append(batch)
+        pending_count += len(batch)
+        if pending_count < size:
+            continue
+        
+        joined = TrafficBatch.concatenate(pending)
+        full = pending_count - pending_count % size
+        for start in range(0, full, size):
+            yield joined.take(slice(start, start + size))
+        
+        pending = [joined.take(slice(full, None))] if full < pending_count else []
+        pending_count -= full
+    
+    if pending_count:
+        yield TrafficBatch.concatenate(pending)